@@ -1,4 +1,5 @@
 import os
+import database
 from credentials import BOT_TOKEN, CLIENT_ID, CLIENT_SECRET,EMAIL_HOST_USER , EMAIL_HOST_PASSWORD
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -21,7 +22,7 @@ ALLOWED_HOSTS = ['srv.cpu.party']
 # Application definition
 
 INSTALLED_APPS = [
-    'oauth',
+    'oauth.apps.OauthConfig',  # configures sqlite connections, see database.py
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -62,7 +63,8 @@ WSGI_APPLICATION = 'CPUBot.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'NAME': os.environ.get('CPUBOT_DATABASE', os.path.join(BASE_DIR, 'db.sqlite3')),  # loadtest.py uses a scratch copy
+        'OPTIONS': {'timeout': database.BUSY_TIMEOUT},
     }
 }
 
@@ -0,0 +1,127 @@
+import collections
+
+import numpy as np
+
+from export import write_gzip_csv
+
+DEFAULT_THRESHOLD = 0.5  # fraction of the meetings held so far a member is expected to attend
+
+
+class AttendanceAnalytics:
+    """
+    The attendance log loaded once into a person x meeting matrix weighted by `effective`.
+    Meetings are labelled by the date they started.
+    """
+
+    def __init__(self, names, meetings, weights):
+        self.names = names  # one per row
+        self.meetings = meetings  # one date string per column
+        self.weights = weights  # float matrix, 0 where a person missed a meeting
+        self.attended = weights > 0
+
+    @classmethod
+    def load(cls, conn, person_join, guild_id=None):
+        """:param guild_id: only meetings of this guild, or every meeting if None"""
+        query = ('SELECT p.id, r.first_name, r.last_name, a.meeting_id, date(m.start), a.effective FROM attendance a '
+                 'JOIN meeting m ON m.id=a.meeting_id ' + person_join)
+        if guild_id is not None:
+            cursor = conn.execute(query + 'WHERE m.guild_id=?', (guild_id,))
+        else:
+            cursor = conn.execute(query)
+        person_ids, names, meeting_ids, dates, effective = [], {}, [], {}, []
+        for person_id, first_name, last_name, meeting_id, date, weight in cursor:
+            person_ids.append(person_id)
+            names[person_id] = first_name + ' ' + last_name
+            meeting_ids.append(meeting_id)
+            dates[meeting_id] = date
+            effective.append(weight)
+
+        people, rows = np.unique(np.array(person_ids, dtype=np.int64), return_inverse=True)
+        meetings, columns = np.unique(np.array(meeting_ids, dtype=np.int64), return_inverse=True)
+        weights = np.zeros((len(people), len(meetings)))
+        np.add.at(weights, (rows, columns), np.array(effective, dtype=float))
+        return cls([names[p] for p in people.tolist()], [dates[m] for m in meetings.tolist()], weights)
+
+    @property
+    def headcount(self):
+        return self.attended.sum(axis=0)
+
+    @property
+    def effective(self):
+        return self.weights.sum(axis=1)
+
+    def streaks(self):
+        """:return: (current streak, longest streak) arrays, in meetings"""
+        if not self.meetings:
+            return np.zeros(len(self.names), dtype=int), np.zeros(len(self.names), dtype=int)
+        index = np.arange(len(self.meetings))
+        last_missed = np.maximum.accumulate(np.where(self.attended, -1, index), axis=1)
+        runs = index - last_missed  # length of the run of attended meetings ending at each meeting
+        return runs[:, -1], runs.max(axis=1)
+
+    def first_meeting(self):
+        return self.attended.argmax(axis=1)
+
+    def retention(self):
+        """:return: (newcomers, newcomers who came back at least once) per meeting"""
+        first = self.first_meeting()
+        came_back = self.attended.sum(axis=1) > 1
+        newcomers = np.bincount(first, minlength=len(self.meetings))
+        retained = np.bincount(first, weights=came_back, minlength=len(self.meetings)).astype(int)
+        return newcomers, retained
+
+    def at_risk(self, threshold=DEFAULT_THRESHOLD):
+        """Members whose effective attendance is below threshold of the meetings held so far."""
+        return self.effective < threshold * len(self.meetings)
+
+    def report(self, threshold=DEFAULT_THRESHOLD, recent=8, limit=10) -> str:
+        if not self.meetings:
+            return 'No attendance has been recorded yet.'
+        headcount = self.headcount
+        current, longest = self.streaks()
+        newcomers, retained = self.retention()
+        at_risk = self.at_risk(threshold)
+
+        lines = [f'{len(self.meetings)} meetings, {len(self.names)} members, '
+                 f'{headcount.mean():.1f} attendees on average', '',
+                 'Meeting      Headcount  New  Came back']
+        for i in range(max(0, len(self.meetings) - recent), len(self.meetings)):
+            lines.append(f'{self.meetings[i]:<12} {headcount[i]:>9} {newcomers[i]:>4} {retained[i]:>10}')
+        total_new = newcomers.sum()
+        lines.append(f'Newcomer retention: {retained.sum()}/{total_new} '
+                     f'({100 * retained.sum() / max(total_new, 1):.0f}%)')
+
+        lines += ['', 'Longest current streaks:']
+        for i in np.argsort(-current, kind='stable')[:limit]:
+            if current[i] == 0:
+                break
+            lines.append(f'{self.names[i]:<24} {current[i]:>3} (longest {longest[i]})')
+
+        lines += ['', f'{at_risk.sum()} members below {threshold:.0%} of meetings:']
+        effective = self.effective
+        for i in np.flatnonzero(at_risk)[np.argsort(-effective[at_risk], kind='stable')][:limit]:
+            lines.append(f'{self.names[i]:<24} {effective[i]:>5g}')
+        if at_risk.sum() > limit:
+            lines.append(f'... and {at_risk.sum() - limit} more')
+        return '\n'.join(lines)
+
+    def to_csv(self, threshold=DEFAULT_THRESHOLD):
+        current, longest = self.streaks()
+        first = self.first_meeting()
+        at_risk = self.at_risk(threshold)
+        rows = zip(self.names, self.attended.sum(axis=1).tolist(), self.effective.tolist(), current.tolist(),
+                   longest.tolist(), [self.meetings[i] for i in first.tolist()], at_risk.tolist())
+        return write_gzip_csv(('name', 'attended', 'effective', 'current_streak', 'longest_streak',
+                               'first_meeting', 'at_risk'), rows)[0]
+
+
+CachedAnalytics = collections.namedtuple('CachedAnalytics', ('version', 'analytics'))
+_cache = {}  # guild id -> CachedAnalytics
+
+
+def get(conn, person_join, version, guild_id=None):
+    """The analytics for the attendance log of a guild at data version `version`, loaded at most once per version."""
+    cached = _cache.get(guild_id)
+    if cached is None or cached.version != version:
+        cached = _cache[guild_id] = CachedAnalytics(version, AttendanceAnalytics.load(conn, person_join, guild_id))
+    return cached.analytics
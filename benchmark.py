@@ -0,0 +1,223 @@
+"""
+Micro-benchmarks of the hot paths of bot.py, utils.py and mail.py on a synthetic database.
+
+    python benchmark.py --output bench.json          # measure and save
+    python benchmark.py --baseline bench.json        # measure and compare against a saved run
+
+bot.py is started in a scratch directory holding a database seeded like loadtest.py's, so nothing touches the
+real db.sqlite3. Replies are sent to a recipient that drops them: the network is not part of the measurements.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+import types
+
+import discord.abc
+
+import attendance_analytics
+import mail
+from loadtest import FIRST_MEMBER_ID, STAFF_IDS, seed_database
+
+BENCHMARKS = []  # (name, setup) where setup(cpubot, member_ids) returns the function to time
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+class NullRecipient(discord.abc.Messageable):
+    """Accepts messages and drops them."""
+
+    def __init__(self, id):
+        self.id = id
+
+    async def _get_channel(self):
+        return self
+
+    async def send(self, content=None, **kwargs):
+        return None
+
+
+LOREM = ('Our next meeting is on Thursday in the library classroom, bring a laptop if you have one. '
+         'Slides and starter code are at https://cpu.party/meetings/next and https://github.com/cpu/workshop.\n')
+
+
+def dispatcher(cpubot, interface_class, user_id, content):
+    channel = NullRecipient(user_id)
+    interface = interface_class(channel)
+    interface.throttled = False  # time the command, not the rate limit it runs into
+    message = types.SimpleNamespace(author=channel, channel=channel, content=content)
+    return lambda: cpubot.bot.loop.run_until_complete(interface.dispatch(content, message))
+
+
+@benchmark('split_message')
+def _(cpubot, member_ids):
+    msg = LOREM * 200
+    return lambda: cpubot.split_message(msg)
+
+
+@benchmark('split_message_code_block')
+def _(cpubot, member_ids):
+    msg = '\n'.join('%-30s %s' % (i, 'x' * 40) for i in range(500))
+    return lambda: cpubot.split_message(msg, '```')
+
+
+@benchmark('dispatch_attendance_status')
+def _(cpubot, member_ids):
+    return dispatcher(cpubot, cpubot.UserInterface, member_ids[-1], 'attendance status')
+
+
+@benchmark('dispatch_attendance_list')
+def _(cpubot, member_ids):
+    return dispatcher(cpubot, cpubot.UserInterface, member_ids[-1], 'attendance list')
+
+
+@benchmark('dispatch_unrecognized')
+def _(cpubot, member_ids):
+    return dispatcher(cpubot, cpubot.UserInterface, member_ids[-1], 'help')
+
+
+@benchmark('usage_user')
+def _(cpubot, member_ids):
+    interface = cpubot.UserInterface(NullRecipient(member_ids[-1]))
+    return lambda: interface.usage
+
+
+@benchmark('usage_server_admin')
+def _(cpubot, member_ids):
+    interface = cpubot.ServerAdminInterface(NullRecipient(STAFF_IDS[-1]))
+    return lambda: interface.usage
+
+
+@benchmark('email_html_template')
+def _(cpubot, member_ids):
+    html_body = mail.linkify('<p>' + (LOREM * 10).replace('\n', '</p><p>') + '</p>')
+    return lambda: mail.EMAIL_HTML_TEMPLATE.safe_substitute(
+            {'body': html_body, 'subject': 'Meeting this week', 'name': 'First1'})
+
+
+@benchmark('linkify')
+def _(cpubot, member_ids):
+    html_body = '<p>' + (LOREM * 10).replace('\n', '</p><p>') + '</p>'
+    return lambda: mail.linkify(html_body)
+
+
+@benchmark('update_cache')
+def _(cpubot, member_ids):
+    return cpubot.update_cache
+
+
+@benchmark('query_attendance_status')
+def _(cpubot, member_ids):
+    return lambda: cpubot.cursor.execute(
+            'SELECT sum(effective), count() FROM attendance where discord_user_id=?', (member_ids[-1],)).fetchone()
+
+
+@benchmark('query_attendance_today')
+def _(cpubot, member_ids):
+    query = ("SELECT DISTINCT r.first_name, r.last_name, r.school_email FROM attendance a " + cpubot.PERSON_JOIN +
+             "WHERE a.meeting_id=(SELECT max(id) FROM meeting WHERE guild_id=?) ORDER BY r.last_name, r.first_name")
+    return lambda: cpubot.cursor.execute(query, (cpubot.CPU_guild_id,)).fetchall()
+
+
+@benchmark('query_attendance_summary')
+def _(cpubot, member_ids):
+    query = ("SELECT r.first_name, r.last_name, r.school_email, sum(a.effective) as effective, count() as total "
+             "FROM attendance a JOIN meeting m ON m.id=a.meeting_id " + cpubot.PERSON_JOIN +
+             "WHERE m.guild_id=? GROUP BY p.id ORDER BY effective DESC, total DESC")
+    return lambda: cpubot.cursor.execute(query, (cpubot.CPU_guild_id,)).fetchall()
+
+
+@benchmark('query_mailing_list')
+def _(cpubot, member_ids):
+    query = cpubot.MAILING_LIST_QUERY.format(columns='r.first_name, r.school_email')
+    return lambda: cpubot.cursor.execute(query).fetchall()
+
+
+@benchmark('attendance_analytics_load')
+def _(cpubot, member_ids):
+    return lambda: attendance_analytics.AttendanceAnalytics.load(cpubot.conn, cpubot.PERSON_JOIN, cpubot.CPU_guild_id)
+
+
+def measure(func, repeat, min_time):
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    per_call = [t / number for t in timer.repeat(repeat, number)]
+    return {'best_us': round(min(per_call) * 1e6, 2), 'median_us': round(statistics.median(per_call) * 1e6, 2),
+            'number': number}
+
+
+def compare(results, baseline, tolerance):
+    """Print how results compare with baseline. :return: names of the benchmarks that got slower"""
+    regressions = []
+    print('\n%-28s %12s %12s %8s' % ('benchmark', 'baseline us', 'now us', 'ratio'))
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print('%-28s %12s %12.2f %8s' % (name, '-', result['median_us'], 'new'))
+            continue
+        ratio = result['median_us'] / before['median_us']
+        verdict = ''
+        if ratio > 1 + tolerance:
+            verdict = 'SLOWER'
+            regressions.append(name)
+        elif ratio < 1 - tolerance:
+            verdict = 'faster'
+        print('%-28s %12.2f %12.2f %7.2fx %s' % (name, before['median_us'], result['median_us'], ratio, verdict))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=3000, help='signed up members in the synthetic database')
+    parser.add_argument('--meetings', type=int, default=30, help='past meetings, each attended by ~70%% of members')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds each repetition runs for at least')
+    parser.add_argument('-k', dest='only', action='append', help='run only benchmarks whose name contains this')
+    parser.add_argument('--output', help='save the results to this JSON file')
+    parser.add_argument('--baseline', help='compare against the results saved in this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='relative change reported as a regression')
+    args = parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['benchmarks']
+
+    workdir = tempfile.mkdtemp(prefix='cpubot-benchmark-')
+    member_ids = list(STAFF_IDS) + [FIRST_MEMBER_ID + i for i in range(args.records)]
+    seed_database(os.path.join(workdir, 'db.sqlite3'), member_ids, args.meetings)
+    os.chdir(workdir)  # init() opens db.sqlite3 in the working directory
+    import bot as cpubot
+    cpubot.init()
+    attendance_rows = cpubot.cursor.execute('SELECT count() FROM attendance').fetchone()[0]
+    print('%d records, %d attendance rows in %s' % (len(member_ids), attendance_rows, workdir))
+
+    results = {}
+    for name, setup in BENCHMARKS:
+        if args.only and not any(part in name for part in args.only):
+            continue
+        results[name] = measure(setup(cpubot, member_ids), args.repeat, args.min_time)
+        print('%-28s %12.2f us (best %.2f, %d calls per repetition)' % (
+            name, results[name]['median_us'], results[name]['best_us'], results[name]['number']), flush=True)
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump({'python': platform.python_version(), 'records': len(member_ids),
+                       'attendance_rows': attendance_rows, 'benchmarks': results}, f, indent=2)
+    if baseline is not None and compare(results, baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,70 +1,235 @@
+import time
+IMPORTS_STARTED = time.perf_counter()
 import asyncio.subprocess
 import collections
 import datetime
-import functools
 import hashlib
 import io
+import itertools
 import logging
+import math
+import os
 import secrets
 import sqlite3
+import sys
 import textwrap
-import time
 import traceback
 import types
-import string
-import smtplib
 import re
-import ssl
 import discord
 import discord.abc
 import aiohttp
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from credentials import BOT_TOKEN,EMAIL_HOST_PASSWORD,JUPYTER_HUB_API_ENDPOINT,JUPYTER_HUB_API_TOKEN
+from discord.http import Route
 from utils import send_messages, split_message, split_send_message
-from cpu_logo_b64encoded import logo
+from token_refresher import TokenRefresher, parse_timestamp
+from export import ExportCache
+import database
+import jobs
+import progress
+import ratelimit
+import snapshot
+import startup
+import throttle
+from loop_watchdog import LoopWatchdog
+# imported on first use through startup_timer.lazy_import: attendance_analytics (numpy), mail (smtplib, email),
+# profiling, sql_console and gateway_trace
+
+startup_timer = startup.StartupTimer(IMPORTS_STARTED)
+startup_timer.add('import bot.py and its dependencies', time.perf_counter() - IMPORTS_STARTED)
 
 logger = logging.getLogger('discord')
-logger.setLevel(logging.DEBUG)
 
-handler = logging.FileHandler(
-        filename='/var/tmp/CPUBot.log', encoding='utf-8', mode='a+')
-handler.setLevel(logging.WARNING)
-handler.setFormatter(
-        logging.Formatter('%(asctime)s:%(levelname)s:%(name)s: %(message)s'))
-logger.addHandler(handler)
 
-handler = logging.FileHandler(
-        filename='/var/tmp/CPUBot.verbose.log', encoding='utf-8', mode='a+')
-handler.setFormatter(
-        logging.Formatter('%(asctime)s:%(levelname)s:%(name)s: %(message)s'))
-logger.addHandler(handler)
+def setup_logging():
+    logger.setLevel(logging.DEBUG)
+    
+    handler = logging.FileHandler(
+            filename='/var/tmp/CPUBot.log', encoding='utf-8', mode='a+')
+    handler.setLevel(logging.WARNING)
+    handler.setFormatter(
+            logging.Formatter('%(asctime)s:%(levelname)s:%(name)s: %(message)s'))
+    logger.addHandler(handler)
+    
+    handler = logging.FileHandler(
+            filename='/var/tmp/CPUBot.verbose.log', encoding='utf-8', mode='a+')
+    handler.setFormatter(
+            logging.Formatter('%(asctime)s:%(levelname)s:%(name)s: %(message)s'))
+    logger.addHandler(handler)
+
 
-bot = discord.Client()
+# Memory budget for the small VPS: a short message cache, members of large guilds fetched only when needed
+# and idle DM interfaces dropped
+LOW_MEMORY = bool(os.environ.get('CPUBOT_LOW_MEMORY'))
+MAX_INTERFACES = 500 if LOW_MEMORY else None  # per interface class
+# One process for every guild in GUILDS, over as many gateway connections as Discord recommends
+SHARDED = bool(os.environ.get('CPUBOT_SHARDED'))
 
 DEBUG = False
 
-allowed_guild_ids = (479544231875182592, 426702004606337034)
-CPU_guild_id = 479544231875182592 if DEBUG else 426702004606337034
+CPU_guild_id = 479544231875182592 if DEBUG else 426702004606337034  # the guild the signup form adds members to
+
+JERRY_ID = 268759214610972673
+SERVER_ADMIN_IDS = (
+    387486747770224642,  # Andrew
+    JERRY_ID,
+)
+# guild id -> ids of its admins, besides the server admins who are admins everywhere. Other guilds are ignored.
+GUILDS = {
+    CPU_guild_id: (
+        456243117671055371,  # Ethan
+        179685458991644673,  # Spencer
+    ),
+}
+
+# created by init(), so that importing bot.py has no side effects
+bot = None  # the discord.Client, see create_client
+loop_watchdog = None  # blocking calls end up in the warning log and `stalls`
+conn = cursor = database_path = None
+token_refresher = export_cache = job_queue = trace_recorder = governor = None
+warm_start = False  # whether init() restored a snapshot
+
+reconciling_user_ids = set()  # members being re-added by reconcile_members, who should not be welcomed
+followed_jobs = {}  # job id -> id of the user told about its progress, see follow_job
+interrupted_user_ids = set()  # users whose conversation was cut short by a shutdown
+
+# Duplicate records are resolved through the identity index maintained by the Django app (oauth.models.Identity):
+# every person has one canonical record, and a Discord id maps to its person.
+MAILING_LIST_QUERY = ('SELECT {columns} FROM oauth_person p JOIN oauth_record r ON r.id=p.record_id '
+                      'WHERE r.opt_out_email=0')
+PERSON_JOIN = ("JOIN oauth_identity i ON i.kind='discord' AND i.value=CAST(a.discord_user_id AS TEXT) "
+               "JOIN oauth_person p ON p.id=i.person_id JOIN oauth_record r ON r.id=p.record_id ")
+
+PROFILE_MAX_SECONDS = 600
+PROGRESS_INTERVAL = 5  # seconds between edits of a progress message, see progress.py
+SAMPLE_EMAIL_TIMEOUT = 300
+SWEEP_TIMEOUT = 4 * 3600
+QUIET_HOURS = (9, 12)  # local time, when members are in class: scheduled campaigns can go out without competing
+SNAPSHOT_PATH = os.environ.get('CPUBOT_SNAPSHOT', 'bot.snapshot.json.gz')  # written on shutdown, see snapshot.py
+SNAPSHOT_MAX_AGE = 24 * 3600
+# Members' commands, see BaseInterface.dispatch: each member may spend COMMAND_BUDGET of command cost a minute, and at
+# most MAX_HANDLERS of their commands are handled at once. Admins are not limited.
+COMMAND_BUDGET = 10
+MAX_HANDLERS = 50
+SLOW_DOWN_INTERVAL = 60  # seconds between "slow down" replies to a member, which use up the DM rate limit too
+
+CHECKIN_URL = 'https://srv.cpu.party:50741/api/checkin/?key={key}'
+CHECKIN_LINK_URL = 'https://srv.cpu.party:50741/api/checkin/?member={token}'  # private to a member, sets their cookie
 
-conn = sqlite3.Connection('db.sqlite3')
-cursor = conn.cursor()
+Meeting = collections.namedtuple('Meeting', ('id', 'key', 'weight'))
+
+command_throttle = throttle.Throttle(COMMAND_BUDGET, 60)  # by user id
+command_limits = {}  # command name -> Throttle by user id, for commands with a `limit` of (count, seconds)
+slow_down_replies = throttle.Throttle(1, SLOW_DOWN_INTERVAL)  # by user id
+handler_slots = throttle.ConcurrencyLimit(MAX_HANDLERS)
+
+
+class GuildContext:
+    """
+    The state of one guild the bot serves: its channels, admins and meeting in progress.
+    Admins are known by id, so DMs are handled as soon as the gateway delivers them, before on_ready.
+    DMs are handled in the context of a guild their author belongs to, see for_user.
+    """
+    contexts = collections.OrderedDict()  # guild id -> GuildContext, in the order of GUILDS
+    
+    def __init__(self, guild_id, admin_ids=()):
+        self.guild_id = guild_id
+        self.admin_ids = admin_ids
+        self.channel_ids = {}  # channel name -> id, filled as channels are looked up and kept by the snapshot
+        self.meeting = self.load_meeting()  # survives a restart in the middle of a meeting
+        GuildContext.contexts[guild_id] = self
+    
+    @classmethod
+    def get(cls, guild_id):
+        """:return: the context of a guild or None if the bot does not serve it"""
+        return cls.contexts.get(guild_id)
+    
+    @classmethod
+    def default(cls):
+        return cls.contexts[CPU_guild_id]
+    
+    @classmethod
+    def for_user(cls, user):
+        """The guild this user is an admin of, or else the first guild they are a member of, or else the default."""
+        for context in cls.contexts.values():
+            if user.id in context.admin_ids:
+                return context
+        for context in cls.contexts.values():
+            guild = context.guild
+            if guild is not None and guild.get_member(user.id) is not None:
+                return context
+        return cls.default()
+    
+    @classmethod
+    def meeting_for_key(cls, key):
+        """:return: the meeting in progress with this attendance key, in any guild, or None"""
+        for context in cls.contexts.values():
+            meeting = context.meeting
+            if meeting is not None and secrets.compare_digest(key.encode(), meeting.key.encode()):
+                return meeting
+        return None
+    
+    @property
+    def guild(self) -> discord.Guild:
+        return bot.get_guild(self.guild_id)
+    
+    @property
+    def signup(self) -> bool:
+        """Whether members join through the signup form (oauth.views), which names them after their record"""
+        return self.guild_id == CPU_guild_id
+    
+    def is_admin(self, user) -> bool:
+        return user.id in self.admin_ids or user.id in SERVER_ADMIN_IDS
+    
+    def channel(self, name):
+        channel = bot.get_channel(self.channel_ids[name]) if name in self.channel_ids else None
+        if channel is None or channel.name != name:
+            guild = self.guild
+            channel = discord.utils.get(guild.channels, name=name) if guild is not None else None
+            if channel is not None:
+                self.channel_ids[name] = channel.id
+        return channel
+    
+    def load_meeting(self):
+        cursor.execute('SELECT id, key, weight FROM meeting WHERE guild_id=? AND "end" IS NULL ORDER BY id DESC LIMIT 1',
+                       (self.guild_id,))
+        row = cursor.fetchone()
+        return Meeting(*row) if row else None
+    
+    def begin_meeting(self, weight) -> Meeting:
+        now = datetime.datetime.now()
+        key = secrets.token_hex(3)
+        cursor.execute('UPDATE meeting SET "end"=? WHERE guild_id=? AND "end" IS NULL', (now, self.guild_id))
+        cursor.execute('INSERT INTO meeting (guild_id, key, weight, start) VALUES (?,?,?,?)',
+                       (self.guild_id, key, weight, now))
+        conn.commit()
+        self.meeting = Meeting(cursor.lastrowid, key, weight)
+        return self.meeting
+    
+    def end_meeting(self):
+        cursor.execute('UPDATE meeting SET "end"=? WHERE id=?', (datetime.datetime.now(), self.meeting.id))
+        conn.commit()
+        self.meeting = None
 
-attendance_key = secrets.token_hex(32)
-effective_meeting_count = 1
 
 
 class InterfaceMeta(type):
     def __init__(cls, *args, **kwargs):
-        cls._interfaces = {}
+        cls._interfaces = collections.OrderedDict()  # least recently used first
         super().__init__(*args, **kwargs)
     
     def __call__(cls, channel: discord.abc.PrivateChannel, *args, **kwargs):
         if channel.id in cls._interfaces:
+            cls._interfaces.move_to_end(channel.id)
             return cls._interfaces[channel.id]
         obj = cls.__new__(cls, *args, **kwargs)
         obj.__init__(channel, *args, **kwargs)
         cls._interfaces[channel.id] = obj
+        if MAX_INTERFACES is not None and len(cls._interfaces) > MAX_INTERFACES:
+            for channel_id, interface in list(cls._interfaces.items()):
+                if len(cls._interfaces) <= MAX_INTERFACES:
+                    break
+                if not interface._dispatch_locked:  # never in the middle of a conversation
+                    del cls._interfaces[channel_id]
         return obj
 
 
@@ -74,50 +239,91 @@ class BaseInterface(metaclass=InterfaceMeta):
     The output of split_message is recommended.
     Every interface function must have signature
     (self,command: list, message: discord.Message)
+    A method may have a `cost` (default 1), charged to the member's COMMAND_BUDGET, and a `limit` (count, seconds) on
+    how often a member may use it.
     """
     error_reply = "Error"
+    throttled = True  # whether commands are rate limited and count towards MAX_HANDLERS
     
     def __init__(self, channel: discord.DMChannel):
         self._dispatch_locked = False
         self._channel = channel
+        self.context = GuildContext.default()  # set by on_message for every message
     
     def unrecognized_command(self, command) -> str:
         return ("Unrecognized command `%s`." % command) + self.usage
     
     async def dispatch(self, command: str, message) -> list:
         if not self._dispatch_locked:
-            if secrets.compare_digest(command, attendance_key):
-                cursor.execute('SELECT * FROM attendance WHERE discord_user_id=? AND time>? AND time<? LIMIT 1', (
-                message.author.id, datetime.datetime.now() - datetime.timedelta(days=1), datetime.datetime.now() + datetime.timedelta(days=1)))
-                if cursor.fetchone():
-                    return await split_send_message(message.author, 'Your attendance for today has already been recorded.')
-                
-                cursor.execute('INSERT INTO attendance VALUES (?,?,?)',
-                               (message.author.id, datetime.datetime.now(),
-                                effective_meeting_count))
-                conn.commit()
-                return await split_send_message(
-                        message.author,
-                        'Thank you. Your attendance has been recorded.')
+            if not self.throttled:
+                return await self.handle(command, message)
+            reason = self.check_rate(command, message.author)
+            if reason is not None:
+                return await self.slow_down(message.author, reason)
+            # check-ins are quick, and everyone checks in at once: they are never turned away
+            checkin = GuildContext.meeting_for_key(command) is not None
+            if not checkin and not handler_slots.try_acquire():
+                return await self.slow_down(message.author, "I'm too busy right now. Please try again in a minute.")
             try:
-                command = command.split()
-                func = getattr(self, command[0])
-                reply = await func(command[1:] if len(command) > 1 else [],
-                                   message)
-                if isinstance(reply, str):
-                    reply = (reply,)
-                return await send_messages(message.author, reply)
-            except AttributeError:
-                if DEBUG:
-                    raise
-                return await split_send_message(message.author,
-                                                self.error_reply)
-            except IndexError:
-                return await split_send_message(
-                        message.author, 'Insufficient arguments.\n' + self.usage)
+                return await self.handle(command, message)
+            finally:
+                if not checkin:
+                    handler_slots.release()
         else:
             return []
     
+    def check_rate(self, command: str, user) -> str:
+        """Charge a command, or a check-in key, to the user. :return: why it may not run now, or None if it may"""
+        words = command.split()
+        func = getattr(type(self), words[0], None) if words else None
+        wait = command_throttle.take(user.id, getattr(func, 'cost', 1))
+        if wait:
+            return f'Slow down! You can send me another command in {math.ceil(wait)} seconds.'
+        limit = getattr(func, 'limit', None)
+        if limit is not None:
+            if words[0] not in command_limits:
+                command_limits[words[0]] = throttle.Throttle(*limit)
+            wait = command_limits[words[0]].take(user.id)
+            if wait:
+                return f'Slow down! You can use `{words[0]}` again in {math.ceil(wait)} seconds.'
+        return None
+    
+    async def slow_down(self, user, reply) -> list:
+        """Tell a throttled user so, once every SLOW_DOWN_INTERVAL; anything more they send meanwhile is dropped."""
+        if slow_down_replies.take(user.id):
+            return []
+        return await split_send_message(user, reply)
+    
+    async def handle(self, command: str, message) -> list:
+        meeting = GuildContext.meeting_for_key(command)
+        if meeting is not None:
+            # the unique (meeting_id, discord_user_id) index drops repeated check-ins
+            cursor.execute('INSERT OR IGNORE INTO attendance (discord_user_id, time, effective, meeting_id) VALUES (?,?,?,?)',
+                           (message.author.id, datetime.datetime.now(), meeting.weight, meeting.id))
+            recorded = cursor.rowcount == 1
+            conn.commit()
+            if not recorded:
+                return await split_send_message(message.author, 'Your attendance for this meeting has already been recorded.')
+            return await split_send_message(
+                    message.author,
+                    'Thank you. Your attendance has been recorded.')
+        try:
+            command = command.split()
+            func = getattr(self, command[0])
+            reply = await func(command[1:] if len(command) > 1 else [],
+                               message)
+            if isinstance(reply, str):
+                reply = (reply,)
+            return await send_messages(message.author, reply)
+        except AttributeError:
+            if DEBUG:
+                raise
+            return await split_send_message(message.author,
+                                            self.error_reply)
+        except IndexError:
+            return await split_send_message(
+                    message.author, 'Insufficient arguments.\n' + self.usage)
+    
     def lock_dispatch(self):
         self._dispatch_locked = True
     
@@ -151,6 +357,8 @@ class Conversation:
             await self.send('Operation timed out')
             self.interface.unlock_dispatch()
             return True
+        if exc_type is asyncio.CancelledError:  # the bot is shutting down
+            interrupted_user_ids.add(self.interface._channel.recipient.id)
         self.interface.unlock_dispatch()
     
     def __enter__(self):
@@ -158,6 +366,8 @@ class Conversation:
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is asyncio.CancelledError:  # the bot is shutting down
+            interrupted_user_ids.add(self.interface._channel.recipient.id)
         self.interface.unlock_dispatch()
     
     async def send(self, msg, enclose_in='', separator='\n', **kwargs):
@@ -172,11 +382,15 @@ class Conversation:
                                         enclose_in, separator, **kwargs)
     
     async def recv(self, timeout=1800) -> discord.Message:
-        return await bot.wait_for(
+        wait = bot.wait_for(
                 'message',
                 check=lambda msg: msg.channel == self.interface._channel and
                                   not msg.author.bot,
                 timeout=timeout)
+        if not self.interface.throttled:
+            return await wait
+        with handler_slots.released():  # a member typing an answer does not count towards MAX_HANDLERS
+            return await wait
 
 
 class UserInterface(BaseInterface):
@@ -208,8 +422,7 @@ class UserInterface(BaseInterface):
     
     async def feedback(self, command: list, message: discord.Message) -> tuple:
         with Conversation(self) as con:
-            feedback_channel = discord.utils.find(
-                    lambda c: c.name == 'feedback', CPU_guild.channels)
+            feedback_channel = self.context.channel('feedback')
             await con.send(
                     'Your next message to me will be forwarded to the admin team anonymously. Type `cancel` to cancel.'
             )
@@ -227,6 +440,8 @@ class UserInterface(BaseInterface):
             return 'Your feedback has been forwarded to the admin team. Thank you.',
     
     feedback.usage = 'feedback'
+    feedback.cost = 3
+    feedback.limit = (5, 3600)
     feedback.description = 'Send a feedback to the admin team anonymously.'
     
     async def opt(self, command: list, message: discord.Message) -> tuple:
@@ -275,8 +490,8 @@ class UserInterface(BaseInterface):
     async def attendance(self, command, message) -> tuple:
         if command[0] == 'status':
             cursor.execute(
-                    'SELECT sum(effective), count() FROM attendance where discord_user_id=?',
-                    (message.author.id,))
+                    'SELECT sum(a.effective), count() FROM attendance a JOIN meeting m ON m.id=a.meeting_id '
+                    'WHERE a.discord_user_id=? AND m.guild_id=?', (message.author.id, self.context.guild_id))
             res = cursor.fetchone()  # only one row will be returned
             if res[1] == 0:
                 return 'You have not attended any meeting this year.',
@@ -286,8 +501,9 @@ class UserInterface(BaseInterface):
         
         elif command[0] == 'list':
             cursor.execute(
-                    'SELECT time, effective FROM attendance where discord_user_id=?',
-                    (message.author.id,))
+                    'SELECT a.time, a.effective FROM attendance a JOIN meeting m ON m.id=a.meeting_id '
+                    'WHERE a.discord_user_id=? AND m.guild_id=? ORDER BY a.time',
+                    (message.author.id, self.context.guild_id))
             res = cursor.fetchall()
             reply = 'You have attended the following meetings:\n'
             for att in res:
@@ -296,13 +512,24 @@ class UserInterface(BaseInterface):
                     reply += f' (counts as {att[1]} meetings)'
                 reply += '\n'
             return split_message(reply)
+        
+        elif command[0] == 'link':
+            # the state token of their record identifies them to the web check-in (oauth.views.checkin)
+            cursor.execute("SELECT state FROM oauth_record WHERE discord_user_id=? AND state!=''", (message.author.id,))
+            res = cursor.fetchone()
+            if res is None:
+                return 'You did not join through the signup form, so please check in by sending me the attendance key.',
+            return ('Open this link on your phone to check in by scanning the code at meetings from now on. '
+                    'It is private to you, please do not share it with others: ' + CHECKIN_LINK_URL.format(token=res[0]),)
         else:
             return self.unrecognized_command(command[0]),
     
-    attendance.usage = 'attendance {status|list}'
-    attendance.description = 'Show the number of meetings you have attended'
+    attendance.usage = 'attendance {status|list|link}'
+    attendance.cost = 2
+    attendance.description = 'Show the number of meetings you have attended, or get your private web check-in link'
 
     async def hub(self,command:list,message:discord.Message):
+        from credentials import JUPYTER_HUB_API_ENDPOINT, JUPYTER_HUB_API_TOKEN
         username_to_generate=re.match(r'(?P<n>.+)@choate\.edu',bot.users_cache[message.author.id].school_email).group('n')
         async with aiohttp.ClientSession() as session:
             res=await session.post(JUPYTER_HUB_API_ENDPOINT+'/users',
@@ -320,19 +547,20 @@ class UserInterface(BaseInterface):
             
             
     hub.usage='hub'
+    hub.cost = 5
+    hub.limit = (3, 600)
     hub.description='Get credentials for your JupyterHub account'
 
 class AdminInterface(UserInterface):
+    throttled = False
+    
     @property
     def error_reply(self):
         return self.usage
     
     async def email(self, command: list, message: discord.Message) -> list:
         if command[0] == 'list':
-            cursor.execute('SELECT DISTINCT school_email FROM oauth_record WHERE opt_out_email=0')
-            reply = ''
-            for res in cursor.fetchall():
-                reply += res[0] + '\n'
+            return await send_export(message.author, 'emails', MAILING_LIST_QUERY.format(columns='r.school_email'))
         elif command[0]=='send':
             return await send_email(self)
         else:
@@ -341,22 +569,23 @@ class AdminInterface(UserInterface):
         return split_message(reply)
     
     email.usage = 'email list'
-    email.description = 'List all unique emails in the database (admin privilege)'
+    email.description = 'List all unique emails in the database as a CSV file (admin privilege)'
     
     async def meeting(self, command: list, message: discord.Message) -> list:
-        global attendance_key, effective_meeting_count
         if command[0] == 'begin' or command[0] == 'start':
-            attendance_key = secrets.token_hex(3)
+            weight = 1
             try:
-                effective_meeting_count = float(command[1])
+                weight = float(command[1])
             except (IndexError, ValueError):
                 pass
             
-            reply = 'Attendance key: `%s`. The meeting today counts as %d meeting(s)' % (
-                attendance_key, effective_meeting_count)
+            meeting = self.context.begin_meeting(weight)
+            reply = 'Attendance key: `%s`. The meeting today counts as %d meeting(s). Web check-in: %s' % (
+                meeting.key, weight, CHECKIN_URL.format(key=meeting.key))
         elif command[0] == 'end' or command[0] == 'stop':
-            attendance_key = secrets.token_hex(64)
-            effective_meeting_count = 1
+            if self.context.meeting is None:
+                return 'There is no meeting in progress.',
+            self.context.end_meeting()
             reply = 'Meeting is over. Attendance key revoked.'
         else:
             reply = self.unrecognized_command(command[0])
@@ -367,39 +596,38 @@ class AdminInterface(UserInterface):
     
     async def attendance(self, command, message):
         if command[0] == 'today':
-            cursor.execute(
-                    "SELECT first_name, last_name FROM attendance a "
-                    "JOIN (SELECT first_name, last_name, discord_user_id FROM oauth_record GROUP BY school_email) o "
-                    "ON o.discord_user_id=a.discord_user_id WHERE a.time>? AND a.time<?; ",
-                    (datetime.date.today() - datetime.timedelta(1),
-                     datetime.date.today() + datetime.timedelta(1)))
-            res = cursor.fetchall()
-            if not res:
-                return "Nobody has attended today's meeting",
-            reply = ''
-            for p in res:
-                reply += p[0] + ' ' + p[1] + '\n'
-            return split_message(reply)
+            return await send_export(
+                    message.author, 'attendance-today',
+                    "SELECT DISTINCT r.first_name, r.last_name, r.school_email FROM attendance a " + PERSON_JOIN +
+                    "WHERE a.meeting_id=(SELECT max(id) FROM meeting WHERE guild_id=?) ORDER BY r.last_name, r.first_name",
+                    (self.context.guild_id,), empty_reply="Nobody has attended today's meeting")
         if command[0] == 'summary':
-            reply = ''
-            cursor.execute(
-                    "SELECT first_name, last_name, count() as total, sum(a.effective) as effective FROM attendance a "
-                    "JOIN (SELECT first_name, last_name, discord_user_id FROM oauth_record GROUP BY school_email) o "
-                    "ON o.discord_user_id=a.discord_user_id GROUP BY a.discord_user_id ORDER BY effective DESC, total DESC"
-            )
-            res = cursor.fetchall()
-            for first_name, last_name, total, effective in res:
-                reply += '{name:<20} {effective:>4} (actual {total:>2})\n'.format(
-                        name=first_name + ' ' + last_name,
-                        effective=int(effective) if effective % 1 == 0 else round(
-                                effective, 1),
-                        total=total)
-            
-            return split_message(reply, '```')
+            return await send_export(
+                    message.author, 'attendance-summary',
+                    "SELECT r.first_name, r.last_name, r.school_email, sum(a.effective) as effective, count() as total "
+                    "FROM attendance a JOIN meeting m ON m.id=a.meeting_id " + PERSON_JOIN +
+                    "WHERE m.guild_id=? GROUP BY p.id ORDER BY effective DESC, total DESC", (self.context.guild_id,))
+        if command[0] == 'analytics':
+            attendance_analytics = startup_timer.lazy_import('attendance_analytics')
+            threshold = attendance_analytics.DEFAULT_THRESHOLD
+            for arg in command[1:]:
+                try:
+                    threshold = float(arg)
+                except ValueError:
+                    pass
+            analytics = attendance_analytics.get(conn, PERSON_JOIN, export_cache.data_version(),
+                                                 self.context.guild_id)
+            reply = split_message(analytics.report(threshold), '```')
+            if 'csv' in command[1:]:
+                await send_messages(message.author, reply)
+                await message.author.send(file=discord.File(analytics.to_csv(threshold),
+                                                            filename=f'attendance-analytics-{datetime.date.today()}.csv.gz'))
+                return ()
+            return reply
         else:
             return await super().attendance(command, message)
     
-    attendance.usage = 'attendance {today|summary}'
+    attendance.usage = 'attendance {today|summary|analytics [csv] [threshold=0.5]}'
     attendance.description = 'Show attendance status (admin privilege)'
     
     async def announcement(self, command, message):
@@ -408,31 +636,103 @@ class AdminInterface(UserInterface):
     
     announcement.usage = 'announcement'
     announcement.description = 'Make announcement (admin privilege)'
+    
+    async def reconcile(self, command, message):
+        if not self.context.signup:
+            return 'Members of this server do not join through the signup form.',
+        return await reconcile_members(self)
+    
+    reconcile.usage = 'reconcile'
+    reconcile.description = 'Re-add signed up members missing from the server and restore their nicknames (admin privilege)'
+    
+    async def memory(self, command, message):
+        return split_message(memory_report(), '```')
+    
+    memory.usage = 'memory'
+    memory.description = 'Show the resident size of the bot and the bytes held by each of its caches (admin privilege)'
+    
+    async def startup(self, command, message):
+        return split_message(startup_timer.report(), '```')
+    
+    startup.usage = 'startup'
+    startup.description = 'Show how long importing, initializing and connecting took, step by step (admin privilege)'
+    
+    async def ratelimits(self, command, message):
+        return split_message(ratelimit.format_budgets(governor.budgets()), '```')
+    
+    ratelimits.usage = 'ratelimits'
+    ratelimits.description = 'Show what is left of the Discord rate limits shared by the bot, the worker, signups and sweeps (admin privilege)'
+    
+    async def jobs(self, command, message):
+        if command and command[0] == 'cancel':
+            try:
+                job_id = int(command[1].lstrip('#'))
+            except ValueError:
+                return self.unrecognized_command(command[1]),
+            if job_queue.cancel(job_id):
+                return f'Job #{job_id} cancelled.',
+            return f'Job #{job_id} is not queued or running.',
+        recent = job_queue.recent()
+        if not recent:
+            return 'There are no jobs.',
+        return split_message('\n'.join(jobs.describe(job) for job in recent), '```')
+    
+    jobs.usage = 'jobs [cancel $id]'
+    jobs.description = 'Show the latest jobs run by the worker, or cancel one (admin privilege)'
 
 
 class ServerAdminInterface(AdminInterface):
+    _sql_session = None
+    
     async def sql(self, command: list, message: discord.Message) -> list:
-        command = list(map(lambda s: s.lower(), command))
+        sql_console = startup_timer.lazy_import('sql_console')
+        subcommand = command[0].lower()
+        if subcommand == 'more':
+            session = self._sql_session
+            if session is None or session.exhausted:
+                return 'There are no more rows to show.',
+        else:
+            if self._sql_session is not None:
+                self._sql_session.close()
+            query = message.content.split(None, 2 if subcommand == 'csv' else 1)[-1]
+            session = self._sql_session = sql_console.QuerySession(query, database_path)
+        
         try:
-            if 'select' not in command or any(
-                    kw in command
-                    for kw in ('update', 'insert', 'drop', 'alter', 'table',
-                               'into', 'create', 'value')):
-                reply = "Only SELECT statement is allowed."
-            else:
-                cursor.execute(' '.join(command))
-                reply = str(' '.join(col[0] for col in cursor.description) +
-                            '\n' + '\n'.join(map(str, (cursor.fetchall()))))
-        except:
-            reply = str(traceback.format_exc())
+            if subcommand == 'csv':
+                binary = await bot.loop.run_in_executor(None, session.to_csv)
+                await message.author.send(file=discord.File(binary, filename='query.csv.gz'))
+                return ()
+            rows = await bot.loop.run_in_executor(None, session.next_page)
+            reply = list(sql_console.format_rows(session.columns, rows))
+            if len(reply) > 3:  # too long to read in chat anyway
+                binary = await bot.loop.run_in_executor(None, session.to_csv, rows)
+                await message.author.send('The result is too long, so here it is as a CSV file.',
+                                          file=discord.File(binary, filename='query.csv.gz'))
+                return ()
+        except sql_console.QueryError as e:
+            return split_message(str(e), enclose_in='```')
         
-        return split_message(reply, enclose_in='```')
+        if not session.exhausted:
+            reply.append(f'Showing rows {session.rows_read - len(rows) + 1}-{session.rows_read}. '
+                         'Type `sql more` for the next page or `sql csv $query` for the whole result.')
+        return reply
+    
+    sql.usage = 'sql {$sql_select_query|more|csv $sql_select_query}'
+    sql.description = 'Query the database read-only, one page at a time. The tables include `oauth_record`, `oauth_person`, `oauth_identity`, `attendance`, `meeting`, `job` and `job_progress`; `sql SELECT name FROM sqlite_master` lists them all (server admin privilege)'
     
-    sql.usage = 'sql $sql_select_query'
-    sql.description = 'Query the database. Currently existing tables are `oauth_record` and `attendance` (server admin privilege)'
+    async def sweep(self, command: list, message: discord.Message):
+        if message.author.id not in SERVER_ADMIN_IDS:
+            return ('Permission denied',)
+        job_id = job_queue.enqueue('sweep', {'args': command, 'timeout': SWEEP_TIMEOUT},
+                                   requested_by=message.author.id, channel_id=message.channel.id)
+        bot.loop.create_task(follow_job(job_id, message.channel))
+        return f'Sweep queued as job #{job_id}.',
+    
+    sweep.usage = 'sweep [--dry-run] [--restart] [--into $table]'
+    sweep.description = 'Refresh every OAuth token and copy the deduplicated records into another table, run by the worker (server admin privilege)'
     
     async def shell(self, command: list, message: discord.Message) -> tuple:
-        if message.author in server_admins:
+        if message.author.id in SERVER_ADMIN_IDS:
             await self.run_shell(command, message.channel)
             return ()
         else:
@@ -442,7 +742,7 @@ class ServerAdminInterface(AdminInterface):
     shell.description = 'Run shell command `$*` in `/srv/CPUBot/` on cpu.party server with root privilege (server admin privilege)'
     
     async def restart(self, command: list, message: discord.Message):
-        if message.author in server_admins:
+        if message.author.id in SERVER_ADMIN_IDS:
             await self.run_shell(['service', 'CPUBot', 'restart'],
                                  message.channel)
             return ()
@@ -452,108 +752,165 @@ class ServerAdminInterface(AdminInterface):
     restart.usage = 'restart'
     restart.description = 'Restart CPUBot (server admin privilege)'
     
+    async def profile(self, command: list, message: discord.Message):
+        if message.author.id not in SERVER_ADMIN_IDS:
+            return ('Permission denied',)
+        try:
+            amount = float(command[0]) if command else 10
+        except ValueError:
+            return self.unrecognized_command(command[0]),
+        by_events = command[1:2] == ['events']
+        
+        profiling = startup_timer.lazy_import('profiling')
+        profiler = profiling.Profiler()
+        try:
+            profiler.start()
+        except profiling.ProfilerBusy as e:
+            return str(e),
+        try:
+            await message.author.send(f"Profiling the next {amount:g} {'gateway events' if by_events else 'seconds'}.")
+            if by_events:
+                counter = itertools.count(1)
+                try:
+                    await bot.wait_for('socket_response', check=lambda msg: next(counter) >= amount,
+                                       timeout=PROFILE_MAX_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(min(amount, PROFILE_MAX_SECONDS))
+        finally:
+            profiler.stop()
+        
+        reports = await bot.loop.run_in_executor(None, profiler.reports)
+        await message.author.send('```' + profiler.summary() + '```',
+                                  files=[discord.File(io.BytesIO(data), filename=name) for name, data in reports.items()])
+        return ()
+    
+    profile.usage = 'profile [$seconds=10|$n events]'
+    profile.description = 'Profile the event loop with cProfile and tracemalloc for some seconds or gateway events, then upload the top functions and allocation sites (server admin privilege)'
+    
+    async def stalls(self, command: list, message: discord.Message):
+        if command and command[0] == 'clear':
+            loop_watchdog.clear()
+            return 'Stall log cleared.',
+        return split_message(loop_watchdog.report(), '```')
+    
+    stalls.usage = 'stalls [clear]'
+    stalls.description = 'Show where the event loop was blocked for longer than the watchdog threshold (server admin privilege)'
+    
     @staticmethod
     async def run_shell(command: list, channel):
         timeout = 15
         if command[0] in ('aria2c', 'curl', 'wget', 'git', 'http'):
             timeout = 120
         
-        def kill(proc):
-            if proc.returncode is None:
-                proc.kill()
-                proc.killed_by_bot = True
-        
         command = ' '.join(command)
-        await channel.send("Executing shell command `%s`" % command)
-        async with channel.typing():
-            PIPE = asyncio.subprocess.PIPE
-            DEVNULL = asyncio.subprocess.DEVNULL
-            proc = await asyncio.subprocess.create_subprocess_shell(
-                    command, stdin=DEVNULL, stderr=PIPE, stdout=PIPE)
-            proc.killed_by_bot = False
-            bot.loop.call_later(timeout, kill, proc)
-            buffer = ''
-            timer = time.time()
-            while proc.returncode is None:
-                if not proc.stdout.at_eof():
-                    buffer += (await proc.stdout.readline()).decode()
-                if not proc.stderr.at_eof():
-                    buffer += (await proc.stderr.readline()).decode()
-                
-                if time.time() - timer > 1 or len(buffer) > 1500:
-                    asyncio.ensure_future(
-                            split_send_message(channel, buffer, '```'))
-                    buffer = ''
-                    timer = time.time()
-                    await asyncio.sleep(0.1)
-            buffer += (await proc.stdout.read()).decode()
-            buffer += (await proc.stderr.read()).decode()
-            if buffer:
-                await split_send_message(channel, buffer, '```')
-            if proc.killed_by_bot:
-                await channel.send(
-                        "Operation exceeded the %d seconds timeout, so I had to kill it:sweat_smile:"
-                        % timeout)
-            await channel.send(
-                    "Process terminated with exit code %d" % proc.returncode)
-
-
-@bot.event
+        # commands are not idempotent, so they are not retried
+        job_id = job_queue.enqueue('shell', {'command': command, 'timeout': timeout}, channel_id=channel.id,
+                                   max_attempts=1)
+        await channel.send("Executing shell command `%s` as job #%d" % (command, job_id))
+        bot.loop.create_task(follow_job(job_id, channel))
+
+
+def command_words() -> set:
+    """Every word in the usage of every command, which gateway traces keep."""
+    words = set()
+    for cls in ServerAdminInterface.__mro__:
+        for attr in cls.__dict__.values():
+            if isinstance(attr, types.FunctionType) and hasattr(attr, 'usage'):
+                words.update(re.findall(r'[a-z]+', attr.usage))
+    return words
+
+
+async def on_socket_response(msg):  # registered by init() when recording a trace
+    trace_recorder.record(msg)
+
+
+async def get_user(user_id):
+    """bot.get_user, falling back to the API for users not cached, e.g. offline members in low memory mode"""
+    user = bot.get_user(user_id)
+    if user is None:
+        try:
+            user = await bot.fetch_user(user_id)
+        except discord.HTTPException:
+            pass
+    return user
+
+
+async def fetch_members(guild):
+    """Make sure guild.members is complete. Without fetch_offline_members, large guilds only come with online members."""
+    if guild.large and len(guild.members) < guild.member_count:
+        await bot.request_offline_members(guild)
+
+
 async def on_ready():
     print('Logged in as %s' % bot.user.name)
     game = discord.Game("with the source code of life")
     await bot.change_presence(activity=game)
-    global jerry, server_admins, admins, CPU_guild
-    jerry = bot.get_user(268759214610972673)
-    server_admins = [
-        bot.get_user(387486747770224642),  # Andrew
-    ]
-    
-    server_admins.append(jerry)
-    
-    admins = [
-                 bot.get_user(456243117671055371),  # Ethan
-                 bot.get_user(179685458991644673),  # Spencer
-             ] + server_admins
-    
-    CPU_guild = discord.utils.find(lambda g: g.id == CPU_guild_id, bot.guilds)
-
-
-EMAIL_TEMPLATE = string.Template("""
-Hi $name,
-
-$body
-
-Your beloved,
-CPU Bot
-""")
-EMAIL_HTML_TEMPLATE = string.Template(f"""
-<!DOCType html>
-<html>
-<head>
-    <title>$subject</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        .monospace {{
-            font-family: 'Courier New', monospace;
-        }}
-    </style>
-</head>
-    <body>
-    <img src="https://cpu.party/img/logos/1024w.jpg" width="100%" alt="CPU Logo">
-    <div class="monospace">
-<p>Hi $name,</p>
-
-$body
-
-<p>
-Your beloved,<br>
-CPU Bot
-</p>
-</div>
-    </body>
-</html>
-""")
+    global jerry
+    jerry = await get_user(JERRY_ID)
+    
+    if not hasattr(bot, 'token_refresher_task'):  # on_ready is called again after reconnecting
+        bot.token_refresher_task = bot.loop.create_task(token_refresher.run())
+        bot.loop.create_task(database.checkpoint_periodically(database_path))
+        bot.loop.create_task(resume())
+        startup_timer.mark_ready()
+        logger.info('Startup timing:\n%s', startup_timer.report())
+    if loop_watchdog.ident is None:
+        loop_watchdog.start()
+
+
+async def send_export(to, name, query, params=(), empty_reply='There is nothing to export.'):
+    """Upload the result of query as a single gzip CSV attachment. Repeated exports are served from cache."""
+    result = export_cache.export(query, params)
+    if not result.rows:
+        return empty_reply,
+    await to.send(f"{result.rows} row{'s' if result.rows > 1 else ''}",
+                  file=discord.File(io.BytesIO(result.data), filename=f'{name}-{datetime.date.today()}.csv.gz'))
+    return ()
+
+
+def memory_report() -> str:
+    profiling = startup_timer.lazy_import('profiling')
+    state = bot._connection
+    interfaces = [cls._interfaces for cls in (UserInterface, AdminInterface, ServerAdminInterface)]
+    analytics = getattr(sys.modules.get('attendance_analytics'), '_cache', {})  # not imported until first used
+    # objects shared between caches are counted in the first one holding them
+    caches = (
+        ('discord users', len(state._users), state._users),
+        ('discord guilds, members', sum(len(guild.members) for guild in bot.guilds), state._guilds),
+        ('discord DM channels', len(state._private_channels), state._private_channels),
+        ('discord emojis', len(state._emojis), state._emojis),
+        ('discord messages', len(state._messages or ()), state._messages),
+        ('users_cache', len(bot.users_cache), bot.users_cache),
+        ('interfaces', sum(map(len, interfaces)), interfaces),
+        ('pending conversations', sum(map(len, bot._listeners.values())), bot._listeners),
+        ('export cache', len(export_cache._cache), export_cache._cache),
+        ('attendance analytics', sum(len(cached.analytics.names) for cached in analytics.values()), analytics),
+        ('stall log', len(loop_watchdog.stalls), loop_watchdog.stalls),
+        ('command throttles', len(command_throttle.buckets) + len(slow_down_replies.buckets)
+         + sum(len(limit.buckets) for limit in command_limits.values()),
+         (command_throttle, command_limits, slow_down_replies)),
+    )
+    opaque = (discord.Client, type(state), type(bot.http), asyncio.AbstractEventLoop, sqlite3.Connection,
+              sqlite3.Cursor, logging.Logger)
+    seen = set()
+    
+    current, peak = profiling.resident_size()
+    conversations = sum(interface._dispatch_locked for by_channel in interfaces for interface in by_channel.values())
+    lines = [f"Resident size {current / 2 ** 20:.1f} MiB, peak {peak / 2 ** 20:.1f} MiB"
+             if current is not None else f"Peak resident size {peak / 2 ** 20:.1f} MiB",
+             f"Low memory mode {'on' if LOW_MEMORY else 'off'}, {conversations} conversations in progress",
+             f"{handler_slots.in_flight} commands in flight, {handler_slots.shed} turned away when busy, "
+             f"{command_throttle.limited} throttled",
+             '', f"{'Cache':<26}{'Items':>8}{'KiB':>10}"]
+    total = 0
+    for name, items, cache in caches:
+        size = profiling.deep_sizeof(cache, seen, opaque)
+        total += size
+        lines.append(f'{name:<26}{items:>8}{size / 1024:>10.1f}')
+    lines.append(f"{'total':<26}{'':>8}{total / 1024:>10.1f}")
+    return '\n'.join(lines)
 
 
 async def send_email(interface: AdminInterface):
@@ -564,105 +921,247 @@ async def send_email(interface: AdminInterface):
         await con.send("Please enter the email body. Do not include any greeting or signature.")
         body = await con.recv()
         plain_body=body.clean_content
+        html_body = startup_timer.lazy_import('mail').linkify('<p>' + plain_body.replace('\n\n', '</p><p>') + '</p>')
+        email = {'subject': subject, 'plain_body': plain_body, 'html_body': html_body}
+        
+        sender = bot.users_cache[body.author.id]
+        job_id = job_queue.enqueue('email', dict(email, recipients=[[sender.first_name, sender.school_email]], sample=True),
+                                   requested_by=body.author.id, channel_id=body.channel.id)
         async with body.channel.typing():
-            html_body = '<p>' + plain_body
-            html_body = html_body.replace('\n\n', '</p><p>')
-            html_body += '</p>'
-            
-            # Scan for potential urls
-            for link in re.findall(r'https?://(?:www\.)?[-a-zA-Z0-9@:%._+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b[-a-zA-Z0-9()@:%_+.~#?&/=]*',html_body):
-                link=link
-                if link.endswith('.'):
-                    link=link[:-1]
-                html_body=html_body.replace(link,f'<a href="{link}">{link}</a>')
+            try:
+                job = await asyncio.wait_for(job_queue.watch(job_id), SAMPLE_EMAIL_TIMEOUT)
+            except asyncio.TimeoutError:
+                job_queue.cancel(job_id)
+                return ['The sample email was not sent in time. Is the worker running?']
+        if job.state == jobs.CANCELLED:
+            return ['The sample email job was cancelled']
+        if job.state != jobs.DONE or job.result['failed']:
+            return split_message(f'Could not send the sample email: {job.error or job.result["failed"][0]}')
         
-            sample_email=MIMEMultipart("alternative")
-            sample_email["Subject"]='(sample) '+subject
-            sample_email["From"]="CPU Bot<bot@cpu.party>"
-            sample_email["To"]=bot.users_cache[body.author.id].school_email
-            sample_email.attach(MIMEText(EMAIL_TEMPLATE.substitute(
-                    {
-                        'name':bot.users_cache[body.author.id].first_name,
-                        'body':plain_body
-                    }),'plain')
-            )
-            sample_email.attach(MIMEText(
-                    EMAIL_HTML_TEMPLATE.safe_substitute({
-                        'body'   : html_body,
-                        'subject': subject,
-                        'name':bot.users_cache[body.author.id].first_name
-                    }),'html'))
-            with smtplib.SMTP("mail.cpu.party") as email_server:
-                email_server.connect('mail.cpu.party',587)
-                email_server.starttls()
-                email_server.ehlo_or_helo_if_needed()
-                email_server.login('bot@cpu.party',EMAIL_HOST_PASSWORD)
-                email_server.ehlo()
-                email_server.send_message(sample_email)
-                
         await con.send("I have sent you a sample email. It may take up to 5 minutes to arrive. If it looks ok, type `proceed` to send it to everyone. Type `cancel` to cancel")
-            
+        
         res=await con.recv()
         if res.clean_content.lower()!='proceed':
             return ['Operation canceled']
+        schedule = await ask_schedule(con)
+        if schedule is None:
+            return ['Operation canceled']
+        start, spread = schedule
+        cursor.execute(MAILING_LIST_QUERY.format(columns='r.first_name, r.school_email'))
+        recipients = cursor.fetchall()
+        job_id = job_queue.enqueue('email', dict(email, recipients=recipients, spread=spread),
+                                   requested_by=body.author.id, channel_id=body.channel.id,
+                                   run_after=start.timestamp())
+    bot.loop.create_task(follow_job(job_id, interface._channel))
+    return [f'Sending {len(recipients)} emails as job #{job_id} {describe_schedule(start, spread)}. '
+            f'I will report the progress here. `jobs cancel {job_id}` cancels it.']
+
+
+def parse_schedule(text, now=None):
+    """
+    When to send a campaign: `now`, `quiet` for the next QUIET_HOURS, `HH:MM` for the next such time or
+    `YYYY-MM-DD HH:MM`, optionally followed by `over $minutes` to spread out the sends.
+    Sends in the quiet hours are spread over what is left of them unless told otherwise.
+    :return: (datetime to start at, seconds to spread the sends over)
+    :raise ValueError: if text is none of those, or in the past
+    """
+    now = now or datetime.datetime.now()
+    words = text.lower().split()
+    spread = None
+    if len(words) > 2 and words[-2] == 'over':
+        try:
+            spread = float(words[-1]) * 60
+        except ValueError:
+            raise ValueError(f'`{words[-1]}` is not a number of minutes') from None
+        if not 0 <= spread < 7 * 24 * 3600:
+            raise ValueError(f'Cannot spread sends over {words[-1]} minutes')
+        words = words[:-2]
+    when = ' '.join(words)
+    if when == 'now':
+        start = now
+    elif when == 'quiet':
+        start = now.replace(hour=QUIET_HOURS[0], minute=0, second=0, microsecond=0)
+        end = start.replace(hour=QUIET_HOURS[1])
+        if now >= end:
+            start += datetime.timedelta(days=1)
+            end += datetime.timedelta(days=1)
+        start = max(start, now)
+        if spread is None:
+            spread = (end - start).total_seconds()
+    else:
+        try:
+            start = datetime.datetime.strptime(when, '%Y-%m-%d %H:%M')
+        except ValueError:
+            try:
+                start = datetime.datetime.combine(now.date(), datetime.datetime.strptime(when, '%H:%M').time())
+            except ValueError:
+                raise ValueError(f'I do not understand `{when}`') from None
+            if start < now:
+                start += datetime.timedelta(days=1)
+        if start < now:
+            raise ValueError(f'{when} has passed')
+    return start, spread or 0
+
+
+def describe_schedule(start, spread) -> str:
+    reply = 'now' if start <= datetime.datetime.now() else f'at {start:%Y-%m-%d %H:%M}'
+    if spread:
+        reply += f', spread over {spread / 60:.0f} minutes'
+    return reply
+
+
+async def ask_schedule(con: Conversation):
+    """:return: (start, spread) of a campaign as parse_schedule returns them, or None if cancelled"""
+    await con.send(
+            f"When should I send it? `now`, `quiet` for the next quiet hours ({QUIET_HOURS[0]}:00 to "
+            f"{QUIET_HOURS[1]}:00), or a time like `18:30` or `2026-10-20 18:30`, optionally followed by "
+            f"`over $minutes` to spread out the sends. Type `cancel` to cancel.")
+    while True:
+        answer = (await con.recv()).clean_content
+        if answer.lower() == 'cancel':
+            return None
+        try:
+            return parse_schedule(answer)
+        except ValueError as e:
+            await con.send(f'{e}. Please try again, or type `cancel` to cancel.')
+
+
+async def follow_job(job_id, to):
+    """Show the progress of a job to `to`, a user or DM channel, in one message until it finishes, then report on it."""
+    followed_jobs[job_id] = getattr(to, 'recipient', to).id
+    try:
+        job = job_queue.get(job_id)
+        reporter = progress.ProgressReporter(to, f'Job #{job.id} {job.kind}', job.total, job.done or 0,
+                                             PROGRESS_INTERVAL)
+        
+        async def on_progress(job):
+            reporter.update(job.done, job.total, job.note)
+        
+        job = await job_queue.watch(job_id, on_progress)
+        if job.state == jobs.DONE:
+            await JOB_REPORTS[job.kind](job, reporter)
         else:
-            with smtplib.SMTP("mail.cpu.party") as email_server:
-                email_server.connect('mail.cpu.party',587)
-                email_server.starttls()
-                email_server.ehlo_or_helo_if_needed()
-                email_server.login('bot@cpu.party',EMAIL_HOST_PASSWORD)
-                email_server.ehlo()
-                
-                cursor.execute('SELECT count() FROM oauth_record WHERE opt_out_email=0')
-                total=cursor.fetchone()[0]
+            reply = f'Job #{job.id} {job.kind} {job.state}.'
+            if job.error:
+                reply += f'\n```{job.error[-1500:]}```'
+            await reporter.finish(reply)
+    except asyncio.CancelledError:
+        raise  # shutting down: the snapshot keeps the job followed
+    except:
+        await on_error('follow job')
+    followed_jobs.pop(job_id, None)
 
-                cursor.execute('SELECT first_name, school_email FROM oauth_record WHERE opt_out_email=0')
-                count=0
-                
-                for name, email_addr in cursor.fetchall():
-                    try:
-                        email = MIMEMultipart("alternative")
-                        email["Subject"] = subject
-                        email["From"] = "CPU Bot<bot@cpu.party>"
-                        email["To"] = email_addr
-                        email.attach(MIMEText(EMAIL_TEMPLATE.substitute(
-                                {
-                                    'name': name,
-                                    'body': plain_body
-                                }), 'plain')
-                        )
-                        email.attach(MIMEText(
-                                EMAIL_HTML_TEMPLATE.safe_substitute({
-                                    'body'   : html_body,
-                                    'subject': subject,
-                                    'name'   : name
-                                }), 'html'))
-                        
-                        email_server.send_message(email)
-                        
-                        count+=1
-                        if count%10==0:
-                            await con.send(f'Progress: {count}/{total}')
-                    except:
-                        await on_error('Send email')
-            return [f'A total of {count} emails have been sent']
-            
-            
-            
 
+# Each reports on a finished job in the message that showed its progress, followed by details that do not fit there
+async def report_email(job, reporter):
+    await reporter.finish(f"A total of {job.result['sent']} emails have been sent")
+    if job.result['failed']:
+        await split_send_message(reporter.to, 'Failed for:\n' + '\n'.join(job.result['failed']))
+
+
+async def report_shell(job, reporter):
+    result = job.result
+    reply = "Process terminated with exit code %d" % result['returncode']
+    if result['killed']:
+        reply = ("Operation exceeded the %d seconds timeout, so I had to kill it:sweat_smile:\n"
+                 % job.payload['timeout']) + reply
+    await reporter.finish(reply)
+    if result['output']:
+        await split_send_message(reporter.to, result['output'], '```')
+
+
+async def report_output(job, reporter):
+    await reporter.finish(f'Job #{job.id} {job.kind} done.')
+    if job.result['output']:
+        await split_send_message(reporter.to, job.result['output'], '```')
+
+
+async def reconcile_members(interface: AdminInterface, concurrency=5):
+    guild = interface.context.guild
+    with Conversation(interface) as con:
+        await fetch_members(guild)
+        member_ids = {member.id for member in guild.members}
+        cursor.execute(
+                'SELECT id, discord_user_id, first_name, last_name, expires_at FROM oauth_record '
+                'WHERE join_success=1 AND access_token IS NOT NULL AND discord_user_id IS NOT NULL')
+        missing = [record for record in cursor.fetchall() if record[1] not in member_ids]
+        unnamed = [member for member in guild.members
+                   if member.nick is None and not member.bot and member.id in bot.users_cache]
+        if not missing and not unnamed:
+            return ['Every signed up member is in the server with a nickname.']
         
+        await con.send(f"{len(missing)} signed up members are not in the server (including anyone who left on purpose) "
+                       f"and {len(unnamed)} members have no nickname. Re-add and rename them? yes/no")
+        if (await con.recv()).content.lower() != 'yes':
+            return ['Operation cancelled']
         
+        soon = datetime.datetime.utcnow() + datetime.timedelta(minutes=5)
+        expired = [record[0] for record in missing if (parse_timestamp(record[4]) or datetime.datetime.min) < soon]
+        if expired:
+            await con.send(f'Refreshing {len(expired)} expired tokens first.')
+            await token_refresher.refresh_now(expired)
         
-    
+        total = len(missing) + len(unnamed)
+        semaphore = asyncio.Semaphore(concurrency)  # discord.py queues on the route bucket, this bounds the backlog
+        reporter = progress.ProgressReporter(interface._channel, f'Reconciling {total} members', total,
+                                             interval=PROGRESS_INTERVAL)
+        done = []
+        failed = []
+        
+        async def report(name, error=None):
+            done.append(name)
+            if error is not None:
+                failed.append(f'{name}: {error}')
+            reporter.update(len(done), note=f'{len(failed)} failed' if failed else None)
+        
+        async def readd(record_id, user_id, first_name, last_name):
+            async with semaphore:
+                cursor.execute('SELECT access_token FROM oauth_record WHERE id=?', (record_id,))
+                access_token = cursor.fetchone()[0]  # possibly just refreshed
+                reconciling_user_ids.add(user_id)
+                try:
+                    await bot.http.request(
+                            Route('PUT', '/guilds/{guild_id}/members/{user_id}', guild_id=guild.id, user_id=user_id),
+                            json={'access_token': access_token, 'nick': f'{first_name} {last_name}'})
+                except discord.HTTPException as e:
+                    reconciling_user_ids.discard(user_id)
+                    await report(f'{first_name} {last_name}', e)
+                else:
+                    await report(f'{first_name} {last_name}')
+        
+        async def rename(member):
+            async with semaphore:
+                name = f'{bot.users_cache[member.id].first_name} {bot.users_cache[member.id].last_name}'
+                try:
+                    await member.edit(nick=name)
+                except discord.HTTPException as e:
+                    await report(name, e)
+                else:
+                    await report(name)
+        
+        reporter.update(0)
+        await asyncio.gather(*(readd(*record[:4]) for record in missing), *(rename(member) for member in unnamed))
+        
+        await reporter.finish(f'Reconciled {total - len(failed)}/{total} members '
+                              f'({len(missing)} to re-add, {len(unnamed)} to rename).')
+        if failed:
+            return split_message('Failed for:\n' + '\n'.join(failed))
+        return ()
 
 
-@bot.event
 async def on_member_join(member:discord.Member):
+    context = GuildContext.get(member.guild.id)
+    if context is None:
+        return  # not a guild we serve
+    if member.id in reconciling_user_ids:
+        reconciling_user_ids.discard(member.id)
+        return  # restored by reconcile_members, not a new member
     
-    if member.nick is None:
-        await CPU_guild.kick(member,'You must use the signup form to join the server.')
-        
-    await member.send('''
+    if context.signup:
+        if member.nick is None:
+            await member.guild.kick(member,'You must use the signup form to join the server.')
+            
+        await member.send('''
 Welcome to CPU. Please adhere to the rules pinned in `#announcements` channel.
 use the `#general` channel of CPU server for general discussions about programming as well as the club;
 use the `#help` channel if you need any help with your programming project or homework;
@@ -678,24 +1177,25 @@ use the `#lounge` channel for memes, jokes, chats, flirting, and everything else
 Please redirect any question about me to my creator Jerry `pkqxdd#1358`.
 So good luck, have fun coding!'''.strip())
     
-    channel = discord.utils.get(member.guild.channels, name='new-members')
+    channel = context.channel('new-members')
     try:
         await channel.send(f"{member.nick} has joined the party. Welcome!")
     except AttributeError:
         pass  # Channel does not exist
 
 
-@bot.event
 async def on_message(message):
     if not message.author.bot:
         if isinstance(message.channel, discord.DMChannel):
-            if message.author in admins:
-                if message.author in server_admins:
+            context = GuildContext.for_user(message.author)
+            if context.is_admin(message.author):
+                if message.author.id in SERVER_ADMIN_IDS:
                     interface = ServerAdminInterface(message.channel)
                 else:
                     interface = AdminInterface(message.channel)
             else:
                 interface = UserInterface(message.channel)
+            interface.context = context
             try:
                 await interface.dispatch(message.content, message)
             except:
@@ -717,9 +1217,10 @@ def attach_files(names) -> list:
 
 
 async def make_announcement(interface):
-    tasks = []
     files = []
-    channel = discord.utils.get(CPU_guild.channels, name='announcements')
+    context = interface.context
+    channel = context.channel('announcements')
+    await fetch_members(context.guild)
     
     with Conversation(interface) as con:
         await con.send('Commencing announcement mode.')
@@ -769,90 +1270,73 @@ async def make_announcement(interface):
         await con.send("You are about to make this announcement")
         await con.send('-' * 40)
         await con.send(
-                message_header + message_body, files=attach_files(files))
+                message_header + message_body, files=attach_files(files) or None)  # an empty list would not be sent as JSON
         await con.send('-' * 40)
         await con.send(f"It will be sent to {len(channel.members)} people.")
         await con.send("Confirm? yes/no")
         if (await con.recv()).content.lower() != 'yes':
             await con.send("Operation cancelled")
             return
+        schedule = await ask_schedule(con)
+        if schedule is None:
+            await con.send("Operation cancelled")
+            return
+        start, spread = schedule
         
+        users_cache = {}  # members of other guilds are not named after a signup record
+        if context.signup:
+            update_cache()  # once: some people may have joined after the cache was created
+            users_cache = bot.users_cache
+        sender = interface._channel.recipient
+        sender_name = users_cache[sender.id].first_name if sender.id in users_cache else sender.name
         recipients = []
         for member in channel.members:
             if not member.bot:
-                try:
-                    message_header = f"Hi {bot.users_cache[member.id].first_name}"
-                    if bot.users_cache[member.id].opt_out_pm:
-                        continue
-                except KeyError:
-                    update_cache(
-                    )  # some people may have joined after the cache was created
-                    try:
-                        message_header = f"Hi {bot.users_cache[member.id].first_name}"
-                    except KeyError:
-                        message_header = f"Hi {member.name}"
+                user = users_cache.get(member.id)
+                if user is not None and user.opt_out_pm:
+                    continue
+                message_header = f"Hi {user.first_name if user is not None else member.name}"
                 
-                if member in admins:
-                    message_header += f", here is an announcement from CPU by {bot.users_cache[interface._channel.recipient.id].first_name}:\n"
+                if context.is_admin(member):
+                    message_header += f", here is an announcement from CPU by {sender_name}:\n"
                 else:
                     message_header += ','
-                recipients.append(member)
-                tasks.append(
-                        member.send(
-                                message_header + '\n' + message_body,
-                                files=attach_files(files)))
+                recipients.append([member.id, member.nick or member.name, message_header])
         
-        tasks.append(
-                channel.send(
-                        'Hi everyone,\n' + message_body, files=attach_files(files)))
-        future = asyncio.gather(*tasks, return_exceptions=True)
-        
-        callback = functools.partial(
-                announcement_succeeded,
-                recipients=recipients,
-                sender=interface._channel,
-                time_started=time.time(),
-                embed=discord.Embed(
-                        title='Your announcement',
-                        description='Hi $name,\n' + message_body))
-        future.add_done_callback(callback)
-        asyncio.ensure_future(future)
-
-
-def announcement_succeeded(future, recipients, sender, time_started, embed):
-    time_spent = round(time.time() - time_started, 2)
-    results = future.result()
-    failed_list = []
-    errors = []
-    try:
-        for i, res in enumerate(results):
-            if isinstance(res, Exception):
-                tb = traceback.format_tb(res.__traceback__)
-                tb = '\n'.join(tb)
-                errors.append(f'```py\n{str(res)}\n{tb}```')
-                failed_list.append(recipients[i])
-    except IndexError:
-        pass
-    
-    sch = []
-    if not failed_list:
-        msg = f"Your announcement has been successfully sent to all {len(recipients)} members in {time_spent} seconds"
-        embed.title = msg
-        sch.append(sender.send(embed=embed))
+        job_id = job_queue.enqueue('announcement', {
+            'body'      : message_body,
+            'files'     : files,
+            'channel_id': channel.id,
+            'recipients': recipients,
+            'spread'    : spread,
+        }, requested_by=interface._channel.recipient.id, channel_id=interface._channel.id,
+                run_after=start.timestamp())
+        await con.send(f'Sending the announcement to {len(recipients)} members as job #{job_id} '
+                       f'{describe_schedule(start, spread)}. `jobs cancel {job_id}` cancels it.')
+        bot.loop.create_task(follow_job(job_id, interface._channel))
+
+
+async def report_announcement(job, reporter):
+    result = job.result
+    embed = discord.Embed(title='Your announcement', description='Hi $name,\n' + job.payload['body'])
+    if not result['failed']:
+        embed.title = f"Your announcement has been successfully sent to all {result['recipients']} members in {result['seconds']} seconds"
+        await reporter.finish(None, embed=embed)
     else:
-        msg = f"Your announcement has been successfully sent to {len(recipients) - len(failed_list)}/{len(recipients)} members in {time_spent} seconds"
-        embed.title = msg
-        sch.append(sender.send(embed=embed))
-        sch.append(
-                split_send_message(
-                        sender, 'Failed for:\n' + '\n'.join(m.nick or m.name
-                                                            for m in failed_list)))
-        sch.append(split_send_message(sender, 'Errors:' + '\n'.join(errors)))
-    
-    asyncio.ensure_future(asyncio.gather(*sch))
+        embed.title = f"Your announcement has been successfully sent to {result['sent']}/{result['recipients']} members in {result['seconds']} seconds"
+        await reporter.finish(None, embed=embed)
+        await split_send_message(
+                reporter.to, 'Failed for:\n' + '\n'.join(f'{name}: {error}' for name, error in result['failed']))
+
+
+JOB_REPORTS = {
+    'email'       : report_email,
+    'announcement': report_announcement,
+    'shell'       : report_shell,
+    'sweep'       : report_output,
+}
 
 
-@bot.event
 async def on_error(event_method, *args, **kwargs):
     try:
         stacktrace = traceback.format_exc()
@@ -875,19 +1359,116 @@ async def on_error(event_method, *args, **kwargs):
         await discord.Client.on_error(bot, event_method, *args, **kwargs)
 
 
+UserCache = collections.namedtuple(
+        'Cache', ('first_name', 'last_name', 'opt_out_pm', 'opt_out_email',
+                  'school_email'))
+
+
 def update_cache():
     cursor.execute(
             'SELECT discord_user_id, first_name, last_name, opt_out_pm, opt_out_email, school_email FROM oauth_record WHERE join_success = 1'
     )
     bot.users_cache = {}
-    UserCache = collections.namedtuple(
-            'Cache', ('first_name', 'last_name', 'opt_out_pm', 'opt_out_email',
-                      'school_email'))
     for record in cursor.fetchall():
         bot.users_cache[record[0]] = UserCache(*record[1:])
 
 
-update_cache()
+def save_snapshot():
+    snapshot.save(SNAPSHOT_PATH, {
+        'users'        : [[user_id, *record] for user_id, record in bot.users_cache.items()],
+        'channels'     : {guild_id: context.channel_ids for guild_id, context in GuildContext.contexts.items()},
+        'jobs'         : followed_jobs,
+        'conversations': sorted(interrupted_user_ids),
+    })
+
+
+def load_snapshot() -> bool:
+    """Restore what save_snapshot wrote at the last shutdown. :return: False if there was nothing to restore"""
+    state = snapshot.load(SNAPSHOT_PATH, SNAPSHOT_MAX_AGE)
+    if state is None:
+        return False
+    bot.users_cache = {record[0]: UserCache(*record[1:]) for record in state['users']}
+    for guild_id, channel_ids in state['channels'].items():
+        context = GuildContext.get(int(guild_id))
+        if context is not None:
+            context.channel_ids.update(channel_ids)
+    followed_jobs.update((int(job_id), user_id) for job_id, user_id in state['jobs'].items())
+    interrupted_user_ids.update(state['conversations'])
+    return True
+
+
+async def resume():
+    """Once connected: reconcile the snapshot with the database and carry on with what the last process left."""
+    if warm_start:
+        update_cache()  # records changed while the bot was down
+    for job_id, user_id in list(followed_jobs.items()):
+        user = await get_user(user_id)
+        if user is not None:
+            bot.loop.create_task(follow_job(job_id, user))
+    for user_id in interrupted_user_ids:
+        user = await get_user(user_id)
+        try:
+            await user.send('I was restarted in the middle of our conversation. Please start over.')
+        except (AttributeError, discord.HTTPException):
+            pass
+    interrupted_user_ids.clear()
+
+
+def create_client() -> discord.Client:
+    client_class = discord.AutoShardedClient if SHARDED else discord.Client
+    client = client_class(max_messages=100, fetch_offline_members=False) if LOW_MEMORY else client_class()
+    for event in (on_ready, on_member_join, on_message, on_error):
+        client.event(event)
+    return client
+
+
+def init(path='db.sqlite3'):
+    """Create the client, open the database and load what the bot starts with. Called once, before connecting."""
+    global bot, loop_watchdog, conn, cursor, database_path, token_refresher, export_cache, job_queue, trace_recorder, \
+        governor, warm_start
+    from CPUBot.settings import CLIENT_ID, CLIENT_SECRET, REDIRECT_URI  # like oauth.views, which issued the tokens
+    with startup_timer.step('create client'):
+        bot = create_client()
+        loop_watchdog = LoopWatchdog(bot.loop, logger=logger)
+    with startup_timer.step('open database'):
+        database_path = path
+        conn = database.connect(path)
+        cursor = conn.cursor()
+        governor = ratelimit.Governor(ratelimit.path_for(path))  # shared with the worker, signups and sweeps
+        ratelimit.govern(bot.http, governor)
+        token_refresher = TokenRefresher(conn, CLIENT_ID, CLIENT_SECRET, REDIRECT_URI, governor=governor)
+        export_cache = ExportCache(conn)
+        job_queue = jobs.JobQueue(conn)  # run by worker.py
+    with startup_timer.step('load guilds and meetings'):
+        for guild_id, admin_ids in GUILDS.items():
+            GuildContext(guild_id, admin_ids)
+    with startup_timer.step('load snapshot'):
+        warm_start = load_snapshot()
+    if not warm_start:
+        with startup_timer.step('load users cache'):
+            update_cache()
+    if os.environ.get('CPUBOT_TRACE'):  # opt-in, see gateway_trace.py
+        gateway_trace = startup_timer.lazy_import('gateway_trace')
+        trace_recorder = gateway_trace.TraceRecorder(
+                os.environ['CPUBOT_TRACE'], keep_words=command_words(),
+                keep_ids=SERVER_ADMIN_IDS + tuple(itertools.chain.from_iterable(GUILDS.values())),
+                meeting_keys=lambda: [context.meeting.key for context in GuildContext.contexts.values() if context.meeting])
+        bot.event(on_socket_response)
+
+
+def main():
+    if '--startup-report' in sys.argv[1:]:  # start up without connecting
+        init()
+        print(startup_timer.report())
+        return
+    from credentials import BOT_TOKEN
+    setup_logging()
+    init()
+    try:
+        bot.run(BOT_TOKEN)  # returns on SIGTERM, e.g. from `restart`
+    finally:
+        save_snapshot()
+
 
 if __name__ == '__main__':
-    bot.run(BOT_TOKEN)
+    main()
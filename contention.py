@@ -0,0 +1,157 @@
+"""
+Contention benchmark of the shared db.sqlite3: signups, check-ins and sweeps writing at once from separate processes,
+as gunicorn's workers, bot.py and manage.py sweep do, while the bot reads attendance.
+
+    python contention.py --seconds 10
+    python contention.py --legacy          # rollback journal and sqlite3's defaults, as before database.py
+
+Each process repeats the statements of its entry point on a scratch database seeded like loadtest.py's, and counts
+the operations it completed, the ones that failed with "database is locked" and how long each took.
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import database
+from loadtest import FIRST_MEMBER_ID, GUILD_ID, seed_database
+
+SWEEP_BATCH = 50  # records, like manage.py sweep's --batch-size
+SWEEP_FETCH = 0.05  # seconds a sweep batch spends calling Discord before writing
+
+
+def signup(conn, rng, i, setup):
+    # the join view: look up the email, then add a record and its person
+    email = f'signup{os.getpid()}-{i}@choate.edu'
+    conn.execute('SELECT id FROM oauth_record WHERE school_email_normalized=?', (email,)).fetchone()
+    record_id = conn.execute(
+            'INSERT INTO oauth_record (time_requested, first_name, last_name, school_email, school_email_normalized, '
+            'state, join_success, opt_out_email, opt_out_pm) VALUES (?,?,?,?,?,?,0,0,0)',
+            (datetime.datetime.now(), 'First', 'Last', email, email, f'{os.getpid()}-{i}')).lastrowid
+    conn.execute('INSERT INTO oauth_person (record_id) VALUES (?)', (record_id,))
+    conn.commit()
+
+
+def checkin(conn, rng, i, setup):
+    # BaseInterface.handle with an attendance key
+    conn.execute('INSERT OR IGNORE INTO attendance (discord_user_id, time, effective, meeting_id) VALUES (?,?,?,?)',
+                 (rng.choice(setup['member_ids']), datetime.datetime.now(), 1, setup['meeting_id']))
+    conn.commit()
+
+
+def sweep(conn, rng, i, setup):
+    # one batch of manage.py sweep: refresh tokens, then insert the batch in one transaction
+    time.sleep(SWEEP_FETCH)
+    first = rng.randrange(1, len(setup['member_ids']) - SWEEP_BATCH)
+    conn.execute('INSERT INTO oauth_record_copy SELECT * FROM oauth_record WHERE id BETWEEN ? AND ?',
+                 (first, first + SWEEP_BATCH - 1))
+    conn.commit()
+
+
+def read(conn, rng, i, setup):
+    # attendance summary
+    conn.execute('SELECT discord_user_id, sum(effective), count() FROM attendance GROUP BY discord_user_id').fetchall()
+
+
+OPERATIONS = {'signup': signup, 'checkin': checkin, 'sweep': sweep, 'read': read}
+
+
+def run(role, path, legacy, start, seconds, setup):
+    """One process repeating the operation of `role` for `seconds` from `start`. :return: (role, latencies, locked)"""
+    conn = sqlite3.connect(path) if legacy else database.connect(path)
+    operation = OPERATIONS[role]
+    rng = random.Random()
+    latencies = []
+    locked = 0
+    time.sleep(max(0.0, start - time.time()))
+    i = 0
+    while time.time() < start + seconds:
+        began = time.perf_counter()
+        try:
+            operation(conn, rng, i, setup)
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            conn.rollback()
+            locked += 1
+        else:
+            latencies.append(time.perf_counter() - began)
+        i += 1
+    conn.close()
+    return role, latencies, locked
+
+
+def summarize(results, seconds) -> list:
+    summary = []
+    for role in OPERATIONS:
+        latencies = sorted(latency for r, role_latencies, _ in results if r == role for latency in role_latencies)
+        locked = sum(role_locked for r, _, role_locked in results if r == role)
+        processes = sum(r == role for r, _, _ in results)
+        if not processes:
+            continue
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1) if latencies else None
+
+        summary.append({
+            'role'      : role,
+            'processes' : processes,
+            'completed' : len(latencies),
+            'per_second': round(len(latencies) / seconds, 1),
+            'locked'    : locked,
+            'p50_ms'    : percentile(0.5),
+            'p99_ms'    : percentile(0.99),
+            'max_ms'    : percentile(1),
+        })
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--members', type=int, default=1000, help='signed up members in the scratch database')
+    parser.add_argument('--meetings', type=int, default=10)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--signups', type=int, default=4, help='processes signing people up, like gunicorn workers')
+    parser.add_argument('--checkins', type=int, default=2)
+    parser.add_argument('--sweeps', type=int, default=1)
+    parser.add_argument('--readers', type=int, default=1)
+    parser.add_argument('--legacy', action='store_true', help='rollback journal and no database.py configuration')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix='cpubot-contention-'), 'db.sqlite3')
+    member_ids = [FIRST_MEMBER_ID + i for i in range(args.members)]
+    seed_database(path, member_ids, args.meetings)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=%s' % ('DELETE' if args.legacy else 'WAL'))  # kept by the file
+    meeting_id = conn.execute('INSERT INTO meeting (guild_id, key, weight, start) VALUES (?,?,1,?)',
+                              (GUILD_ID, 'bench', datetime.datetime.now())).lastrowid
+    conn.execute('CREATE TABLE oauth_record_copy AS SELECT * FROM oauth_record WHERE 0')
+    conn.commit()
+    conn.close()
+
+    roles = (['signup'] * args.signups + ['checkin'] * args.checkins + ['sweep'] * args.sweeps
+             + ['read'] * args.readers)
+    setup = {'member_ids': member_ids, 'meeting_id': meeting_id}
+    start = time.time() + 1  # once every process has started
+    with multiprocessing.Pool(len(roles)) as pool:
+        results = pool.starmap(run, [(role, path, args.legacy, start, args.seconds, setup) for role in roles])
+
+    summary = summarize(results, args.seconds)
+    print(f"{'journal':<10}{'role':<10}{'procs':>6}{'done':>8}{'/s':>9}{'locked':>8}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'max ms':>9}")
+    for row in summary:
+        print(f"{'delete' if args.legacy else 'wal':<10}{row['role']:<10}{row['processes']:>6}{row['completed']:>8}"
+              f"{row['per_second']:>9}{row['locked']:>8}{row['p50_ms']!s:>9}{row['p99_ms']!s:>9}{row['max_ms']!s:>9}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'legacy': args.legacy, 'seconds': args.seconds, 'results': summary}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
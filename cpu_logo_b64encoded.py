@@ -1 +0,0 @@
-logo="""<img src="data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAABAAAAAGcCAYAAABHgdIcAAAACXBIWXMAAAJCAAACQgH+oVUDAAAgAElEQVR4nO3dT4hkabsg9PNemhlFMOuieEcYqWpnwFkIlb1yoVDZu0GQykYEB4TKgusfcKCyVy4re6erzl6KQlXtxtWXhSCDI3TmTldf1krFwa50IXfg4lcp9zJXGDjyVj/RHZ2RfyLOed8T58T5/SDo6hNVGZGRkXHO87zP+zypbdsGAAAA2G1/5OcLAAAAu08CAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGZAAgAAAABmQAIAAAAAZkACAAAAAGbgCz9kAAB2SUrpSdM0T258S5dt237ygx63lNKjpmn2bzzJT23bXg7xxG9777Rte77yF2GiUtu2fnbAipRSPvk+itvyifhg5S//7NnKkZ99yCfulaNN8zFuTdy/OLF/bNv248rfBoB7pJQOm6Y5ivPU3h1/M5+TcjB36lwzHhF0H8fP7ukdT+w6fnZnbdu+Xbm3h3jvLG73vXfOmqZ5673DlEkAwIyllA6WAvz9pT/fdfIb2kU83vlSkkCCgElbWl1a/M41i/f4UCtcUFIkjA+XEsTPIli7jM/uRdBW5bM7zmU5IHy8cuf93uWgU1XA9sRq/2nTNC82fBJX8bM7W7lnA947zJEEAMzAUjndQfz3yT0Z9qn4EBUEl4ubxABjFb+DxxEk3fe7dxXB0on3M2OXUsqr7ScbBE8X8d4uUk7dI3hclhMVR30DSTYXwfdZz0WHToF4wffOoe0BTI0EAOygWGE8WAr47ws4ds3FjaSAFdUdERdsi1XGJ0vVKldLyaDzsV3Ip5ROIvjf9CLXChOjFCv+b3ucW95H0N35vR2fB+cFz28vS5eVc7dIHr258y9sJi8IHKz7fvLeYe4kAGAHxMlsEfAfdihl22WLMtTzCA5LrTx97osgwVBfJLRONlipuY6VndNtBs/xvM96XmRanWRUInA7LbBV7CpWTzt9hqaULisktwVyAygc/C+snQSo9N75xuc0UyEBABMVwcViNfS5n+NGFk2gFkmBey8Yll7rwzuaHf7SmCj2ud779VhfrJ6/7viSXccK+uAX9JEgOi/YT0NgwtZVCNyuI2jbKAmQUsoJiFcrd5R5Pvu239QT59PLSr2Gfmjb9njl6BLvHZAAgElZCkSPZlbWX9vFbRUCHVaem7GsPk9dVLW8LZTcete27dHK0UoqXuBaYWJrIqn1+wqPv2n5dk56/7hyRzkXbdveNe2GnlJK53ck0kv5+q5KP+8d+JkEAIzc0r7no8onTX62WM3/86Zp/oOmaf7Fjq9Lr/LWuatQojlYEqBSeWljhYltSil9rLi97MGV24UBAsjmviCS7gYIwJv7gnDvHfiZBACMVJwojx6YScv4Kd3eUErpbc/OzHf5tm3b0zvuK/XccxDz/cod5bxv2/aw5vcAN/XcirOuLx9KbkV1zU8rd5Tn96yClNLZQFsWv7qZfK9YwXKT9w6jJwEAI7K02r/JWCXGTxJgTSml/P7/XcWHWLkwLCml9GkECbsPMXt92eXSsY9x+/xnFQU8pPLq/8KDVToDJSIW/tg2rnLi+uYPAz3cSkWJ9w78SgIARiBWNY5jxd9q/+7p1OhqjgYINO4sD+2rUmfroSymZTSxBeZT/L8EwcwNkJRbdm/gNFAJ94KeGwUNVP6/sPI5770Dv/rCawHb07HJHNOzF40BNQe6RwTQtVcZn+VS0ErJmCmXfe4tXRz/5iI5pdREVcHHSAp8vkkMzMaQn1sHMU3lLkP2wdl/4LmwmSHfR7e9T247Vov3DqP2R348MLwc+Mc+558E/7PxLAJc7jZUAF3r57DLCZ6nsXf3dawG/5S3O+RVtVxam1eJI6HJ7tkf8Dsa8rEAZkkCAAYk8J89CYD7DdEcqqmRaIj9rXPbvrOoGlhOCnzMn3E52SUhsDOGXjkdCxVbwE6yBQAGsCOl/hdLf768pclYE3uHlz2644Lu5vG5jDfMVQBPlE6viv2hQ3mcA/b79hp3cNv7fI4ex+fc58+6lNJVfC7k25nGWDzg0f13D0rPFmAnSQBARbEqeBy3sa8OLu/xXXQJL9EAbO19cJEoebKUIFj898kOTUXIga6JAKuGXi3evyVhRXnLCYE3KaWL+Ew4kwhj5CSrgJ0kAQCVxH7v0xEG/otu3+dLXb5HsdIRAcEiKFhJHMQc3ycRvC3+/HTlC42bleLbKRefh2dx+z6l9CGSYZIBLDwUdF8MWDGmAqCsIV/PDytHvHfgFxIAUFgEqacjKmtfLsG9nPIounjulzeTA1E+vr90G3NSQAJgN7ng21z+Pf3+RjLgrW0CozOmwOlSEDdZQ1Zc3fZYQ753bnt8GA1NAKGQXO6fu2E3TfP7EQT/75um+bZpmi/bts17zo/atn27q3Po27Y9b9v2NL7PPOItzy37umma7+Li9XrlHzE2k35vRtDqfdbdIhnwh2giqAHbeAz5u/nQYw21fepCVUpZ8Rn5fqCHu+19ctuxGi4kMRk7CQAoIC5WL6Mb9jbkwONd0zTf5OC3bdvDCIhnewETSYGTtm0P2rbNvQS+iqTIe4HaKA16wZTfHysH+1vZtkInuV/AjzFR4Dh6qbA9Q61mXrdte+/vUCSxL1buKE+fljpOB3iMi9sWO7x34Fc5UPByQEdxYZpX/V9t4TW8Xmqmde9FE6siaXMQI+GG3DLwPidoVo6SfyZDnZA+5EqRlaM95Vn4MQ6Psq7jonrWSc1tysmYARqxvstVXCtHb4jP7h9X7iinyucDP0spnVeukvz6rgSv9w78TAUAdLS06j908J8z2C9z07QoeRf8d7BUIZBP1v/DgA+9sjLBL4YqD7314rCv+F288uMsbi8+Z3+K7QEaRg7vZIBHXOsxIrh7t3JHOQ8mIejluOLL9/6u4L/59b1T8zzjvcMkSABAB7HX/8cBR9MtSvy/jJJ2jbLK+kcDPtadFycMVjpZswy15sUtP28PkAgYWD7n3NFZvZTvNqzuOK70fF7eVj5OOfH6vqzwkn5YMwA/8t5h7mwBgA3EBefZgCXjVxGsCPgrip/rTwM81HX0I+AOA5Qar1Vm3EdKKX9GPK/wpf9J0zR/2jTNX6zc86tHt0yaeLI0ZvHRBEdn3icnRo99PtYXE27OK4y27VQ2HVvwzgu+n19GooMBxKjkN4UeKQf0B+t+DnjvMHcSALCm2N/7dqC5/jnwP3FCGc4A+xKbWOUaopR2sirv0cyVNPu195FXuLhs4rkflFxhisTXk6WkweK/TwasbirhOvoD+N2qrMLv50aB203xu3bW87P7OpJIzrcDiyTAac/rqrwt8nDT91Ch985fNk3z9713mBoJAFhDSul0oL3+Av8tGaA50HX0bbBS+YCKv2+DrdIUTgIUD/7XESu+TyIpsPjzmKsH8ufn0X17gOkvPivPCiTDewX/y1JK/2XTNP/Fyh3r+VJzye2JROQ/bJrm3+jwJP73tm3/zsrRDeRJIzGCtIu/17btP5jaaw56AMA9Yrb/+QDB/1UEJ08E/9sRQcMPFR/8RPC/nrZtjys0+fphyN+t+FkfFGg49WEbwX8Te3VzY8NolplX2HL1RMpdtmOk5ruRNT18HOMDz4wOrCc+K/d77qP+oVTwH/7hypE1Cf63K17/rkH0n60c2VAemdzjn/d+fNgGCQC4Q6x+XVYuC78W+I/KSaXmQO96XmTMTuzTL5UE+DaSCoPKwU2MfHzZIVDOnw3fbSv4v09M0DiNKSR59e7L+B7HkhDI/Rc+xsoeFUTQ1vn1zb+PEqIA2yEBALeIfWnnlffBfhcl4QL/kVhatS2ZBPigM3w3kQTIgeU/6/glrmMm9FaTLzG140l8L+/jed3lIlbXn8TK++iDpBwMxvd4MyHw0PdaUy5P/141AAD81hcrR2Dmeu4HW8dF7FNVdjhCOeCKPa4l9m9X7zi/63JgmVLKne//7Q7f6umY9oNHsu9zwm+pAd/Cp10ZIRWfbcvfa66CWNyGaKK6bFENkD9zz1buBYCZUQEAS/Js6YrBf14J+ybm+Av+RyxKt/ejSqPLCubiZy34L6NrBcBoxar5+dJtZ+dHRx+BoxiB+U1sFRiyMiAnHX4XzSUBYNYkAODXZn95dehFpdfjfZT0WoGakBgrtkgErLO3+cNS+bafNdywSAZE9cPLqIgayquU0qUtAQDMmS0AzF6lmd0L11Huv9PBYJTMN0tzxJcdrPyDu32M27JfSri3Uc4d1Ro5EXASjSH3b5RuN9Es8lJlB6wneht83iYQ2yFOBtoi8DS2BIyuuSIADEECgFmrHPy/j+B/8p2Ol/YrHywF+Y8qvG63TVx4vfQ8Fn+8jqD7043/fqwZhEfAIGiAguJ39ig+j3MPlqPKDVhzkuE893vRhBWAuZEAYLYiqD2rEMRex8z3Se43XVrlXtxuC8q3bW/peT2/8fybKMX/uFiZ77s6f2Plf5H8WCQgzuPrG2kFPcTv0KLa5ij+XCsRkD9D3uTPC0kAAOZEAoBZioDuvEK56YdY9Z/MKnGU7y9u+1vo0l3D07j9khyIxMDFjaTAnT+nWI08ihXJ24KQRQLidfz93Njs7Zi6zsNULSYmDJAIyEmA/TyXfuUeANhBEgDMTsXgPweAx2NfCY7Kh8OloH8XAv51PVuuaEgpLbYS5PfD+SJ4j7Flbzd8bXIDyRcppZ3Z+gHbFmMgzyIRd1zp8yo3B3xkagcAcyABwKxUDP6/HXPJf3zfizncNfodTNXeUlLgdVQJ/JOmaf6kx/fzXJMxKGexNSDG+J1WmtbyIrYDSAIAsNOMAWQ2lhr+lQz+8wry12MM/vNKf25ylVLKe99/H6Xqgv+H9Qn+FxZNxm5ORAA6yomACNC/XnMs56ZyEkA/AAB2mgQAs1Ap+M/7/ffHtuc775lNKeXn9FPTNN9X7qbN3SQBoIL8mdu2bd7K9F2FL/8i+g4AwE6SAGDn5GA/l1/H7UmlUX+5mdzBWOa+x/d5mlLKpbJvRtq5f472opcAUFjbtrk54FcVqgHeSAIAsKskAJi8pVL3vNraNk3zh6ZpfozbT/H/JYP/d23bHoyhyVskOc7i+3w1s4Z+U/FUMAF1RJ+N/WjCWtIb1TsA7CIJACYrVvrfLpW6D7Hq/cMYmkTlLvVR5v/jzTn4jNKJHwvUsdQb4NvCD3AeFWQAsDMkAJikGNP2sVI36Lu83Pas6Aj88/f9O2X+k/I43rNAJdGM9atozlrCXmwfA4CdIQHA5EQ59e8GLnfPwf/W9nJHqf95fN+a+k2TBABUtrQl4EOhR3oa4wcBYCdIADApEfy/Gfg5by34j/4Gi1J/K/7TdjD3FwCGEM1ZDwomAV6p4AFgV3zhJ8lU5FXwuQT/se/0JBr7TdFVbNFYyA0TL9f4Pm4Gyfs71NhQ5QYMJPcFiHNGqQkwb3NCdgzNXwGgDwkApmToQHxbwf9hfK9jDnwvIsBfvn2K8tsqoiN3Tow8idujSBA8EVwDNxVOAixGeqoEAGDSJACYhDzmb+Agb/DgP68uxQXmmEr9r2Ll/jIuoj9Gee3gHkouRILgSSQFFn8uOf4RmJjCSYDnOUHbtu3Zyj0AMBESAEzFkN33txH8H0fJ/7ZX/T/EhfLn25TKXSNBkG+/uTiPi//9pZukAMxI4SSArQAATJoEAKMXK7tDrf7/V0MG/7HX/+0WZ/lfR8CcL4zPdvGitm3b85ujvCIYyLf/qGmav7Xyj+ooNZoM2NBSEuBjz0TrXiRrtzoSFgC6kgBgCobcc/lXK0cqiYvRsy2s+i+C/rO5lrIukgJLExaGcO8WBqCuG5UAfT5381SA021thwKAPowBZAqGHJ82yGOllE4i8Bwy+H/XNM03bds+atv2yD7WXxIBQ63Mz/71hm2LrUIlVu9PV44AwARIAMCAcsl/rDq/HuhRcxO/b5um+WNB/52Gek289jACsc3rXc9n8jyqCQBgUiQAYCDRy+ByoC7/eUzf123b5mZVpxpW3evkvjsLeadcGEblOBKkfQzx2QEARUkAwABSSkex77R2M8O8qvVV27YHUd7OAyIw/+H+v9XLtUABxiWSon37yzxTBQDA1EgAQGUx4u9N5f3+OfD/Msr8NZvb3EmMQKzh2Oo/jE98VvZN/h2tHAGAEZMAYAqGDGiLPlZKKe81/X7ljnIWpf5HgszuYjXwqEJDwHdDjpUENnbScyvAi5TSk5WjADBSEgBMwSQTABH8v1i5o4yr6Oiv1L+QWA08KJgEyMG/1UEYsUj+9d2iU2KqAAAMQgKAKRiye3rvx4pO/2cVg//vormfrvKFRRLgSVRWdJUTCC8F/zANUaXT53fe7zoAkyEBwOjFCk3fkU3reNe3W34O/qPZ3/OVO/u7iH3+GspVlN8DubIiB/EdSoPz+3Rf2T9MTp/P1b1o9AoAoycBwFQMEfT2eoyl4P/pyp395BXlb6Pc3z7/geQgPlda5B4L0SjstiaB+WfzPv98mqb5Y70YYJpiK1WfKoC+EwUAYBBfeJmZghxUpZS+a5rmdaWn+12BwK1G8J+DTp39tygCA30WYPed5tF+Hb/L5zkJ3LeKDABqUwHAZETpe58Vmrtc9C2rj4Z/pYP/H9q23Rf8A3OXO+3nmfs3bo9KvizRV6XPRABVAACMngQAU3N4Ryl2Vx/6XrRV6Pa/aCKnszQwWxHsv00p5eqsn5qm+fHG7Q/5vpTSacFRfKcrR9YnAQDA6EkAMClRXnlQqClg3rt90KdkM6V0Ujj4v4rnpIkcMEsR+J9HsJ8/Xx/f8zrk+17lBEEkC/omAvp89tZo/goARUkAMDnRpf0ourR3mdm+WGE/7Bn8HxXuSfAhOsgr+QdmKZKqP3bci5+TBZd9OvLHOeH9yh1ryskL71wAxkwCgMmKVfIn0YF9nW0BH+LvPum7wh4XeW9W7ujuXd9qBIApi+1UfZOqe/mzuedYvrOVI+uTAABg1EwBYNIiYM57Nhd7QPfjtiyvqF+WGs8Wj9PnAvGmd1HRADBLFXqp5CRA0zHZe9YjwSsBAMCoSQCwMyLA/1g4OP+N6Dp9FqtMJQj+gVlLKR0XDv4XchLgY4zyXFtOLKeULjpuQ+g6RhAABmELAGzmtOC4v5eCf2DOoqKq1xjWB3Td7rVR0mCZPgAAjJkEAKwp9pSWWqV6qdM/wOfgv1RF1W0ed+wH0DkBcMs2NAAYDQkAWENKab/nfOhl7wT/wNzFlqoapf83bVxhsOm2gRv6jiIEgGokAOABcZH6ttAqlT3/AD87HOh1eBxJ3E1ddHw8FQAAjJYEADzspNC+f8E/wK+G3Cvf5bEuV46sRwUAAKMlAQD3iGZOr+7+G2v70DTNsdca4BdDrpR3Ccq7jo59vHIEAEZCAgDusFT639dVXn3Ko6W81gC/KDVRZR1dkg1dKwCajlsOAKA6CQC420mBlZzrvM9V8A8wOX0+tx+tHAGAEZAAgFsULP0/btu28yoSANvhsxuAXSQBALcrUfr/g3F/AHf6cNcdFXTdz9/VkA0OAWBtEgBwQ0qpROn/h7ZtNf0DuNuQQXnX1fwhkxQAUJ0EACxJKT0p0K0/7/s37g/gfuf33ltW18fSvwWAnSIBAL+VV//3Vo5u5sTeUYAHnQ30El35TAaAn0kAQIjGfy96vh4XbduerhwF4Dfats1bAN4N8Kr4TAaAIAEAvzrp+Vp8Hvm3chSAu/T93H3IVaGmrgCwEyQA4OfV/xy4P+v5WpyY9w+wvqgC+K7iS3bscxkAfiUBAD/rWyKq9B+gg7ZtcxXARYXXLo9iHarPAABMggQAs5dSOiow9k/Xf4DuDguP3HtnFCsArJIAgP57UL+LMlYAOogy/YNCTQFz139JWQC4xRerh2A7Ukr/zhbek3+35+r/tQ7TAP1FEuAopXQWn6tdP5tLJmT3V44AwIRJADAKKaVHTdP8T03T/PWJ/UQ0mAIoKPbtn0Ui4PmWX9u9lSPrOR/6iQLAOmwBYCwOJxj85zJT46UA6rjc5usaiWkA2CkSAIxF7VnQNdhjClDPQcevXKoqq0/5v8owAEZJAoCtK9SFf2h57J8ST4DxKVU50LkCoG3brVYvAMBdJAAYgymOappixQLAlDzZ8nPVABCAnSMBwFallHKJ59OJ/RSs/gPUt+0pAF0TABcrRwBgJCQA2Dar/wD8Rkqpz+p/qQRA1+dg/z8AoyUBwNbEBd62Rzxtyuo/QH19EgClAvCu1Wn2/wMwWhIAbNMUu+gb+wdQX+f99yUa8MX2tK4kAAAYLQkAtmlqCQBz/wGG0bUC4GrlSDd9GgCW2oIAAMVJALAVKaXDCY7+s/cfYBhdA/BSwXfnCgAjAAEYMwkAtmVqq//XTdOcrRwFoIZnHb9mqeC7awLABAAARk0CgMGllB5NsPnfWdu2OjsDVJZS6lN+X2L/f378vZU7Bnp8AKhJAoBtmGLzP+X/AMPo04CvxBaAPo9vSgwAo/aFHw9b0CcB8F3btoJxgN3VZ/99iQBcAgCAnSUBwKBi9n/X2cpNrTF88bz2bzSeyitJH839BxhU1y1ivfff99yi9sFWMeik69SPRytHgAdJADC0wx6P975t22LjlSLoP47ndOdEgpTSogHgW8kAgHpiQkxXJfbfW/2HAaWUTpumedHxEZ+mlPL12ZHkG6xPDwCG1qf8v0gX/rzCk1LK2wh+aprm1X3Bf9iLk9OPKaXzSBwAUF6fBECJAHzbjw+zENdil3Ed1keu2DmP6h1gDRIADKZn+X+RMXzR3TlfpL1euXM9eTTVZUppio0MAcZusgmAtm2NioU1RLB+3nNL6LKnkgCwPgkAhtSntLL3GL6l4L/vCSdXBLyRBAAoJz5Tu47fuyhwjujz+O9XjgB3OS0Y/C88LVUpCrtOAoAh9VnZ6fWhHtUH5z0u7m4jCQBQzra3iG3tHAVzEX0+uu75f8izlNLxA38HZk8CgCF17ax8XaC08qxw8L9wqicAQD/xOfqsxxcpkSTueo5q7P+HtZ1WfqlObAWA+0kAMIiUUq/y/5UjG4hscOlSs4W9WqMJAWbkpMe3+qHAhJg+q/8lHh92Xqz+P9R4ua+9ntVEsPMkABjKNhs79bmwXMezngkOgNmK1fc+JcElkrB9yoYlgWE9fa4FNyEBAPeQAGAoW6kA6NnUaRP2nAF007ckuG+V2EHPVUkJAFjPUAmAp7YBwN0kAKguPoS7luD37ew81Mmmz95RgFmK4LvP5+f7AuX3fRK47/tOH4A5iEqfIRZkFvZXjgCfSQAwhK3t/+/52BuxDQBgfZEc7rt63qt6oEDzP93/YT1DN0zWoBnuIAHAEPoExp33/8fFpWwzwDid9Cy9v2rbdps9YvKEGuX/ME4SAHCHL24/DEV1DYzzxdXlytH1DR2Q228GsIboBv6q52u1cfAelVqP4vzw/42g+SAADEoCgCF0ne1srjLAjkkp7RcInq/WXX2PZrBHPc5Fd6k9zxzozjUk3EECgKp67ovv++GtMRPAiCzt+++7PevB1f8I/PtuM7jLhdn/sL68XSelNOQr5hoQ7qAHALX1KcPvlQDouX2gCxeDAHeI4P+8x1SYhQ/3rf7nx0kp5eZ8byoF/43Vf+jkw0AvW98tpLDTJACorXMCoNCH99XKkXqcbABuUTD4b+4b27f0ODVHs+btB7r/w+buTNwV5vcT7iEBQG1dEwAXK0e6GWoPmGwzwC1i1F6p4P/9XZ3/CycZ7tNncgDM2VCBuQadcA8JAGrreiFWKpge6iTgZANwQ/SBuSwUlF9HM7+7nAwQ/F9bXYRuom/Gu8ov38VdSULgZxIAVBOdnrsqkgCIk0CpaoL72A8KsCSllAPyHws0/Fs4atv21sZekWjoO1ZwHad3PQdgLceRSKvhoSQhzF4jAUBlT3p8+ZLl9LXLNX/QDRrgZzkYTynlz/DXBV+Sdw/sux+iLP+fSvZCP5FAO6z0Mh67HoOHSQBQ07YbAC6+1nnFkrMr+0GBWvL++ZTSce5qn1LKY7Q+pZTaHGDH/5/0rLYqJp7r21j1L1mK/+GBxn9PKsz4v83/a/Uf+ovrspeFX8qX900HAX4lAUBNXSsAaoyJyReP/8/K0X5yqdmhC0KgtFhFzxfJPzVN8310tX+2VE7/NP4/r7L/PqX0MebeD24p8M/P9UXhx7++r/Q/DPV9/0kkG4CeIlj/ptB2AME/bEACgJq6XigVL9+Ki8f/e+WO7vIJ60Dnf6CkmGF/Gqvom6xq53n3byIRMEhFQCQpagX+C4drfM4erBypZ8jHgp0W23r2e/Rqyv/uK8E/bEYCgJq6XoTWCqr/zZUj3XwQ/AOlLY3L69PM7nFUBFRZFc/JhZygyImGSFLUCvybWNVbp5v3kFsgVOWpqu0AACAASURBVABAQXnPftu2ObH2dR7zueZXvojPB9di0MEXXjQq6tr5uXgFQHSI7us6OkDb8w/D+tsdH+2o0O9+L3Fxe6+YYX9ZsGN+rgZo+q6MxfM6iNthJBiGsElJb6nXbB2j6LcAuyaSfefxmbN/R7VN/ow8f2BLEPAACQCq6FmCWqODa59Vm0UTwTMnHdiKf6Hjgz4eMGDtLC54zysEsp+3BKw7EzsqEJ7Ehffiv9t4/ca8n/fRyhGgmLjOOo8bUIEEALX0uUiqUc7VZyLB1ysHAco5Ltw1f9k/SCn9adM0fxHHHi19Hi7+/Kji429q7M28JIEBmDQJAGrpvOJeaZW9awKga2MagAfFqnvJefk3/UnTNP/9ytHxWXT7v2/W/12uB9wGYL8xAJOmCSC1dE0AXK0cKWNsDQkBMj1Ffv7cP+gY/DcDf07X2KIGAIORAGBsal1cjaYhIcCSw5m/GLnr937PTt5dEwdd2JcMwKRJAFDLaEYl9ewCrgIAqCI+m4bsYD8muWz/27ZtDwts+xoqAXCRR5atHAWACdEDgFq6JgBqBNxja0gI0Nwx5moO8qr/calgOn+dlFLu1/Js5c6yxtycECYrpXQ00MLRZeFGnn9j5QhMgAQAYzOmBoC1GhICNDMcKXcVgX+NFfs8SeH3K0fLuRj5dAKYsqMBEng1/N08acU7j6mxBYA56JpVNgEAqKlzcnJirmO835NKwX8TPQS+W7mjnOOd+WkAMGsSANQyppWtrgkAq/8wDh/8HCYpr/h/mz+Dh1g9b9v2pFLi9mXPJoU7J6WUz/F/v+v3FSXfAGyBBAC1PO34dcfUA8AFH1DTrnaUv1ha8T8deCvVYeGE0Uul/7+VUtqP9+6/v3Ln+t6klN5GIgGAAUkAMDY1LhS7JiNUAACsJ6/2/9A0zZdt2x5sK2jOyYa2bffjufSRty18I/j/raXgv+t5ddmL/LUkAQCGJQEAd1MBANQ09QqARdD/Vaz2F+vs31d+Lk3TfB3PcVPvYtvCUOMFJyEC9bPCoytzIuF05SgA1ZgCwE6L1Qpg2t6OIFg+6Nil+s4AtG3bvPp5XTigquk6fg75djb2mfj59c2BfErpMLYGHN7zWl9FcHtq1v+d8u/h47vu7OFFSukybxfZ6ncHMBMSAOy6zqWFcfEIbNkYyrBTSicdEwAPBZP5e3u1cnT7ruK5n0c11OVUA+NYyf+8mp9SenJLY9hLI1/vl1LKCbDn9/6lfk5yTwA/h9kqsaVkG/5s7j84pkkCAAC25zRmYN+1Ml3D9dIWp09Lf/6c9Nzl5GckMazwb6726vxejFo8WbkHxuuv/GyYIgkAdp0tAMBo5YA0pZSDq9eVnuOHaIoHncRWuiFWaCUA5usvRzY+GnaaJoDsuq4nlBqzpAFWVJxffx3VBdDH4UCv3l5sNWB+/pmfOQxHAgAAtq/0/Posd+U3zYS+hgzKJQAAKpMAAIAti+ZnB4WSAGbYU9KQW0huNmiEMZNgZZL0AGBsnPyBO0UX9/07gpJ8MXY+1U7i8bz3Y+JA154AeSvBkVF2FDRkg0rXAPN01WPE5Lrbpx5V6GVhagWTJAFALR86ftA6+QMrUkpHsZ/9wVF8KaX3Mc99kt3sc0+APBItGqK9WPkLt/sQ37NVf2BqcsLzxy7PuW1b20ZgQxIA1DKWrOhtq4TrsHoGIxAdyN9umFDM88qfp5Qmuxoez/kopXQcWwMObvk8+xhVD2dW/AGAdUgAsOu6TgFwMQ1bFqv+b3o8i1wtcJm/Ttu2Zyv3TkBsCziLG2xD14q+LiZZtQMwJZoAMja2AABNzMbvE/wv5P3Lv4tkArC5IRudSb4DVCYBQC1dT+JjSQAM2fUYWBLB+qvCr8kbM8ahkyFX5VW6AFQmAUAtY8nid+1F0HXrANBD7PkvsfJ/m7OUkt9t2MxZjJas7f1UJ3gATIkEAGNTeuXdjFaYltOKz3YvOusDa4qgvObv5cIQjwEwexIA1NI18B5y3jAwIlGi/+CYv55epZT0GoHNnFauAriY6thOgKmRAKCWzmV8Ls5htoZq1He4cgS4U1QB1Pr9vB7wdx9g9iQAqKVPD4AxJADsE4bhDRWYCzZgQzFK87sKr9tB27a6/wMMRAKAKnqezMfQgX+omcfAr83/htoC5PcbOmjbNvfQ+KHQa5dX/r9p21avHoABSQBQ01XHr11y9d2FBUzDoJU/RgJCN23bHufAvWdPgA+x8m/sH8DAJACoqWsVQMkLc70IYBrGUPkDrCEC93yOfLfh65WTBt+1bbtv5R9gOyQAqKnryX0sgbcEAADcIjcGbNs299P446Zpvs1z/O+oCriKRMHLtm0fxTYCALbkCy88FXVdfX+cUnoUXYd7yWOFUkpdv4QEAAyn9+87MLw4V5+a4w8wDSoAqKnPTN8xlANLAMBwhi4H1nUcAJgdCQBqGsskgIuVI8M/B+B+QyYAro0dAwDmyBYAqskX2Cml646jvUoG311Li1UAwEByGXFK6cNAI/p0Hofd8rc7nuv/cuUIwI5TAUBtXVf1Sk4C6PoczAqHYb0d6NGGehxgGH8zRghvevvHfj7A3EgAUFvXPgCfGwGuHO2mc6mvWeEwqLd3dBEv6So3B/VjBRgNWy5hQBIA1NZnX2+p4LvPc3BSgoFEN/HaI8KOVo4AU9c10f9s5Qjb0HXBp2uPJ5g1PQCorW8CoPde3bZtL3uMApQAgAG1bXuaUjqsdGH+g9V/qCOq9g7ivHkzgf8xKgLPKzXg1NQTYE0SAFQVjQCvckl/h8cpWX7ftbmYLQAwvMMIFkr24fjQtu3xylGgl5TSk6jceXHP13m2uD+llFdtTyTjALbDFgCG0LkJX8E+AH16EZgGAAOKrQAHkbgr4UIyD8pLKZ02TfPTA8H/TTkZ8GNK6dz5lVDqWg9YgwQAQ+iT5T9cOdLNGHoRAGtaSgK87/ma5bL/g/h6QAE5OZ9SyufVVz2+Wk4E5C16ttrR9T1g6wd0IAHAEPokAEoF32NIQgAbyEF727aHPSoB/mtl/1BWVOaV2qKzl7+WJAAdSQBABxIAVJeb8PUY7VUk+I6mQ1crd6xHBQBsV9fV+z9bOQL0Vbo/xyIJsJXtALYhAHMjAcBQunbz3ys4i79rFcBedCUHgNlKKZ0UDv5/Oc82TfN25ej6+mzzkwDYvq5TX2ztgg4kABjKGErwbQMAgA5ipfx1xdfuWUrpaOXoGvT4mK0+iR+YLQkAhjKG4LtrFULJ5wAAU3QywHMe4jFuUgGwRQWnPQFrkgBgELEHv2sjr8clGgTFCsHFyh3r2eu6MgEAO2CIRHif833XPj8SANvV5/pO5Qd0IAHAkPqswJfq5N3nOUgAADA70Qdnb6Dvu+u5tmtHeCvQExVNpoENSQAwpDGU4Pd5Ds90CwZghoYc09f1sbquBhtBuF0mLcHAJAAYTGRqu5boFSnB77kVoSlYiQAAUzGFBEDX1WCJ/Wnqcy0HsyYBwNDGUAVwunJkfUca1gAwM0Oe97puNehaAfB45QhDGrriA2ZPAoCh9Znz+7xQCX6fJMSeKgAAGJ3O+8FLNBqms67Jpa49H2D2JAAYVGwD2GoJfkwDeLdyxwbPQRUAADMyhdXWPgGhBMD2dH3tJQCgIwkAtqFPFUCpTvx9noMqAADmZMhu653G9UaPn670Adierls+JACgIwkAtqFXCX6hZoDnPRoSNqoAAJiRIRMAfR6rU/JAJ/rtSCn1ed0lAKAjCQAGF1n69z0e92TlyPBfRxUAAHNxPuD32eexugaFtgBsR5+FlCGTUrBTJADYlj4l+I9TSiUmAuRKhOuVo+s7LtSUEABGq0DvnHVdtW3bp0qwa1C4pxHgVnR+zeM9CXQgAcBWxAm+Vwn+ypENxcmjz0jAvZ7/HgCmok/ifl19H6PPqrBtAAPI2yfzIk5KKV8//ecdH7HrVg+YvUYCgC3rc6J/1nPv2MJpzyqA54WeBwCMVvTO+aHi88ur/722+MVz7Mq5vKJcMZlSytd9f2ia5ndN07xqmuZf7viIVv+hBwkAtqnv6nnvXgAFqgCytxoCAjADJz2r9+5TYmtf02PUsARAJSml/L75qWmaF4Uewf5/6EECgK0psKdwLFUAjws2JgSAUYrz9mHPc+ZtXrZtWyqo61oFoA9AYVHun3+urwt/aQkA6EECgG3rGzj33pNYqArgla0AAOy6CNQPClYC5OC/ZH+BPtsAeo8Z5mdRGZl/Fk8rvCRGAEIPEgBsVYwE7NPMJU8EKHHC7lsF0NgKAMAcRBJgv+dI3+w/LBz8Nz0TAKW2IfDzpKUawX9TsFoEZkkCgDHoWwVw0jfwjiqAvpMFHpsKAMAc5PNm27Y5YP6Pe3y7/+rKkZ7ifN61D8Bj2wD6iz3/zyp9+X+6cgTYiAQAWxdde3tVARQaC/i2x0XDwotCFQkAMHpt2/63PZ5jrWD7bOXI+pzDe8jd/ktck93jn48EA9CRBABj0ffD/HWcdPoqcdI6tYIAwIx0TeLX6p3TJwFgG0A/+Tpqb4DHeFBK6TCPHsyNCFNK7S2385xMKHT9CJMhAcAoFKgCaAo1BCwx5zif+M70AwBgJrruyX5cI/iKPeJdmxTm5yQJ0N0QFRR79/2MciVmSin3mPpdjB68qxfBs5hQ8FMkAyzeMAsSAIxJ3yqAZ/edEDZwUqAh4OOejYgAYCr6NGUbYxVAzRL2nRXTkGqv/i+sXO/F2MF87fUmrsM2kZMBv7e9gDmQAGA0YvW9b0fh3p34o4FQiQz201x6tnIUAHZLn4R3rQRAn/PvM2XhnQy5gv6bx4rV+48Fmg++du3GrpMAYGz6Zt33Cm0FOCuQjGiiKaBsMgA7K0b6di25r5IA6LkNoClQlThHQ259/KWsP4L/84LVBy8kAdhlEgCMSlxE9N2D/7zQVoCjAlsBmsgm6yoMwC7rWgVQc/RenyDuhSqAjdWq5rhTVH2+rbD1wAIOO0sCgDEqsQe/1FaAUo2A3kgCALDD+mwDqNV0r+8qrgBw/I7vafLX12uNAdlFEgCMTgTefU+6ez0bAH1WaCrAgiQAALtqdAmAqCrss51PFcBm+jSD3Fj8bF5XfpjTlSMwcRIAjFLbtvkD90PP5/asRPlW27bHBZ7LwqlsMgC7pmcfgKcVA+2+VQACwPV9GvCxrgaa1vDMdRu7RgKAMSuxWv46xtL0dVCoH0CuTDgv9JwAYEz6VN7VqgI469kM8Llz9tqGHH98XnHryE2qN9kpEgCMVnTwLVF+fzayfgA5CfCj7QDjlVeiUkrHKaX83rlMKbVLt49x/Kjv+wpgx/RJANQ8J/atBuzdV2gOYttkicWSdfyfHWb9dyUBxE6RAGDsTnpm7pvFqvvK0Q3Fie1lwddLT4CRicA/l4v+1DTN93nl55bmQo/j+Js8czhvM3FhCNA7AKy2DaBt27c9ryUeawi4tt79l9aQ32N/Psh387NaTQZhKyQAGLVYeS8RJD8tMdM1LiLerdzRnSTASES/iBz4v9jgGe1FA6JLewQBPusTANbc0903gH9lK8BahkiU5L4M/8rK0Yo0g2SXSAAwegU78ReZ6dq2bQ7YL1bu6C4nATQZ2pK8ep9SOu/ZSfhx9HaQBADmbpTbAApUATS2AjwsmkF+V/EhrrbUmFECgJ0hAcBUnBTqxP+60Ir7YcHJAE2sLPSuUKCTHPw/K/DS7ZXoNwEwZdF0r+s2gL3KVXF9FwEeF5gqMBmxLe4get6cxJ8frIJo27bUNdttjqI6FOhIAoBJKLgVoIkV915lfPF8Dgqf4F5EwzkB5EAi6VJyb599ogDjrgLoe95+vstVe7mSLZ8bU0qfYlvcj9Hz5nX8+cdoinv2QLKm1PSkZS+jKnRw23pcqEECgMmIqQDfFnq+Z33LtZeSEiVPcE/tJx9GSulww/3+63plryAwc31WyWvPXS/RZ+DVA8Hv5MRqfw5yfx/nxr0HvofnsaDy8bbXIq6R9gsulLyMBM7CkAH5UJMNYBASAExK27Y56/6+wHPeK7FnO5ISpbPci/3kKydUiqq5glOzkRXAqMVqaZ/99tU+Q+O5lWjmuzNNfOP7uOy4He5xvBYrW+CiH8BBzz5O+X301Y3gv4nnOxSr/+wUCQCm6KhAI59m5EmAPc0B64mLnZrzg3WKBuauTxXAi8qVVMeFztlvpl6xF+fDN2us+D/keVxT3UwCfGrbNr/eX2/YQPkqVv2fxHXWb0SFQYkFoXUMMdoQBiMBwOTEh/5hoZP3mJMATZQZrpxQ6e2w8kv41M8MmLm+zfKq9VMp3Ffo91OtBFgK/kt5elsSoInKi7Zt83XSl7Gd8/2NhMCH+P88QeDrCPwfeg8NEZhfSwCwayQAmKQIuEuVCI49CZBL8v6PlaP08XyAV08fB2C2ovy7zwpt1SqAmFZQagV5ctsB4pqnZPC/8PS+5E1+X+TtnG3bHuaEQNu2KW778f8n6zbcK9TU8SGnpg6wayQAmKz44O+zr2zZb5IAMRv+4MbtwQuRikmATlselr6P4xjhcxLjfGZboj7n7x1gYH23sd0ZSBZSspHv1Lbt1Rxn+GrAc23NnjsfYqQh7BQJACYt9pWVyuDnJMD/klL686Zp/rAYd7N0+ym63b6978S2lAQomZX+i5Ujd4igPwf8l0vfx/cxwud1ZPyXx/jc+b3Qi9cVmLUCzQBrVwF8KrwlbBLb9qJaoeQI3NsMEjjHe+y7lTv6u645khK2SQKAXXBUMNj+a03T/EsrR3/1OMbj/Bgn+VvLvCslAR6UA/+maT5GwL/Oyf35Q9/LLomLsv9k179PgBHpGwhWXVWPALLUiOEmtu19HHlyfYjAtvY4x1/EKn2JyQ4LOfg/uK35IOwCCQAmLzL4B4UmA2ziWTT/ufXiZul5bdL1tpNY9T+PwL9LJ997v5epyxchUZqZkyN/bxe/R4Axiu16fc7Pz2sH0zFiuGQAuRfJ9dOxVQNERUWXcX9d1G64u6zU9Yvgn50nAcBOKDwZYFOv87aA2/5NjL85KHxh8RtxcXFe6IR+5/cyNfkiZ2krxO9zaWaBMUeb+LgLryNAAX1X8YfYW39coWrvVVQDjKmUfMjKhCEfq0QCIF+r3Tp2EHaJBAA7o2IDvnW8uC9wbtv2qHCJ4WdLwX/JvXwvploJcCPo/2mDrRA1SAAA/Oxtz3Pz09jiVs1S1V7pJMBeNAg8H8m2gGo9FW4xSKVBbDV4sXLH+v7Xpmm+ytdqOv4zBxIA7JQRJAHuLHeLEsP/buWOfk4qBbivp9IcMKYcnI4k6F8mAQDwa3DdeyJAzYaATf1qwmdLPXe2WREwZAJgKH3fW/+uVX/mRAKAnbPlJMDbB/b7/W8rRzqKAP1VrW+k8oigzpbGGuYJBp9iysGrkQT9C9cxAxuAXxu19ekFsDfEeSk+u2teQzyLioCPMZp36IB8pxIAsfDSp9LgwvmauZEAYCdtMQmwV3km7bLaZfqPt71vMUr6D+MiKa+atEtjDZ8PvKd/E2cjfV4A29T3vPWs9laAZrhriMcxmjePGL6MxPYQwfnOBLux4DKF/hIwKhIA7KwtJgGqX5wM2MV3kF4AEegvVvZPl4L9XNL/u7hIGqprcQk70UgRoKQCEwGaIbYCNMOP830aie2fojLgbZwPi23FW5xnB64AqH39dRKJlK6u2raVsGd2vvAjZ5flE3ic8M4HXC3ey6vWlU8qQ63M5yqAP22a5h83TfOpyx65GxcwuVHPo7gt/jym0v0SLmKuNACrjqKSq6u9qLKqPmP+xjXEUOeqx9HQ7nNTu5RSE0mTvHKfz8GLJnXLf162OLc2S134t5VAr7avvtA2yJ0cfQwPkQBg5y2dwP/npmn++kDf70HlMvAhG/T9N4s/xIUI93NBAXCHnCBNKb2PbVxd5akAp23bDrEd4FNcQ5z27DTfx+O4TakSronESXFR+t+30u4qKlJgdmwBYBZi5XrIDq+1Vyaqr3zQyQ9W/wEedFygPPzVUH1qchKg1jjfHVcrwD7tWfrfSNYzZxIAzMlf7dD3Otbmd3P2bojVKICpi67rJZqvncYM+EHEON+vC/QxmIMq3fWjCWTfSowLq//MmQQA1LGLc3a523exOgTAGmIsYN8GezkZfv7A+N2iosorJx3e+znfq3hCPLZifL9yx+as/jNrEgBQh5my05JLUd81TfNl0zQvN1jdyReAX8aFLACbKZE43UYSIG8JyPPnv9nCpKEp+KFL0+D7RKVHid5K72zVY+40AYRpuiqw/42fX8dc0vk2X9DF65HLAt/GxcZBrPQsV3QsOjGf1ShvBJiLaNL7XYx67eNpNJwbtD9OnvYTIwlPCnSk3xUfSm+HW2r613f74/UQo5ph7CQAmJPzATvo1m44eCkB0Nl1rCKc3rdCsYXGkQCzkyuo8ujcAmP28mSAt0Nvx4rkcZ7ZfxpB6tQ69Zf0ofSUogj+S41hPFpK9sNs2QLAnAwZzNUuL1O+trlcrv9N27aP8gXifcE/AIM6LFRK/yInAVaODiBXhLVtexBNAi9m+PbJ2+gOSgbYhYP/97liY+UozJAKAGYjSvWuB+igfz1AgH5WqBHOLlus9OfbeYmLkij13L+lzPTztgBJBYDN5eA5uru/KfDy5SRAs63GrLG//CAa1h0V6Fg/dnkr3XHp4Lpw8H9dqN8E7AQJAObmtMBew4ec1S4xi4uldzO4sNjUh0XQXzIYj1nTxw9diKSUrhY9BPQHAFhfHssWQXOJ89qLCCC3VvIdiYDcnPAkgs+jHdq6t1joeFtjVb1w8J8dKv2HX0kAMDenEcjVqgK4HnC8zIkEwOeA/3xxK32Cj32ppxtctD2OBNPn/aCmAwCsL6/aRwPWEoHf8wjAi5albyqSwflcsOh1sLjVrkbsK2+b+x+bpvm/mqb5i6Wv9almtVv8/M8Lvj7f6foPvyUBwKzki4CCZYa3ORlq5TeqAEp0T56Kq+jjcB7l9lVP6NHQqWtX53zh8jou9rZ68QkwMQexrapEAPg0kgCj6PsSq+WfV8wX54dIBoyhMuDDUjJ9K3vlowLkrGDwfyERD6skAJidwmWGy/Js2dOVoxVF9+QnO1YJcBUXf/lC5NMQwf5N0USqxGuaLz4/xgqU/gAAD4hE/UHBVeBFEuBwTCvBS8mA4ziPHyz1mKk9SWCRUF9Oqm81UR2LMyV7G11FcgW4QQKAWYoyw6Zg4Pxuiw2HSn8v/6hpmr8Wfy59EXK9NI3hY9w+xbGqZYXrKhj8L+QL2LfbLkMFmIp8LihcrZc/h39MKX07dKJ+HVE5+JvpBZEUeLI0Vi8nBh7Fn5/cUzVwfWPq0SLpsTjPjqocfmnG//OVO7u7tu8f7iYBwGxF4PypR5n3wg9t2x6vHB1QfC8fe24HWJwwb704iBWZLra+srCuKMmsUU3xNC5wrEYArCGq9ZrCW/a+X3TnH/t5KZICH3d57G/s9z+7J5nR1aGqO7ibBACzlgP3lNJZNHrbtOnQVVxEjOLkHNsBzqPZ0KYr9+9ijM+dF0S73kRnaRWiludRBaAZEcAaKm3ZyyvNl9EXwOfxlsR0hBo9jF76ucL9/ujee2EG8omibduchf4mut4+JP+db9q2fTK2k0x8L/li6esI6q9W/tKvcsOfb5um+TJXENwX/M9EzekQC5oRAWwgtte9K/yaPY4tAT6TB5ZX/VNKlxWD/5qJfNgJKgAg3OjOu9hrtyh7/xzoTyWrvJg/3Py6sr2/dPco9tqP0BA9HJ7l95bXH2B9FXrdLCymtRxbNa4rrkWOK04uEvzDmiQA4BZLAdrkLwhiZd+FzT0i4TPUGKbDGw2aeFjXc9U/t3Kku7/R8V/+zZUjwMYqJgGeRjXAg1vh6CZvt4gKuFrnWcE/bMAWAIBfKz2GMORjTV5cOP5bHb+P/6xH88pfRJnwf7pyx3r+Vi53jY7eQA+VtgMsvIixrVtt6rtL8udv9CZ6I/iH8ZAAAPh5pNJQ9r3e64mRjG96VADs9dnnm0tWo0lo35LVp9F0zM8eeookwA+VXse9mBTwMZKPdLAU+P9YYZzwMsE/dCABADBsUF670eBOiOC/VKnv6/h6myo5mzr/3M8lAaC/GL37suJLmVer30gEbGbAwD+PLf5K8A/dSAAAMCoppdMK+3xfbHIhH1UDpYL/hZwEOItmWEAPEfx9E8FgLRIBa8ivTXT2rx34NzHB6EAzXehOAgCYtQjG/vW5vw5jEXv2X1V6Oqfr7MWPVfpanaofGwcJZcT0noMHRt6WsEgEfMrJQT09Pn9OPonX4mNs1Xq68pfKuxD8Q38SAMAsxf7uHIjli5d/bcDX4MPKEZbVLOnMK/CnK0dXrfN3+nglgIAyIhjcj+Cwtr1IDv6U+4PECMHZiPPmUZT5/xSvxVATdL5r2/bAlAboTwIAmJUbgf/rLezJ/7hyhM+ixLb2xeTz+4LvWP2vXcLaqAKAcnJQmIPDHCQO+LLmLUK/i6qAt7uaDFgK+nO1xR9itX+Iz8iFvMXj67ZtfWZCIRIAMA1/576ghYflwC4awf1hS4H/wtnKERaGuoC+b8zXUPt8Z7VyCEOIIPHryn0BbtqLniXLyYCjKff6iPPlcaz0L4L+0j1R1pGrOp60bXu+hceGnZXatvXThYHEynPXvcXXETyetG1rFXkNcQF2GAHfEPsT1/HHShhvl1Ia6oR01bbtrQm1aGQ11HvlK3tZobz47C85xaOrvOXrfHEb62d/VD4dLN22Pa3mOq51am/HglmSAIAB9UwALHufL26iARJLloL+wxFc/N30LmZYc0M0//tx5Y5K2rZNt33lAZMQ2bcucKGe2FZ0OqLxq7lZ4WXcclLg45AJ/Tg/7sftSfx3yHL+deRV/yMLHVDPF15bmKTnsZf5KqoC3s55JXFp9eJwhBczC9cPlJ7Pz+tM/gAABdRJREFU3a0r8rXkhMPNstItlOwaBwgV5VGBsXd9DNUATfQ4eRzP5fNiQEqfc5G5UuBTJAY+Lf154fKh6oFIoi4sAv0mzo3NiM+NC5/PkWb7Q30SADBtj2Nk2qulZMD5rlcGRMC/XLI4VBfiPo6V/t9rDD0u9leOAJMWn7uH0aTvdKTni8W2ozuD9EgU7KofouTfORIGIAEAu2M5GdBEGd35otRwqifWpZLFRbC/P6JyznW9s6oxCS4+YUflxHg0tTuO29TOI7tIuT9sgQQA7K5ny6sJUSFwuXT7OKZtAzHl4MmNvYlTDPZvsu9/PVu/AMy/Dzu+ygazFonwk5gIcxLd+xneRaz46+4PWyABAPOxvPfwswh2riL4+rgUhP1yUu57gl4K7BcW+xEXxx+NqEN/SboYb2boBMBdya+rAUuEXfzCFsSK81E05n17X+k9RQn8YQRMAYABRZOetxPZs05374xr3NxIxgC+HXBV0EhIGIE4Nx+PcHLMrhD4w4j8kR8GDCdOfvsRIDINeUX432ua5mWMX7y+41nnC5xvm6b5Mpf8C/47eT/Q49zXJHOoC9T3gn8Yh3xubts2Nwn80vm5qPxaft227crUFWB7VADAlkRH4rcaEY3WvSX8SyOXHhzPxHpiZvebAV6ur+7rf5FS+jhAlc5LjSFhnGLr2lHcVOxt5iqubd5KhMM4SQDAFkWH+7HMJ+Zn1zEq6lRgP7wBgu+LvBq1cnTJAImID23bGjkIExDJ+iPn6Qe9j6D/vgorYAQkAGAE9AYYBYH/CMTF9u8qPpN7V/8XUkqXFZtTfq0cFqYlqgIWyYBdbFzbxfvYUnXmvAnTIQEAIxIrjycSAYP6EEG/cuyRqNiI79u7tnTcFBf7lxW26Kz9HIBxmnkyQNAPEycBACMkEVDddVzAnK6zGszwKqzAv8vNGVeO3iOltB9NAUslATZ+DsC4RTLgIBICBzvY1+dDfA6eK++H3SABACMWiYAjM4qLsXIxEYX7Y3QOvCMJcFYgGWflH2YgPjMO4rY/wUT+RVQ/LYJ+50rYMRIAMAGxwnAcKwyqAjYj6J+wlNJJvPe7rKrlSo+jvqtWkYzIz+PVyp0Py6tnx/b8wzzF+Xt/6fZkJNsGriPQ/+WmIg7mQQIAJiaapC1KDSUDVl3FysWZ1YvdEBfQJxv0BajS0HHpeRyukZB4H0knvSWAFVEp8CjO5U0kCB7FrUSCIJ8LF2P4FgnIHOB/kpCEeZMAgAmLC4hFMmCu2wQWAf+iXNHc4R0VK/GL9/uTuD2OVfZPi7LVIfapLpX5Prpx13mspEk8Ab3F5946Y0M/Ov8B65AAgB0S4wSX9x7uWjOixYrG+VKwJ9ACAIA1SADADhvx3sOHLAL9y6X/WlUFAIAeJABghiIxsHxbLjF8Urm3wKJcu1nsR4wg/2PsTdSECAAAKpAAAO611KioK/sSAQBgBCQAAAAAYAb+yA8ZAAAAdp8EAAAAAMyABAAAAADMgAQAAAAAzIAEAAAAAMyABAAAAADMgAQAAAAAzIAEAAAAAMyABAAAAADMgAQAAAAAzIAEAAAAAMyABAAAAADMgAQAAAAAzIAEAAAAAMyABAAAAADMgAQAAAAAzIAEAAAAAMyABAAAAADMgAQAAAAAzIAEAAAAAMyABAAAAADMgAQAAAAAzIAEAAAAAMyABAAAAADMgAQAAAAAzIAEAAAAAMyABAAAAADMgAQAAAAAzIAEAAAAAMyABAAAAADMgAQAAAAAzIAEAAAAAMyABAAAAADMgAQAAAAAzIAEAAAAAMyABAAAAADMgAQAAAAAzIAEAAAAAMyABAAAAADMgAQAAAAAzIAEAAAAAMyABAAAAADMgAQAAAAAzIAEAAAAAMyABAAAAADMgAQAAAAAzIAEAAAAAMyABAAAAADMgAQAAAAAzIAEAAAAAMyABAAAAADMgAQAAAAAzIAEAAAAAMyABAAAAADMgAQAAAAA7Lqmaf5/A5dTEii0/sQAAAAASUVORK5CYII=" alt="CPU Logo" width="100%">"""
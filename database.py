@@ -0,0 +1,56 @@
+"""
+How every process opens the shared db.sqlite3: gunicorn's Django workers (through the connection_created signal,
+see oauth/apps.py), bot.py, worker.py and manage.py sweep.
+
+The database is in WAL mode, so that readers and the single writer do not block each other, with synchronous=NORMAL,
+which is durable across crashes of the processes and only loses the last commits on a power failure. Writers queue on
+a busy timeout instead of failing with "database is locked". WAL is checkpointed automatically after commits, but a
+long reader holds that back, so bot.py also checkpoints every CHECKPOINT_INTERVAL seconds.
+"""
+import asyncio
+import logging
+import sqlite3
+
+BUSY_TIMEOUT = 5  # seconds a connection waits for a lock
+PRAGMAS = (
+    'PRAGMA journal_mode=WAL',  # kept by the database file, the others are per connection
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA journal_size_limit=67108864',  # bytes the WAL file is truncated to after a checkpoint
+)
+CHECKPOINT_INTERVAL = 300
+
+logger = logging.getLogger('discord')
+
+
+def configure(conn):
+    """Apply PRAGMAS to a new sqlite3 connection."""
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+
+
+def connect(path, **kwargs) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, **kwargs)
+    configure(conn)
+    return conn
+
+
+def checkpoint(path):
+    """Copy the WAL back into the database, without waiting for readers or writers. :return: (busy, pages, copied)"""
+    conn = connect(path)
+    try:
+        return conn.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchone()
+    finally:
+        conn.close()
+
+
+async def checkpoint_periodically(path, interval=CHECKPOINT_INTERVAL):
+    loop = asyncio.get_event_loop()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            busy, pages, copied = await loop.run_in_executor(None, checkpoint, path)
+        except sqlite3.Error:
+            logger.warning('Checkpoint of %s failed', path, exc_info=True)
+            continue
+        if copied < pages:
+            logger.info('Checkpoint of %s copied %d of %d pages, readers hold back the rest', path, copied, pages)
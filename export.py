@@ -0,0 +1,64 @@
+import collections
+import csv
+import gzip
+import io
+import tempfile
+
+SPOOL_SIZE = 1 << 20  # keep exports in memory up to 1 MB, then spill to a temporary file
+
+
+def write_gzip_csv(columns, rows, fileobj=None):
+    """
+    Stream rows into a gzip CSV.
+    :return: (file-like object positioned at 0, number of rows written)
+    """
+    if fileobj is None:
+        fileobj = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    count = 0
+    with gzip.GzipFile(fileobj=fileobj, mode='wb') as gz:
+        text = io.TextIOWrapper(gz, encoding='utf-8', newline='')
+        writer = csv.writer(text)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        text.flush()
+        text.detach()
+    fileobj.seek(0)
+    return fileobj, count
+
+
+Export = collections.namedtuple('Export', ('data', 'rows'))
+
+
+class ExportCache:
+    """
+    Query results rendered as gzip CSV, cached until the database changes.
+    The data version combines sqlite's data_version (bumped by commits of other connections,
+    e.g. the Django app) with total_changes of our own connection.
+    """
+
+    def __init__(self, conn, max_entries=16):
+        self.conn = conn
+        self.max_entries = max_entries
+        self._cache = collections.OrderedDict()
+        self.hits = self.misses = 0
+
+    def data_version(self):
+        return self.conn.execute('PRAGMA data_version').fetchone()[0], self.conn.total_changes
+
+    def export(self, query, params=()) -> Export:
+        key = (query, tuple(params), self.data_version())
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key]
+
+        self.misses += 1
+        cursor = self.conn.execute(query, params)
+        columns = [col[0] for col in cursor.description]
+        binary, count = write_gzip_csv(columns, cursor, io.BytesIO())
+        result = self._cache[key] = Export(binary.getvalue(), count)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return result
@@ -0,0 +1,420 @@
+"""
+A local stand-in for the parts of the Discord API that CPUBot talks to.
+
+Run it in a terminal and point a client at it, e.g.
+
+    python fake_discord.py --port 8765
+    python manage.py sweep --api-endpoint http://127.0.0.1:8765/api/v6
+
+Only the standard library is used so it runs anywhere the bot or the Django app does.
+There is no gateway websocket: state changes caused by REST calls (messages sent, members added...)
+are handed to the functions registered with FakeDiscord.subscribe, see loadtest.py.
+"""
+import argparse
+import collections
+import datetime
+import email.parser
+import email.policy
+import hashlib
+import itertools
+import json
+import math
+import random
+import re
+import secrets
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+API_PREFIX = '/api/v6'
+DISCORD_EPOCH = 1420070400000
+
+# (method, route, handler name). Parameters named like Discord's "major parameters" get a rate limit bucket of their own.
+ROUTES = (
+    ('POST', '/oauth2/token', 'post_oauth2_token'),
+    ('GET', '/users/@me', 'get_users_me'),
+    ('GET', '/gateway', 'get_gateway'),
+    ('GET', '/gateway/bot', 'get_gateway'),
+    ('POST', '/users/@me/channels', 'create_dm'),
+    ('POST', '/channels/{channel_id}/messages', 'create_message'),
+    ('PATCH', '/channels/{channel_id}/messages/{message_id}', 'edit_message'),
+    ('POST', '/channels/{channel_id}/typing', 'trigger_typing'),
+    ('PUT', '/guilds/{guild_id}/members/{user_id}', 'add_member'),
+    ('PATCH', '/guilds/{guild_id}/members/{user_id}', 'edit_member'),
+    ('DELETE', '/guilds/{guild_id}/members/{user_id}', 'kick_member'),
+)
+MAJOR_PARAMETERS = ('channel_id', 'guild_id')
+
+# 'METHOD route' -> (requests, per seconds), roughly what Discord enforces
+DEFAULT_RATE_LIMITS = {
+    'POST /channels/{channel_id}/messages'              : (5, 5.0),
+    'PATCH /channels/{channel_id}/messages/{message_id}': (5, 5.0),
+    'POST /users/@me/channels'                          : (10, 10.0),
+    'PUT /guilds/{guild_id}/members/{user_id}'          : (10, 10.0),
+    'PATCH /guilds/{guild_id}/members/{user_id}'        : (10, 10.0),
+    'DELETE /guilds/{guild_id}/members/{user_id}'       : (5, 1.0),
+}
+GLOBAL_RATE_LIMIT = (50, 1.0)
+
+
+def compile_route(route):
+    return re.compile('^' + re.sub(r'\\{(\w+)\\}', r'(?P<\1>\\d+)', re.escape(route)) + '$')
+
+
+def parse_rate_limit(value):
+    """'POST /channels/{channel_id}/messages=5/5' -> ('POST /channels/{channel_id}/messages', (5, 5.0))"""
+    route, _, limit = value.rpartition('=')
+    requests, _, per = limit.partition('/')
+    return route, (int(requests), float(per or 1))
+
+
+class FakeDiscord:
+    """
+    Holds the state of the stand-in and answers requests.
+    handle() returns a (status, headers, json_body) tuple so it can be driven without a socket.
+    """
+
+    def __init__(self, latency=0.0, failure_rate=0.0, expires_in=604800, jitter=0.0,
+                 rate_limits=None, global_rate_limit=GLOBAL_RATE_LIMIT, rate_limit_rate=0.0, retry_after=1.0):
+        """
+        :param latency: seconds added to every request, plus up to `jitter` more
+        :param failure_rate: fraction of requests answered with a 500
+        :param rate_limits: 'METHOD route' -> (requests, per seconds), DEFAULT_RATE_LIMITS if None
+        :param global_rate_limit: (requests, per seconds) over all routes, or None
+        :param rate_limit_rate: fraction of requests answered with a 429 regardless of the limits
+        :param retry_after: seconds an injected 429 asks the client to wait
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.expires_in = expires_in
+        self.rate_limits = DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits
+        self.global_rate_limit = global_rate_limit
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.access_tokens = {}  # access token -> user dict
+        self.requests = []  # (method, route, status)
+        self.bot_user = {'id': '1', 'username': 'CPU Bot', 'discriminator': '0000', 'avatar': None, 'bot': True}
+        self.users = {}  # user id -> user dict, see add_user
+        self.channels = {}  # channel id -> channel dict
+        self.messages = {}  # message id -> message dict
+        self.members = {}  # (guild id, user id) -> member dict
+        self._listeners = collections.defaultdict(list)
+        self._windows = {}  # rate limit bucket -> [window end, requests left]
+        self._ids = itertools.count()
+        self._routes = [(method, route, compile_route(route), name) for method, route, name in ROUTES]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def user_for(refresh_token):
+        # the same refresh token always belongs to the same user
+        digest = hashlib.sha1(refresh_token.encode()).hexdigest()
+        return {
+            'id'           : str(int(digest[:15], 16)),
+            'username'     : 'user' + digest[:6],
+            'discriminator': str(int(digest[6:10], 16) % 10000).zfill(4),
+            'avatar'       : None,
+        }
+
+    def next_id(self):
+        """A snowflake, so that clients can tell when a message was created."""
+        return str((int(time.time() * 1000) - DISCORD_EPOCH) << 22 | next(self._ids) % (1 << 22))
+
+    def add_user(self, user):
+        """Make a user known, e.g. so a DM channel can be opened with them."""
+        with self._lock:
+            self.users[str(user['id'])] = user
+        return user
+
+    def subscribe(self, event, listener):
+        """Call listener(data) with the gateway payload of `event` (e.g. 'MESSAGE_CREATE') whenever it happens."""
+        self._listeners[event].append(listener)
+
+    def emit(self, event, data):
+        for listener in self._listeners[event]:
+            listener(data)
+
+    def match(self, method, route):
+        """:return: ('METHOD route', handler name, parameters) or None"""
+        for route_method, template, pattern, name in self._routes:
+            if route_method == method:
+                m = pattern.match(route)
+                if m:
+                    return '%s %s' % (method, template), name, m.groupdict()
+        return None
+
+    def bucket(self, key, params):
+        return ' '.join([key] + [params[name] for name in MAJOR_PARAMETERS if name in params])
+
+    def _take(self, bucket, limit, per, now):
+        """:return: (requests left, seconds until the window resets), requests left being -1 when over the limit"""
+        window = self._windows.get(bucket)
+        if window is None or window[0] <= now:
+            window = self._windows[bucket] = [now + per, limit]
+        window[1] -= 1
+        return max(window[1], -1), window[0] - now
+
+    def rate_limit(self, key, params):
+        """:return: (status, headers, payload) of a 429, or (None, rate limit headers, None)"""
+        if self.rate_limit_rate and random.random() < self.rate_limit_rate:
+            return self._too_many_requests(key, self.retry_after, is_global=False)
+
+        now = time.time()
+        with self._lock:
+            if self.global_rate_limit:
+                remaining, reset_after = self._take('global', *self.global_rate_limit, now)
+                if remaining < 0:
+                    return self._too_many_requests('global', reset_after, is_global=True)
+            if key not in self.rate_limits:
+                return None, {}, None
+            limit, per = self.rate_limits[key]
+            bucket = self.bucket(key, params)
+            remaining, reset_after = self._take(bucket, limit, per, now)
+        if remaining < 0:
+            return self._too_many_requests(bucket, reset_after, is_global=False)
+        return None, {
+            'X-RateLimit-Limit'      : limit,
+            'X-RateLimit-Remaining'  : remaining,
+            'X-RateLimit-Reset'      : math.ceil(now + reset_after),  # discord.py 1.2 parses whole seconds
+            'X-RateLimit-Reset-After': round(reset_after, 3),
+            'X-RateLimit-Bucket'     : hashlib.sha1(bucket.encode()).hexdigest()[:16],
+        }, None
+
+    @staticmethod
+    def _too_many_requests(bucket, retry_after, is_global):
+        headers = {'Retry-After': math.ceil(retry_after)}
+        if is_global:
+            headers['X-RateLimit-Global'] = 'true'
+        return 429, headers, {
+            'message'    : 'You are being rate limited.',
+            'retry_after': math.ceil(retry_after * 1000),  # milliseconds in API v6
+            'global'     : is_global,
+        }
+
+    def handle(self, method, path, headers, body):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+        route = path.split('?')[0]
+        if route.startswith(API_PREFIX):
+            route = route[len(API_PREFIX):]
+
+        matched = self.match(method, route)
+        if matched is None:
+            status, res_headers, payload = 404, {}, {'message': '404: Not Found', 'code': 0}
+        elif self.failure_rate and random.random() < self.failure_rate:
+            status, res_headers, payload = 500, {}, {'message': 'Injected failure'}
+        else:
+            key, name, params = matched
+            status, res_headers, payload = self.rate_limit(key, params)
+            if status is None:
+                status, handler_headers, payload = getattr(self, name)(headers, body, **params)
+                res_headers.update(handler_headers)
+
+        with self._lock:
+            self.requests.append((method, route, status))
+        return status, res_headers, payload
+
+    def post_oauth2_token(self, headers, body):
+        form = dict(urllib.parse.parse_qsl(body.decode()))
+        if form.get('grant_type') not in ('refresh_token', 'authorization_code'):
+            return 400, {}, {'error': 'unsupported_grant_type'}
+        grant = form.get('refresh_token') or form.get('code')
+        if not grant:
+            return 400, {}, {'error': 'invalid_grant'}
+        access_token = secrets.token_hex(15)
+        with self._lock:
+            self.access_tokens[access_token] = self.user_for(grant)
+        return 200, {}, {
+            'access_token' : access_token,
+            'refresh_token': grant,
+            'token_type'   : 'Bearer',
+            'expires_in'   : self.expires_in,
+            'scope'        : 'identify guilds.join',
+        }
+
+    def get_users_me(self, headers, body):
+        auth = headers.get('Authorization', '')
+        if auth.startswith('Bot '):
+            return 200, {}, self.bot_user
+        token = auth.split()[-1] if auth else ''
+        user = self.access_tokens.get(token)
+        if user is None:
+            return 401, {}, {'message': '401: Unauthorized', 'code': 0}
+        return 200, {}, user
+
+    def get_gateway(self, headers, body):
+        return 200, {}, {'url': 'ws://127.0.0.1', 'shards': 1}
+
+    def user(self, user_id):
+        user_id = str(user_id)
+        with self._lock:
+            user = self.users.get(user_id)
+        return user or {'id': user_id, 'username': 'user' + user_id[-6:], 'discriminator': '0000', 'avatar': None}
+
+    def create_dm(self, headers, body):
+        recipient = self.user(json.loads(body)['recipient_id'])
+        with self._lock:
+            for channel in self.channels.values():
+                if channel['type'] == 1 and channel['recipients'][0]['id'] == recipient['id']:
+                    return 200, {}, channel
+            channel_id = self.next_id()
+            channel = self.channels[channel_id] = {'id': channel_id, 'type': 1, 'recipients': [recipient],
+                                                   'last_message_id': None}
+        return 200, {}, channel
+
+    @staticmethod
+    def parse_message_body(headers, body):
+        """:return: (JSON payload, attachment file names) of a JSON or multipart message request"""
+        content_type = headers.get('Content-Type', '')
+        if not content_type.startswith('multipart/'):
+            return json.loads(body or b'{}'), []
+        form = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+                b'Content-Type: ' + content_type.encode() + b'\r\n\r\n' + body)
+        payload, files = {}, []
+        for part in form.iter_parts():
+            if part.get_filename():
+                files.append(part.get_filename())
+            elif part.get_param('name', header='content-disposition') == 'payload_json':
+                payload = json.loads(part.get_content())
+        return payload, files
+
+    @staticmethod
+    def now():
+        return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+    def create_message(self, headers, body, channel_id):
+        payload, files = self.parse_message_body(headers, body)
+        message = {
+            'id'              : self.next_id(),
+            'channel_id'      : channel_id,
+            'author'          : self.bot_user,
+            'content'         : payload.get('content') or '',
+            'timestamp'       : self.now(),
+            'edited_timestamp': None,
+            'tts'             : payload.get('tts', False),
+            'mention_everyone': False,
+            'mentions'        : [],
+            'mention_roles'   : [],
+            'attachments'     : [{'id': self.next_id(), 'filename': name, 'size': 0, 'url': '', 'proxy_url': ''}
+                                 for name in files],
+            'embeds'          : [payload['embed']] if payload.get('embed') else [],
+            'pinned'          : False,
+            'type'            : 0,
+        }
+        with self._lock:
+            self.messages[message['id']] = message
+        self.emit('MESSAGE_CREATE', message)
+        return 200, {}, message
+
+    def edit_message(self, headers, body, channel_id, message_id):
+        payload = json.loads(body or b'{}')
+        with self._lock:
+            message = self.messages.get(message_id)
+            if message is None or message['channel_id'] != channel_id:
+                return 404, {}, {'message': 'Unknown Message', 'code': 10008}
+            if 'content' in payload:
+                message['content'] = payload['content'] or ''
+            if 'embed' in payload:
+                message['embeds'] = [payload['embed']] if payload['embed'] else []
+            message['edited_timestamp'] = self.now()
+        self.emit('MESSAGE_UPDATE', message)
+        return 200, {}, message
+
+    def trigger_typing(self, headers, body, channel_id):
+        return 204, {}, None
+
+    def add_member(self, headers, body, guild_id, user_id):
+        payload = json.loads(body or b'{}')
+        if not payload.get('access_token'):
+            return 403, {}, {'message': 'Missing Access', 'code': 50001}
+        member = {'user': self.user(user_id), 'nick': payload.get('nick'), 'roles': [], 'joined_at': self.now(),
+                  'deaf': False, 'mute': False}
+        with self._lock:
+            if (guild_id, user_id) in self.members:
+                return 204, {}, None  # already a member
+            self.members[guild_id, user_id] = member
+        self.emit('GUILD_MEMBER_ADD', dict(member, guild_id=guild_id))
+        return 201, {}, member
+
+    def edit_member(self, headers, body, guild_id, user_id):
+        payload = json.loads(body or b'{}')
+        with self._lock:
+            member = self.members.setdefault((guild_id, user_id), {'user': self.user(user_id), 'nick': None, 'roles': []})
+            member.update((key, payload[key]) for key in ('nick', 'roles') if key in payload)
+        self.emit('GUILD_MEMBER_UPDATE', dict(member, guild_id=guild_id))
+        return 204, {}, None
+
+    def kick_member(self, headers, body, guild_id, user_id):
+        with self._lock:
+            member = self.members.pop((guild_id, user_id), None)
+        self.emit('GUILD_MEMBER_REMOVE', {'guild_id': guild_id, 'user': member['user'] if member else self.user(user_id)})
+        return 204, {}, None
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _dispatch(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        status, headers, payload = self.server.fake.handle(
+                self.command, self.path, self.headers, body)
+        data = b'' if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, str(value))
+        if payload is not None:  # discord.py decodes any body labelled as JSON
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _dispatch
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # a load test's burst opens more connections at once than the default 5
+
+
+def serve(fake, host='127.0.0.1', port=0, verbose=False):
+    """
+    Start the stand-in on a background thread.
+    :return: (server, endpoint) where endpoint is the API base url to give to a client
+    """
+    server = Server((host, port), RequestHandler)
+    server.fake = fake
+    server.verbose = verbose
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, 'http://%s:%d%s' % (host, server.server_address[1], API_PREFIX)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='up to this many more seconds added at random')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='fraction of requests answered with a 500')
+    parser.add_argument('--rate-limit', action='append', type=parse_rate_limit, default=[], metavar='ROUTE=N/SECONDS',
+                        help="override a route's rate limit, e.g. 'POST /channels/{channel_id}/messages=5/5'")
+    parser.add_argument('--inject-429', type=float, default=0.0, help='fraction of requests answered with a 429')
+    args = parser.parse_args()
+
+    fake = FakeDiscord(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate,
+                       rate_limits=dict(DEFAULT_RATE_LIMITS, **dict(args.rate_limit)), rate_limit_rate=args.inject_429)
+    server, endpoint = serve(fake, args.host, args.port, verbose=True)
+    print('Fake Discord API listening on %s' % endpoint)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Opt-in recording of the gateway events the bot receives, to be replayed with loadtest.py --replay.
+
+Start bot.py with CPUBOT_TRACE=/path/to/trace.jsonl.gz to record. READY, messages and member joins are appended
+as gzip JSON lines, each with its time in seconds since the recording started. Traces are anonymized as they are
+written: user and channel ids become sequence numbers (except keep_ids, i.e. the admins hardcoded in bot.py) and
+message content is reduced to command words, numbers and the attendance key placeholder; every other word becomes
+filler of the same length.
+"""
+import datetime
+import gzip
+import json
+import time
+
+VERSION = 1
+RECORDED_EVENTS = ('READY', 'MESSAGE_CREATE', 'GUILD_MEMBER_ADD')
+ANSWERS = ('yes', 'no', 'cancel', 'proceed')  # replies to the bot's questions
+CHECKIN = '<checkin>'  # stands for the attendance key of a meeting in progress
+FILLER = 'x'
+
+
+class TraceRecorder:
+    def __init__(self, path, keep_words=(), keep_ids=(), meeting_keys=lambda: (), flush_interval=10):
+        """
+        :param keep_words: words kept in message content, in lower case
+        :param keep_ids: user ids written as they are
+        :param meeting_keys: returns the attendance keys of the meetings in progress, one per guild at most
+        """
+        self.path = path
+        self.keep_words = set(keep_words) | set(ANSWERS)
+        self.keep_ids = set(keep_ids)
+        self.meeting_keys = meeting_keys
+        self.flush_interval = flush_interval
+        self.events = 0
+        self._ids = {}
+        self._self_id = None
+        self._started = self._flushed = time.monotonic()
+        self._file = gzip.open(path, 'at', encoding='utf-8')  # a restart starts a new session in the same file
+        self._write({'version': VERSION, 'started': datetime.datetime.utcnow().isoformat()})
+
+    def anonymize_id(self, value):
+        value = int(value)
+        if value in self.keep_ids:
+            return value
+        return self._ids.setdefault(value, len(self._ids) + 1)
+
+    def anonymize_content(self, content):
+        if content.strip() in self.meeting_keys():
+            return CHECKIN
+        words = content.split(' ')
+        if words[0].lower() not in self.keep_words:
+            return FILLER * len(content)
+        return ' '.join(word if word.lower() in self.keep_words or word.replace('.', '', 1).isdigit()
+                        else FILLER * len(word) for word in words)
+
+    def record(self, msg):
+        """Record a decoded gateway payload, as passed to on_socket_response."""
+        if not isinstance(msg, dict) or msg.get('op') != 0 or msg.get('t') not in RECORDED_EVENTS:
+            return
+        event, data = msg['t'], msg['d']
+        if event == 'READY':
+            self._self_id = int(data['user']['id'])
+            entry = {'guilds': len(data.get('guilds', ()))}
+        elif event == 'MESSAGE_CREATE':
+            if int(data['author']['id']) == self._self_id:
+                return  # our own replies, which a replay produces again
+            entry = {
+                'author'     : self.anonymize_id(data['author']['id']),
+                'bot'        : data['author'].get('bot', False),
+                'channel'    : self.anonymize_id(data['channel_id']),
+                'guild'      : 'guild_id' in data,
+                'content'    : self.anonymize_content(data.get('content', '')),
+                'attachments': len(data.get('attachments', ())),
+            }
+        else:
+            entry = {
+                'user' : self.anonymize_id(data['user']['id']),
+                'bot'  : data['user'].get('bot', False),
+                'named': data.get('nick') is not None,
+            }
+        self._write({'t': round(time.monotonic() - self._started, 3), 'e': event, 'd': entry})
+
+    def _write(self, entry):
+        self._file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self.events += 1
+        now = time.monotonic()
+        if now - self._flushed > self.flush_interval:
+            self._file.flush()
+            self._flushed = now
+
+    def close(self):
+        self._file.close()
+
+
+def read_trace(path):
+    """
+    Yield (session, seconds, event, data) from a trace. Sessions, one per run of the bot, follow each other
+    without a gap. Anonymized ids are only meaningful within their session.
+    """
+    session = -1
+    offset = last = 0.0
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        try:
+            for line in f:
+                entry = json.loads(line)
+                if 'version' in entry:
+                    session += 1
+                    offset = last
+                    continue
+                last = offset + entry['t']
+                yield session, last, entry['e'], entry['d']
+        except (EOFError, ValueError):
+            return  # the bot stopped in the middle of writing
@@ -0,0 +1,175 @@
+"""
+A job queue in db.sqlite3 (tables job and job_progress, created by oauth migration 0009, and job_delivery, 0010)
+shared by bot.py, which enqueues jobs and reports on them, and worker.py, which runs them.
+
+A worker claims a queued job by taking a lease on it and keeps the lease alive while the job runs. A job whose
+worker died is claimed again once its lease expires. Failed jobs are retried with a backoff up to max_attempts;
+handlers save a checkpoint with their progress so that a retry resumes instead of starting over. Campaigns also
+commit every delivery as it happens, so that a retry after a crash only repeats the one that was in flight.
+"""
+import asyncio
+import collections
+import json
+import secrets
+import time
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+RETRY_BACKOFF = 30  # seconds before the first retry, doubled for every attempt after that
+
+JOB_COLUMNS = ('id', 'kind', 'payload', 'state', 'attempts', 'max_attempts', 'run_after', 'lease_owner',
+               'lease_expires', 'requested_by', 'channel_id', 'created', 'started', 'finished', 'checkpoint',
+               'result', 'error', 'done', 'total', 'note')
+JSON_COLUMNS = ('payload', 'checkpoint', 'result')
+
+Job = collections.namedtuple('Job', JOB_COLUMNS)
+
+SELECT_JOB = ('SELECT j.id, j.kind, j.payload, j.state, j.attempts, j.max_attempts, j.run_after, j.lease_owner, '
+              'j.lease_expires, j.requested_by, j.channel_id, j.created, j.started, j.finished, j.checkpoint, '
+              'j.result, j.error, p.done, p.total, p.note FROM job j LEFT JOIN job_progress p ON p.job_id=j.id ')
+
+
+def make_job(row):
+    row = list(row)
+    for column in JSON_COLUMNS:
+        index = JOB_COLUMNS.index(column)
+        if row[index] is not None:
+            row[index] = json.loads(row[index])
+    return Job(*row)
+
+
+class JobQueue:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def enqueue(self, kind, payload, requested_by=None, channel_id=None, max_attempts=3, run_after=None) -> int:
+        """:return: the id of the new job"""
+        now = time.time()
+        cursor = self.conn.execute(
+                'INSERT INTO job (kind, payload, state, max_attempts, run_after, requested_by, channel_id, created) '
+                'VALUES (?,?,?,?,?,?,?,?)',
+                (kind, json.dumps(payload), QUEUED, max_attempts, run_after or now, requested_by, channel_id, now))
+        self.conn.commit()
+        return cursor.lastrowid
+
+    def get(self, job_id):
+        row = self.conn.execute(SELECT_JOB + 'WHERE j.id=?', (job_id,)).fetchone()
+        return make_job(row) if row else None
+
+    def recent(self, limit=10) -> list:
+        return [make_job(row) for row in self.conn.execute(SELECT_JOB + 'ORDER BY j.id DESC LIMIT ?', (limit,))]
+
+    def unfinished(self) -> list:
+        return [make_job(row) for row in self.conn.execute(
+                SELECT_JOB + 'WHERE j.state IN (?,?) ORDER BY j.id', (QUEUED, RUNNING))]
+
+    def cancel(self, job_id) -> bool:
+        """Cancel a job that has not finished. A running job is stopped at its worker's next heartbeat."""
+        cursor = self.conn.execute('UPDATE job SET state=?, finished=? WHERE id=? AND state IN (?,?)',
+                                   (CANCELLED, time.time(), job_id, QUEUED, RUNNING))
+        self.conn.commit()
+        return cursor.rowcount == 1
+
+    def claim(self, worker, kinds, lease):
+        """
+        Take a lease of `lease` seconds on the oldest job of one of `kinds` that is due, or whose worker died.
+        :return: the job or None
+        """
+        now = time.time()
+        owner = f'{worker}/{secrets.token_hex(4)}'
+        marks = ','.join('?' * len(kinds))
+        # a job that ran out of attempts because its workers kept dying is not claimed again
+        self.conn.execute('UPDATE job SET state=?, finished=?, error=? WHERE state=? AND lease_expires<? '
+                          'AND attempts>=max_attempts', (FAILED, now, 'The worker stopped.', RUNNING, now))
+        cursor = self.conn.execute(
+                'UPDATE job SET state=?, lease_owner=?, lease_expires=?, attempts=attempts+1, started=? WHERE id=('
+                f'SELECT id FROM job WHERE kind IN ({marks}) AND '
+                '((state=? AND run_after<=?) OR (state=? AND lease_expires<?)) ORDER BY id LIMIT 1)',
+                (RUNNING, owner, now + lease, now, *kinds, QUEUED, now, RUNNING, now))
+        self.conn.commit()  # a single UPDATE, so two workers cannot claim the same job
+        if cursor.rowcount == 0:
+            return None
+        return make_job(self.conn.execute(SELECT_JOB + 'WHERE j.lease_owner=?', (owner,)).fetchone())
+
+    def heartbeat(self, job, lease) -> bool:
+        """Extend the lease. :return: False if the job was cancelled or claimed by another worker"""
+        cursor = self.conn.execute('UPDATE job SET lease_expires=? WHERE id=? AND state=? AND lease_owner=?',
+                                   (time.time() + lease, job.id, RUNNING, job.lease_owner))
+        self.conn.commit()
+        return cursor.rowcount == 1
+
+    def progress(self, job, done, total=None, note=None, checkpoint=None):
+        now = time.time()
+        self.conn.execute('INSERT OR REPLACE INTO job_progress (job_id, done, total, note, updated) VALUES (?,?,?,?,?)',
+                          (job.id, done, total, note, now))
+        if checkpoint is not None:
+            self.conn.execute('UPDATE job SET checkpoint=? WHERE id=? AND lease_owner=?',
+                              (json.dumps(checkpoint), job.id, job.lease_owner))
+        self.conn.commit()
+
+    def deliveries(self, job) -> dict:
+        """:return: recipient -> error, or None if delivered, of the recipients handled by every attempt of job"""
+        return dict(self.conn.execute('SELECT recipient, error FROM job_delivery WHERE job_id=?', (job.id,)))
+
+    def record_delivery(self, job, recipient, error=None):
+        self.conn.execute('INSERT OR REPLACE INTO job_delivery (job_id, recipient, error) VALUES (?,?,?)',
+                          (job.id, recipient, error))
+        self.conn.commit()
+
+    def complete(self, job, result=None):
+        self.conn.execute('UPDATE job SET state=?, finished=?, result=?, lease_owner=NULL '
+                          'WHERE id=? AND state=? AND lease_owner=?',
+                          (DONE, time.time(), json.dumps(result), job.id, RUNNING, job.lease_owner))
+        self.conn.commit()
+
+    def fail(self, job, error, retry=True) -> bool:
+        """:return: whether the job will be retried"""
+        now = time.time()
+        if retry and job.attempts < job.max_attempts:
+            self.conn.execute('UPDATE job SET state=?, run_after=?, error=?, lease_owner=NULL '
+                              'WHERE id=? AND state=? AND lease_owner=?',
+                              (QUEUED, now + RETRY_BACKOFF * 2 ** (job.attempts - 1), error, job.id, RUNNING,
+                               job.lease_owner))
+            retried = True
+        else:
+            self.conn.execute('UPDATE job SET state=?, finished=?, error=?, lease_owner=NULL '
+                              'WHERE id=? AND state=? AND lease_owner=?',
+                              (FAILED, now, error, job.id, RUNNING, job.lease_owner))
+            retried = False
+        self.conn.commit()
+        return retried
+
+    async def watch(self, job_id, on_progress=None, interval=2):
+        """
+        Poll a job until it finishes.
+        :param on_progress: coroutine function called with the job whenever its progress changes
+        :return: the finished job
+        """
+        last = None
+        while True:
+            job = self.get(job_id)
+            if job.state in FINISHED:
+                return job
+            if on_progress is not None and (job.done, job.note) != last and job.done is not None:
+                last = job.done, job.note
+                await on_progress(job)
+            await asyncio.sleep(interval)
+
+
+def describe(job) -> str:
+    """One line about a job, e.g. for the `jobs` command"""
+    line = f'#{job.id} {job.kind} {job.state}'
+    if job.done is not None:
+        line += f' {job.done}/{job.total}' if job.total is not None else f' {job.done}'
+    if job.state == QUEUED and job.run_after > time.time():
+        line += f' until {time.strftime("%Y-%m-%d %H:%M", time.localtime(job.run_after))}'
+    if job.attempts > 1 or (job.state == QUEUED and job.attempts):
+        line += f' (attempt {job.attempts}/{job.max_attempts})'
+    if job.note:
+        line += f': {job.note}'
+    return line
@@ -0,0 +1,528 @@
+"""
+End-to-end load test of bot.py against the Discord stand-in in fake_discord.py.
+
+    python loadtest.py --members 500 --latency 0.05 --inject-429 0.01
+
+A scratch database is migrated and seeded with signed up members, then bot.py is started in that directory with
+discord.py's REST routes pointed at the stand-in. Gateway events are fed to the client through the parsers of its
+connection state, the way the websocket would deliver them, and the replies of the bot are timed as they reach the
+stand-in. Jobs the bot enqueues, like announcements, are run by a worker.py Worker on the same event loop.
+send_email is not covered: it talks to the SMTP server, not to Discord.
+
+Instead of synthetic scenarios, a trace recorded by gateway_trace.py can be replayed at its own pace or faster:
+
+    python loadtest.py --replay trace.jsonl.gz --speed 10
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import re
+import secrets
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import database
+import fake_discord
+import gateway_trace
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+FIRST_MEMBER_ID = 600000000000000000
+FIRST_CHANNEL_ID = 700000000000000000
+GUILD_ID = 426702004606337034  # bot.py's CPU_guild_id
+ADMIN_ID = 456243117671055371  # Ethan, one of its admins in bot.py's GUILDS
+STAFF_IDS = (ADMIN_ID, 179685458991644673, 387486747770224642, 268759214610972673)
+GUILD_CHANNELS = ('announcements', 'new-members', 'feedback', 'general')
+EVERYONE_PERMISSIONS = 104324673  # Discord's default, which includes reading messages
+DM_COMMANDS = ('attendance status', 'attendance list', 'opt in dm', 'help')
+# state changes made through REST calls that the gateway would echo back to the client
+FORWARDED_EVENTS = ('MESSAGE_CREATE', 'MESSAGE_UPDATE', 'GUILD_MEMBER_ADD', 'GUILD_MEMBER_UPDATE', 'GUILD_MEMBER_REMOVE')
+
+
+def user_payload(user_id):
+    return {'id': str(user_id), 'username': 'member%d' % (user_id % 100000), 'avatar': None,
+            'discriminator': str(user_id % 10000).zfill(4)}
+
+
+def seed_database(path, user_ids, meetings, attendance_rate=0.7, guild_id=GUILD_ID):
+    """Migrate a new database at path and sign up user_ids, with `meetings` past meetings of attendance in guild_id."""
+    subprocess.run([sys.executable, 'manage.py', 'migrate', '--verbosity', '0'], cwd=REPO_DIR, check=True,
+                   env=dict(os.environ, CPUBOT_DATABASE=path))
+    now = datetime.datetime.now()
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany(
+                'INSERT INTO oauth_record (id, time_requested, first_name, last_name, discord_username, discord_user_id, '
+                'school_email, school_email_normalized, state, access_token, refresh_token, token_type, expires_at, '
+                "join_success, opt_out_email, opt_out_pm) VALUES (?,?,?,?,?,?,?,?,?,?,?,'Bearer',?,1,0,0)",
+                [(i, now, 'First%d' % i, 'Last%d' % i, 'member%d' % (user_id % 100000), user_id,
+                  'student%d@choate.edu' % i, 'student%d@choate.edu' % i, secrets.token_hex(16), secrets.token_hex(15),
+                  secrets.token_hex(15), now + datetime.timedelta(days=7))
+                 for i, user_id in enumerate(user_ids, 1)])
+        conn.executemany('INSERT INTO oauth_person (id, record_id) VALUES (?,?)',
+                         [(i, i) for i in range(1, len(user_ids) + 1)])
+        conn.executemany('INSERT INTO oauth_identity (kind, value, person_id) VALUES (?,?,?)',
+                         [(kind, value, i) for i, user_id in enumerate(user_ids, 1)
+                          for kind, value in (('email', 'student%d@choate.edu' % i), ('discord', str(user_id)))])
+        for week in range(meetings, 0, -1):
+            start = now - datetime.timedelta(weeks=week)
+            meeting_id = conn.execute('INSERT INTO meeting (guild_id, key, weight, start, "end") VALUES (?,?,1,?,?)',
+                                      (guild_id, secrets.token_hex(3), start,
+                                       start + datetime.timedelta(hours=1))).lastrowid
+            conn.executemany('INSERT INTO attendance (discord_user_id, time, effective, meeting_id) VALUES (?,?,1,?)',
+                             [(user_id, start, meeting_id) for user_id in user_ids
+                              if random.random() < attendance_rate])
+    conn.close()
+
+
+class FakeGatewaySocket:
+    """Takes the place of client.ws: presence updates are dropped and member requests are answered by the script."""
+
+    def __init__(self, gateway):
+        self.gateway = gateway
+
+    async def change_presence(self, *, activity=None, status=None, afk=False, since=0.0):
+        pass
+
+    async def send_as_json(self, data):
+        if data.get('op') == 8:  # REQUEST_GUILD_MEMBERS, sent while getting ready when the guild is large
+            self.gateway.loop.call_soon(self.gateway.send_member_chunks)
+
+
+class ScriptedGateway:
+    """
+    Feeds gateway events to a discord.Client and lets the script wait for what the client sends back.
+    Everything but the constructor runs on the client's event loop.
+    """
+
+    def __init__(self, client, fake, guild_id, member_ids, chunk_size=1000):
+        self.client = client
+        self.fake = fake
+        self.loop = client.loop
+        self.guild_id = guild_id
+        self.member_ids = list(member_ids)
+        self.chunk_size = chunk_size
+        self.channel_ids = {name: str(FIRST_CHANNEL_ID + i) for i, name in enumerate(GUILD_CHANNELS)}
+        self.dm_channels = {}  # user id -> channel id
+        self._waiters = []  # (events, predicate, future)
+        for user_id in self.member_ids:
+            fake.add_user(user_payload(user_id))
+        for event in FORWARDED_EVENTS:
+            fake.subscribe(event, self._forwarder(event))
+
+    def _forwarder(self, event):
+        def forward(data):  # called on the stand-in's request threads
+            self.loop.call_soon_threadsafe(self._received, event, data, time.perf_counter())
+        return forward
+
+    def _received(self, event, data, received_at):
+        self.feed(event, data)
+        self._waiters = [waiter for waiter in self._waiters if not waiter[2].done()]  # timed out
+        for waiter in list(self._waiters):
+            events, predicate, future = waiter
+            if event in events and not future.done() and predicate(data):
+                future.set_result((received_at, data))
+                self._waiters.remove(waiter)
+
+    def feed(self, event, data):
+        self.client._connection.parsers[event](data)
+
+    def expect(self, predicate, events=('MESSAGE_CREATE',)):
+        """
+        :param events: also MESSAGE_UPDATE to match messages the bot edits
+        :return: a future set to (time received, message) for the next message sent by the bot matching predicate
+        """
+        future = self.loop.create_future()
+        self._waiters.append((events, predicate, future))
+        return future
+
+    def expect_reply(self, channel_id, text=''):
+        return self.expect(lambda data: data['channel_id'] == channel_id and text in data['content'])
+
+    async def login(self):
+        await self.client.http.static_login('fake-token', bot=True)
+        self.client._connection.is_bot = True
+        self.client.ws = FakeGatewaySocket(self)
+        self.feed('READY', {'v': 6, 'user': self.fake.bot_user, 'session_id': secrets.token_hex(16),
+                            'guilds': [{'id': str(self.guild_id), 'unavailable': True}],
+                            'private_channels': [], 'relationships': [], '_trace': []})
+        self.feed('GUILD_CREATE', self.guild_payload())
+        await self.client.wait_until_ready()
+
+    @staticmethod
+    def member_payload(user, nick=None):
+        return {'user': user, 'nick': nick, 'roles': [], 'deaf': False, 'mute': False,
+                'joined_at': datetime.datetime.now(datetime.timezone.utc).isoformat()}
+
+    def member_payloads(self):
+        return [self.member_payload(self.fake.bot_user)] + [
+            self.member_payload(self.fake.user(user_id), 'First%d Last%d' % (i, i))
+            for i, user_id in enumerate(self.member_ids, 1)]
+
+    def guild_payload(self):
+        members = self.member_payloads()
+        large = len(members) >= 250  # Discord leaves the members of large guilds to be requested in chunks
+        return {
+            'id'          : str(self.guild_id),
+            'name'        : 'CPU',
+            'owner_id'    : str(STAFF_IDS[-1]),
+            'region'      : 'us-east',
+            'member_count': len(members),
+            'large'       : large,
+            'unavailable' : False,
+            'members'     : [] if large else members,
+            'roles'       : [{'id': str(self.guild_id), 'name': '@everyone', 'permissions': EVERYONE_PERMISSIONS,
+                              'position': 0, 'color': 0, 'hoist': False, 'managed': False, 'mentionable': False}],
+            'channels'    : [{'id': channel_id, 'type': 0, 'name': name, 'position': i, 'permission_overwrites': [],
+                              'topic': None, 'nsfw': False, 'parent_id': None, 'last_message_id': None}
+                             for i, (name, channel_id) in enumerate(self.channel_ids.items())],
+            'presences'   : [], 'voice_states': [], 'emojis': [], 'features': [],
+        }
+
+    def send_member_chunks(self):
+        members = self.member_payloads()
+        for start in range(0, len(members), self.chunk_size):
+            self.feed('GUILD_MEMBERS_CHUNK', {'guild_id': str(self.guild_id),
+                                              'members': members[start:start + self.chunk_size]})
+
+    def dm_channel(self, user_id) -> str:
+        if user_id not in self.dm_channels:
+            _, _, channel = self.fake.create_dm({}, json.dumps({'recipient_id': str(user_id)}).encode())
+            self.feed('CHANNEL_CREATE', channel)
+            self.dm_channels[user_id] = channel['id']
+        return self.dm_channels[user_id]
+
+    def message(self, user_id, channel_id, content, guild=False):
+        data = {
+            'id'              : self.fake.next_id(),
+            'channel_id'      : channel_id,
+            'author'          : self.fake.user(user_id),
+            'content'         : content,
+            'timestamp'       : datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'edited_timestamp': None, 'tts': False, 'mention_everyone': False, 'mentions': [], 'mention_roles': [],
+            'attachments'     : [], 'embeds': [], 'pinned': False, 'type': 0,
+        }
+        if guild:
+            data['guild_id'] = str(self.guild_id)
+        self.feed('MESSAGE_CREATE', data)
+
+    def dm(self, user_id, content):
+        """A member sends the bot a direct message."""
+        self.message(user_id, self.dm_channel(user_id), content)
+
+    def member_join(self, user_id, nick):
+        user = self.fake.add_user(user_payload(user_id))
+        self.feed('GUILD_MEMBER_ADD', dict(self.member_payload(user, nick), guild_id=str(self.guild_id)))
+
+
+class Stats:
+    def __init__(self, name, fake):
+        self.name = name
+        self.fake = fake
+        self.latencies = []
+        self.timeouts = 0
+        self.extra = {}
+        self._first_request = len(fake.requests)
+        self._started = time.perf_counter()
+        self.elapsed = None
+
+    async def timed(self, waiter, sent_at, timeout):
+        try:
+            received_at, _ = await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+        else:
+            self.latencies.append(received_at - sent_at)
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self._started
+        return self
+
+    def result(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1) if latencies else None
+
+        statuses = [status for _, _, status in self.fake.requests[self._first_request:]]
+        return {
+            'scenario'     : self.name,
+            'completed'    : len(latencies),
+            'timed_out'    : self.timeouts,
+            'seconds'      : round(self.elapsed, 3),
+            'per_second'   : round(len(latencies) / self.elapsed, 1) if self.elapsed else None,
+            'p50_ms'       : percentile(0.5),
+            'p95_ms'       : percentile(0.95),
+            'p99_ms'       : percentile(0.99),
+            'max_ms'       : percentile(1),
+            'requests'     : len(statuses),
+            'rate_limited' : statuses.count(429),
+            'server_errors': sum(status >= 500 for status in statuses),
+            **self.extra,
+        }
+
+
+class TraceUsers:
+    """Synthetic user ids for the people in a trace."""
+
+    def __init__(self, trace):
+        self.ids = {}  # (session, anonymized id) -> user id
+        self.joining = []  # the users who first appear joining the guild
+        for session, _, event, data in trace:
+            if data.get('bot'):
+                continue
+            if event == 'MESSAGE_CREATE':
+                self.user_id(session, data['author'])
+            elif event == 'GUILD_MEMBER_ADD' and (session, data['user']) not in self.ids:
+                self.joining.append(self.user_id(session, data['user']))
+
+    def user_id(self, session, anonymized):
+        if anonymized >= 1 << 32:
+            return anonymized  # a real id kept by the recorder, i.e. an admin
+        return self.ids.setdefault((session, anonymized), FIRST_MEMBER_ID + len(self.ids))
+
+    @property
+    def members(self):
+        joining = set(self.joining)
+        return [user_id for user_id in self.ids.values() if user_id not in joining]
+
+
+class LoadTest:
+    def __init__(self, gateway, member_ids, timeout=60, think_time=0.2, meeting_key=lambda: None):
+        self.gateway = gateway
+        self.fake = gateway.fake
+        self.member_ids = [user_id for user_id in member_ids if user_id not in STAFF_IDS]
+        self.timeout = timeout
+        self.think_time = think_time  # how long an admin takes to answer the bot
+        self.meeting_key = meeting_key
+
+    async def converse(self, channel_id, content, expected):
+        """Send content as the admin and wait for the bot's reply containing `expected`."""
+        reply = self.gateway.expect_reply(channel_id, expected)
+        self.gateway.dm(ADMIN_ID, content)
+        _, data = await asyncio.wait_for(reply, self.timeout)
+        await asyncio.sleep(self.think_time)
+        return data
+
+    async def burst(self, stats, contents, expected=''):
+        """Every member DMs the bot at once, each waits for the first reply."""
+        waits = []
+        for user_id, content in zip(self.member_ids, contents):
+            waiter = self.gateway.expect_reply(self.gateway.dm_channel(user_id), expected)
+            sent_at = time.perf_counter()
+            self.gateway.dm(user_id, content)
+            waits.append(stats.timed(waiter, sent_at, self.timeout))
+        await asyncio.gather(*waits)
+
+    async def dm(self, rounds=1):
+        stats = Stats('dm', self.fake)
+        for r in range(rounds):
+            await self.burst(stats, (DM_COMMANDS[(i + r) % len(DM_COMMANDS)] for i in range(len(self.member_ids))))
+        return stats.stop()
+
+    async def checkin(self):
+        admin = self.gateway.dm_channel(ADMIN_ID)
+        data = await self.converse(admin, 'meeting begin', 'Attendance key')
+        key = re.search(r'`(\w+)`', data['content']).group(1)
+        stats = Stats('checkin', self.fake)
+        await self.burst(stats, [key] * len(self.member_ids), 'attendance')
+        stats.stop()
+        await self.converse(admin, 'meeting end', 'Meeting is over')
+        return stats
+
+    async def announcement(self, schedule='now', start=None, name='announcement'):
+        """
+        :param schedule: the answer to "When should I send it?", see bot.parse_schedule
+        :param start: the datetime schedule stands for, from which the replies are timed, if not now
+        """
+        admin = self.gateway.dm_channel(ADMIN_ID)
+        body = 'Load test announcement %s' % secrets.token_hex(4)
+        await self.converse(admin, 'announcement', 'Please send me the announcement')
+        await self.converse(admin, body, 'attach')
+        await self.converse(admin, 'no', 'Confirm?')
+        await self.converse(admin, 'yes', 'When should I send it?')
+
+        stats = Stats(name, self.fake)
+        waits = [self.gateway.expect_reply(self.gateway.dm_channel(user_id), body) for user_id in self.member_ids]
+        waits.append(self.gateway.expect_reply(self.gateway.channel_ids['announcements'], body))
+        # the summary replaces the job's progress message, if it took long enough to have one
+        summary = self.gateway.expect(lambda data: data.get('channel_id') == admin and any(
+                'successfully sent' in embed.get('title', '') for embed in data.get('embeds', ())),
+                ('MESSAGE_CREATE', 'MESSAGE_UPDATE'))
+        delay = max(0.0, (start - datetime.datetime.now()).total_seconds()) if start else 0.0
+        sent_at = time.perf_counter() + delay
+        self.gateway.dm(ADMIN_ID, schedule)
+        await asyncio.gather(*(stats.timed(waiter, sent_at, delay + self.timeout) for waiter in waits))
+        await asyncio.wait_for(summary, delay + self.timeout)
+        return stats.stop()
+
+    async def scheduled_announcement(self):
+        """An announcement scheduled for a minute from now: times how soon the worker sends it once it is due."""
+        start = (datetime.datetime.now() + datetime.timedelta(seconds=70)).replace(second=0, microsecond=0)
+        return await self.announcement(start.strftime('%H:%M'), start, 'scheduled_announcement')
+
+    async def member_join(self, count):
+        stats = Stats('member_join', self.fake)
+        waits = []
+        for i in range(count):
+            user_id = FIRST_MEMBER_ID + 10 ** 6 + i
+            nick = 'Newcomer%d Joined' % i
+            waiter = self.gateway.expect_reply(self.gateway.channel_ids['new-members'], nick)
+            sent_at = time.perf_counter()
+            self.gateway.member_join(user_id, nick)
+            waits.append(stats.timed(waiter, sent_at, self.timeout))
+        await asyncio.gather(*waits)
+        return stats.stop()
+
+    async def replay(self, trace, users, speed=1.0):
+        """Feed the events of a trace at their recorded times divided by speed, timing the replies to DMs."""
+        stats = Stats('replay', self.fake)
+        waits = []
+        lag = 0.0
+        started = time.perf_counter()
+        for session, at, event, data in trace:
+            delay = started + at / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            lag = max(lag, -delay)
+            if data.get('bot'):
+                continue
+            if event == 'MESSAGE_CREATE':
+                user_id = users.user_id(session, data['author'])
+                content = data['content']
+                if content == gateway_trace.CHECKIN:
+                    content = self.meeting_key() or content
+                if data['guild']:
+                    self.gateway.message(user_id, self.gateway.channel_ids['general'], content, guild=True)
+                    continue
+                waiter = self.gateway.expect_reply(self.gateway.dm_channel(user_id))
+                sent_at = time.perf_counter()
+                self.gateway.dm(user_id, content)
+                waits.append(asyncio.ensure_future(stats.timed(waiter, sent_at, self.timeout)))
+            elif event == 'GUILD_MEMBER_ADD':
+                user_id = users.user_id(session, data['user'])
+                self.gateway.member_join(user_id, 'Member%d Joined' % user_id if data['named'] else None)
+        await asyncio.gather(*waits)
+        stats.extra['max_lag_ms'] = round(lag * 1000, 1)  # how far behind schedule events were fed
+        return stats.stop()
+
+
+SCENARIOS = ('dm', 'checkin', 'announcement', 'scheduled_announcement', 'member_join')
+
+
+async def run(cpubot, fake, member_ids, args, trace=None, users=None):
+    gateway = ScriptedGateway(cpubot.bot, fake, cpubot.CPU_guild_id, member_ids)
+    await gateway.login()
+    context = cpubot.GuildContext.default()
+    while not hasattr(cpubot.bot, 'token_refresher_task'):  # on_ready runs as a task of its own
+        await asyncio.sleep(0.05)
+    for user_id in member_ids:  # as if everyone had talked to the bot before
+        gateway.dm_channel(user_id)
+    import worker
+    # without a DM budget, so that the announcement scenario measures the fan-out against the stand-in's rate limits
+    job_worker = worker.Worker(database.connect('db.sqlite3'), poll_interval=0.1, dm_per_second=None,
+                               governor=cpubot.governor)
+    worker_task = asyncio.ensure_future(job_worker.run())  # announcements are sent by the worker
+
+    test = LoadTest(gateway, member_ids, args.timeout, args.think_time,
+                    meeting_key=lambda: context.meeting.key if context.meeting else None)
+    if args.max_handlers is not None:
+        cpubot.handler_slots.limit = args.max_handlers
+    results = []
+
+    async def measure(scenario):
+        shed, throttled = cpubot.handler_slots.shed, cpubot.command_throttle.limited
+        stats = await scenario
+        stats.extra['shed'] = cpubot.handler_slots.shed - shed  # commands turned away by the bot's MAX_HANDLERS
+        stats.extra['throttled'] = cpubot.command_throttle.limited - throttled
+        results.append(stats.result())
+        print(format_result(results[-1]), flush=True)
+
+    if args.replay:
+        await measure(test.replay(trace, users, args.speed))
+    for scenario in args.scenario or (() if args.replay else SCENARIOS):
+        if scenario == 'dm':
+            await measure(test.dm(args.rounds))
+        elif scenario == 'member_join':
+            await measure(test.member_join(args.joins))
+        else:
+            await measure(getattr(test, scenario)())
+
+    cpubot.bot.token_refresher_task.cancel()
+    worker_task.cancel()
+    if job_worker._http is not None:
+        await job_worker._http.close()
+    await cpubot.bot.http.close()
+    return results
+
+
+def format_result(result):
+    return ('{scenario:<22} {completed:>6} done {timed_out:>4} timed out {seconds:>8.2f} s {per_second:>8}/s  '
+            'p50 {p50_ms} ms  p95 {p95_ms} ms  p99 {p99_ms} ms  max {max_ms} ms  '
+            '{requests} requests, {rate_limited} rate limited, {server_errors} server errors, '
+            '{shed} shed, {throttled} throttled').format(**result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--members', type=int, default=200, help='signed up members besides the admins')
+    parser.add_argument('--meetings', type=int, default=10, help='past meetings to seed attendance for')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, help='run only these, in order')
+    parser.add_argument('--rounds', type=int, default=1, help='commands each member sends in the dm scenario')
+    parser.add_argument('--max-handlers', type=int, help="override bot.py's MAX_HANDLERS")
+    parser.add_argument('--joins', type=int, default=50, help='members joining in the member_join scenario')
+    parser.add_argument('--timeout', type=float, default=120, help='seconds to wait for any one reply')
+    parser.add_argument('--think-time', type=float, default=0.2, help='seconds an admin takes to answer the bot')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds the stand-in adds to every request')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--inject-429', type=float, default=0.0)
+    parser.add_argument('--rate-limit', action='append', type=fake_discord.parse_rate_limit, default=[],
+                        metavar='ROUTE=N/SECONDS')
+    parser.add_argument('--no-rate-limits', action='store_true', help='answer as fast as the bot asks')
+    parser.add_argument('--replay', metavar='TRACE', help='replay a trace recorded by gateway_trace.py instead')
+    parser.add_argument('--speed', type=float, default=1.0, help='replay this many times faster than recorded')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    workdir = tempfile.mkdtemp(prefix='cpubot-loadtest-')
+    os.mkdir(os.path.join(workdir, 'images'))
+    trace = users = None
+    if args.replay:
+        trace = list(gateway_trace.read_trace(args.replay))
+        users = TraceUsers(trace)
+        member_ids = list(STAFF_IDS) + [user_id for user_id in users.members if user_id not in STAFF_IDS]
+    else:
+        member_ids = list(STAFF_IDS) + [FIRST_MEMBER_ID + i for i in range(args.members)]
+    seed_database(os.path.join(workdir, 'db.sqlite3'), member_ids + (users.joining if users else []), args.meetings)
+
+    rate_limits = {} if args.no_rate_limits else dict(fake_discord.DEFAULT_RATE_LIMITS, **dict(args.rate_limit))
+    fake = fake_discord.FakeDiscord(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate,
+                                    rate_limits=rate_limits, rate_limit_rate=args.inject_429,
+                                    global_rate_limit=None if args.no_rate_limits else fake_discord.GLOBAL_RATE_LIMIT)
+    server, endpoint = fake_discord.serve(fake)
+
+    import discord.http
+    discord.http.Route.BASE = endpoint
+    os.chdir(workdir)  # init() opens db.sqlite3 in the working directory
+    import bot as cpubot
+    cpubot.init()
+    cpubot.token_refresher.api_endpoint = endpoint
+
+    print('%d members, database in %s, stand-in at %s' % (len(member_ids), workdir, endpoint), flush=True)
+    results = cpubot.bot.loop.run_until_complete(run(cpubot, fake, member_ids, args, trace, users))
+    server.shutdown()
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2, default=str)
+
+
+if __name__ == '__main__':
+    main()
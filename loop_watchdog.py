@@ -0,0 +1,110 @@
+import collections
+import datetime
+import os
+import sys
+import threading
+import time
+import traceback
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+Stall = collections.namedtuple('Stall', ('time', 'seconds', 'site', 'stack'))
+
+
+class SiteStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+
+class LoopWatchdog(threading.Thread):
+    """
+    Pings the event loop from a thread of its own. A ping not answered within `threshold` seconds means a callback
+    is blocking the loop: the loop thread's stack is captured right then, and the stall is recorded against the
+    innermost frame of our own code once the loop answers.
+    start() must be called on the loop's thread.
+    """
+
+    def __init__(self, loop, threshold=0.25, interval=0.1, max_stalls=100, logger=None):
+        super().__init__(name='loop-watchdog', daemon=True)
+        self.loop = loop
+        self.threshold = threshold
+        self.interval = interval
+        self.logger = logger
+        self.stalls = collections.deque(maxlen=max_stalls)
+        self.sites = collections.defaultdict(SiteStats)  # call site -> stalls there
+        self.pings = 0
+        self.max_lag = 0.0  # the longest a ping waited, stalls included
+        self.loop_thread_id = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        self.loop_thread_id = threading.get_ident()
+        super().start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            answered = threading.Event()
+            sent = time.monotonic()
+            try:
+                self.loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:
+                return  # the loop is closed
+            if not answered.wait(self.threshold):
+                stack = self.loop_stack()
+                while not answered.wait(1):
+                    if self._stopped.is_set() or self.loop.is_closed():
+                        return
+                self.record(time.monotonic() - sent, stack)
+            self.pings += 1
+            self.max_lag = max(self.max_lag, time.monotonic() - sent)
+
+    def loop_stack(self) -> traceback.StackSummary:
+        frame = sys._current_frames().get(self.loop_thread_id)
+        return traceback.extract_stack(frame) if frame is not None else traceback.StackSummary()
+
+    @staticmethod
+    def call_site(stack) -> str:
+        """The innermost frame in this project, e.g. 'bot.py:712 in send_email', or else the innermost frame."""
+        for frame in reversed(stack):
+            if frame.filename.startswith(PROJECT_DIR) and frame.filename != __file__:
+                break
+        else:
+            if not stack:
+                return 'unknown'
+            frame = stack[-1]
+        return '%s:%d in %s' % (os.path.relpath(frame.filename, PROJECT_DIR), frame.lineno, frame.name)
+
+    def record(self, seconds, stack):
+        site = self.call_site(stack)
+        self.stalls.append(Stall(datetime.datetime.now(), seconds, site, stack))
+        self.sites[site].add(seconds)
+        if self.logger is not None:
+            self.logger.warning('Event loop blocked for %.3f s at %s\n%s', seconds, site, ''.join(stack.format()))
+
+    def clear(self):
+        self.stalls.clear()
+        self.sites.clear()
+        self.max_lag = 0.0
+
+    def report(self, limit=10) -> str:
+        lines = [f'{len(self.stalls)} recent stalls over {self.threshold:g} s, longest ping {self.max_lag:.3f} s '
+                 f'in {self.pings} pings.']
+        if not self.sites:
+            return lines[0]
+        lines += ['', 'Count   Total s    Max s  Call site']
+        for site, stats in sorted(self.sites.items(), key=lambda item: item[1].total, reverse=True)[:limit]:
+            lines.append(f'{stats.count:>5} {stats.total:>9.3f} {stats.max:>8.3f}  {site}')
+        last = self.stalls[-1]
+        lines += ['', f'Last stall at {last.time:%Y-%m-%d %H:%M:%S}, {last.seconds:.3f} s:']
+        lines += [line.rstrip('\n') for line in last.stack.format()[-8:]]
+        return '\n'.join(lines)
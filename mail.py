@@ -0,0 +1,79 @@
+import re
+import smtplib
+import string
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+SMTP_HOST = 'mail.cpu.party'
+SMTP_PORT = 587
+SENDER = 'CPU Bot<bot@cpu.party>'
+
+EMAIL_TEMPLATE = string.Template("""
+Hi $name,
+
+$body
+
+Your beloved,
+CPU Bot
+""")
+EMAIL_HTML_TEMPLATE = string.Template(f"""
+<!DOCType html>
+<html>
+<head>
+    <title>$subject</title>
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <style>
+        .monospace {{
+            font-family: 'Courier New', monospace;
+        }}
+    </style>
+</head>
+    <body>
+    <img src="https://cpu.party/img/logos/1024w.jpg" width="100%" alt="CPU Logo">
+    <div class="monospace">
+<p>Hi $name,</p>
+
+$body
+
+<p>
+Your beloved,<br>
+CPU Bot
+</p>
+</div>
+    </body>
+</html>
+""")
+
+
+def linkify(html_body):
+    # Scan for potential urls
+    for link in re.findall(r'https?://(?:www\.)?[-a-zA-Z0-9@:%._+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b[-a-zA-Z0-9()@:%_+.~#?&/=]*',html_body):
+        if link.endswith('.'):
+            link=link[:-1]
+        html_body=html_body.replace(link,f'<a href="{link}">{link}</a>')
+    return html_body
+
+
+def build_email(subject, plain_body, html_body, name, address) -> MIMEMultipart:
+    email = MIMEMultipart("alternative")
+    email["Subject"] = subject
+    email["From"] = SENDER
+    email["To"] = address
+    email.attach(MIMEText(EMAIL_TEMPLATE.substitute({'name': name, 'body': plain_body}), 'plain'))
+    email.attach(MIMEText(EMAIL_HTML_TEMPLATE.safe_substitute({
+        'body'   : html_body,
+        'subject': subject,
+        'name'   : name
+    }), 'html'))
+    return email
+
+
+def smtp_connection(password) -> smtplib.SMTP:
+    """A logged in connection to our mail server. Blocking."""
+    email_server = smtplib.SMTP(SMTP_HOST)
+    email_server.connect(SMTP_HOST, SMTP_PORT)
+    email_server.starttls()
+    email_server.ehlo_or_helo_if_needed()
+    email_server.login('bot@cpu.party', password)
+    email_server.ehlo()
+    return email_server
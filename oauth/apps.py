@@ -1,5 +1,16 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+import database
+
+
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        database.configure(connection.connection)
 
 
 class OauthConfig(AppConfig):
     name = 'oauth'
+
+    def ready(self):
+        connection_created.connect(configure_connection)
@@ -0,0 +1,40 @@
+import datetime
+import secrets
+import time
+
+from django.db import connection
+
+# Same as the DM check-in in bot.py: the unique (meeting_id, discord_user_id) index drops repeated check-ins.
+INSERT_ATTENDANCE = 'INSERT OR IGNORE INTO attendance (discord_user_id, time, effective, meeting_id) VALUES (%s, %s, %s, %s)'
+
+MEETING_CACHE_SECONDS = 2
+
+
+def record(discord_user_id, meeting_id, effective) -> bool:
+    """:return: True if recorded, False if the member had already checked in to this meeting"""
+    with connection.cursor() as cursor:
+        cursor.execute(INSERT_ATTENDANCE, (discord_user_id, datetime.datetime.now(), effective, meeting_id))
+        return cursor.rowcount == 1
+
+
+_meetings = (0, ())
+
+
+def open_meetings():
+    """:return: (id, key, weight) of the meeting in progress of every guild. Cached for a couple of seconds."""
+    global _meetings
+    fetched, meetings = _meetings
+    if time.monotonic() - fetched > MEETING_CACHE_SECONDS:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT id, key, weight FROM meeting WHERE "end" IS NULL')
+            meetings = tuple(cursor.fetchall())
+        _meetings = (time.monotonic(), meetings)
+    return meetings
+
+
+def meeting_for_key(key):
+    """:return: (id, key, weight) of the meeting in progress with this attendance key or None"""
+    for meeting in open_meetings():
+        if secrets.compare_digest(key.encode(), meeting[1].encode()):
+            return meeting
+    return None
@@ -0,0 +1,218 @@
+import collections
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils.timezone import now, timedelta
+
+import ratelimit
+from CPUBot.settings import CLIENT_ID, CLIENT_SECRET, REDIRECT_URI
+from oauth.models import Record
+
+SOURCE_COLUMNS = ('id', 'first_name', 'last_name', 'school_email', 'refresh_token',
+                  'opt_out_pm', 'opt_out_email', 'state', 'time_requested', 'person_id')
+TARGET_COLUMNS = ('access_token', 'discord_user_id', 'discord_username', 'expires_at',
+                  'first_name', 'id', 'join_success', 'last_name', 'opt_out_email',
+                  'opt_out_pm', 'refresh_token', 'school_email', 'state',
+                  'time_requested', 'token_type')
+
+SourceRow = collections.namedtuple('SourceRow', SOURCE_COLUMNS)
+
+
+class Command(BaseCommand):
+    help = ('Refresh the OAuth token of every joined record and copy the deduplicated records '
+            'into another table. Progress is checkpointed so an interrupted sweep can be resumed.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--into', default='oauth_record_copy',
+                            help='table the swept records are inserted into')
+        parser.add_argument('--workers', type=int, default=8,
+                            help='number of concurrent requests to the Discord API')
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='records refreshed and committed together')
+        parser.add_argument('--timeout', type=float, default=10,
+                            help='timeout in seconds of each request to the Discord API')
+        parser.add_argument('--checkpoint', default='sweep.checkpoint.json',
+                            help='file recording the progress of the sweep')
+        parser.add_argument('--restart', action='store_true',
+                            help='ignore an existing checkpoint and start over')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='report what would be swept without calling Discord or writing anything')
+        parser.add_argument('--api-endpoint', default=settings.API_ENDPOINT,
+                            help='Discord API base url, e.g. a local fake_discord.py')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.target = connection.ops.quote_name(options['into'])
+        # a sweep waits for its turn and leaves part of every rate limit to the bot and signups
+        self.governor = ratelimit.Governor(ratelimit.path_for(settings.DATABASES['default']['NAME']))
+        if options['batch_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--batch-size and --workers must be positive')
+
+        done, seen = self.load_checkpoint()
+        with connection.cursor() as cursor:
+            if not options['dry_run']:
+                # rows already committed count as done even if the checkpoint was not written
+                cursor.execute('SELECT c.id, c.first_name, c.last_name, c.school_email, c.discord_user_id, r.person_id '
+                               'FROM %s c LEFT JOIN oauth_record r ON r.id=c.id' % self.target)
+                for record_id, first_name, last_name, school_email, user_id, person_id in cursor.fetchall():
+                    done.add(record_id)
+                    seen.update(self.identity_keys(first_name, last_name, school_email, person_id))
+                    if user_id is not None:
+                        seen.add(str(user_id))
+            cursor.execute('SELECT %s FROM oauth_record WHERE join_success=1 ORDER BY id DESC'
+                           % ','.join(SOURCE_COLUMNS))
+            pending = collections.deque(SourceRow(*row) for row in cursor.fetchall()
+                                        if row[0] not in done)
+
+        self.stdout.write('%d records to sweep, %d already done' % (len(pending), len(done)))
+        counts = collections.Counter()
+        with ThreadPoolExecutor(max_workers=self.options['workers']) as executor:
+            while pending:
+                batch = self.next_batch(pending, seen, done, counts)
+                if self.options['dry_run']:
+                    for row in batch:
+                        self.stdout.write('Would sweep %s %s' % (row.first_name, row.last_name))
+                        seen.update(self.identity_keys(row.first_name, row.last_name, row.school_email, row.person_id))
+                        counts['added'] += 1
+                    continue
+
+                values, swept = [], []
+                for row, result in zip(batch, executor.map(self.fetch, batch)):
+                    if isinstance(result, Exception):
+                        self.stderr.write('Failed %s %s: %r' % (row.first_name, row.last_name, result))
+                        counts['failed'] += 1
+                        continue
+                    token, info = result
+                    if info['id'] in seen:
+                        self.stdout.write('Removed (duplicate) %s' % info['id'])
+                        done.add(row.id)
+                        counts['duplicate'] += 1
+                        continue
+                    seen.add(info['id'])
+                    values.append(self.target_values(row, token, info))
+                    swept.append(row)
+
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.executemany('INSERT INTO %s (%s) VALUES (%s)' % (
+                        self.target, ','.join(TARGET_COLUMNS), ','.join(['%s'] * len(TARGET_COLUMNS))), values)
+                for row in swept:
+                    done.add(row.id)
+                    seen.update(self.identity_keys(row.first_name, row.last_name, row.school_email, row.person_id))
+                    self.stdout.write('Added %s %s' % (row.first_name, row.last_name))
+                counts['added'] += len(values)
+                self.save_checkpoint(done, seen)
+
+        self.stdout.write(self.style.SUCCESS(
+                '{verb} {added}, removed {duplicate} duplicates, {failed} failed'.format(
+                        verb='Would add' if self.options['dry_run'] else 'Added',
+                        added=counts['added'], duplicate=counts['duplicate'], failed=counts['failed'])))
+
+    @staticmethod
+    def identity_keys(first_name, last_name, school_email, person_id):
+        # person_id comes from the identity index and covers both the email and the Discord id
+        person = 'person:%d' % person_id if person_id is not None else school_email.strip().lower()
+        return {(first_name.strip() + ' ' + last_name.strip()).title(), person}
+
+    def next_batch(self, pending, seen, done, counts):
+        """
+        Take up to --batch-size rows off pending, skipping duplicates of rows already swept.
+        A row that shares a name or email with a row in the same batch waits for the next batch,
+        so it is still swept if the earlier one fails.
+        """
+        batch, deferred, batch_keys = [], [], set()
+        while pending and len(batch) < self.options['batch_size']:
+            row = pending.popleft()
+            keys = self.identity_keys(row.first_name, row.last_name, row.school_email, row.person_id)
+            if keys & seen:
+                self.stdout.write('Removed (duplicate) %s %s %s' % (row.first_name, row.last_name, row.school_email))
+                done.add(row.id)
+                counts['duplicate'] += 1
+            elif keys & batch_keys:
+                deferred.append(row)
+            else:
+                batch_keys.update(keys)
+                batch.append(row)
+        pending.extendleft(reversed(deferred))
+        return batch
+
+    def fetch(self, row):
+        """Runs on a worker thread. Returns (token, user_info) or the exception raised."""
+        try:
+            r = self.request('POST', '/oauth2/token', data={
+                'client_id'    : CLIENT_ID,
+                'client_secret': CLIENT_SECRET,
+                'grant_type'   : 'refresh_token',
+                'refresh_token': row.refresh_token,
+                'redirect_uri' : REDIRECT_URI,
+                'scope'        : 'identify guilds.join'
+            }, headers={'Content-Type': 'application/x-www-form-urlencoded'})
+            r.raise_for_status()
+            token = r.json()
+            self.save_token(row, token)
+            r = self.request('GET', '/users/@me', headers={'Authorization': 'Bearer %s' % token['access_token']})
+            r.raise_for_status()
+            return token, r.json()
+        except Exception as e:
+            return e
+        finally:
+            connection.close()  # of this worker thread
+
+    @staticmethod
+    def save_token(row, token):
+        """
+        Discord invalidates the old refresh token, so the new one goes into oauth_record at once, whatever happens
+        to the rest of the sweep. Skipped if the token refresher got there first.
+        """
+        Record.objects.filter(pk=row.id, refresh_token=row.refresh_token).update(
+                access_token=token['access_token'],
+                refresh_token=token.get('refresh_token', row.refresh_token),
+                token_type=token['token_type'],
+                expires_at=now() + timedelta(seconds=int(token['expires_in'])),
+        )
+
+    def request(self, method, route, **kwargs):
+        return self.governor.request(requests.request, method, self.options['api_endpoint'], route,
+                                     reserve=ratelimit.BACKGROUND_RESERVE, max_wait=float('inf'),
+                                     timeout=self.options['timeout'], **kwargs)
+
+    @staticmethod
+    def target_values(row, token, info):
+        return (
+            token['access_token'],
+            info['id'],
+            info['username'] + '#' + str(info['discriminator']),
+            connection.ops.adapt_datetimefield_value(now() + timedelta(seconds=int(token['expires_in']))),
+            row.first_name.title().strip(),
+            row.id,
+            1,
+            row.last_name.title().strip(),
+            row.opt_out_email,
+            row.opt_out_pm,
+            token.get('refresh_token', row.refresh_token),  # Discord rotates refresh tokens
+            row.school_email.strip(),
+            row.state,
+            row.time_requested,
+            token['token_type'],
+        )
+
+    def load_checkpoint(self):
+        path = self.options['checkpoint']
+        if self.options['restart'] or not os.path.exists(path):
+            return set(), set()
+        with open(path) as f:
+            checkpoint = json.load(f)
+        if checkpoint.get('into') != self.options['into']:
+            raise CommandError('%s belongs to a sweep into %s; use --restart to discard it'
+                               % (path, checkpoint.get('into')))
+        return set(checkpoint['done']), set(checkpoint['seen'])
+
+    def save_checkpoint(self, done, seen):
+        path = self.options['checkpoint']
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'into': self.options['into'], 'done': sorted(done), 'seen': sorted(seen)}, f)
+        os.replace(path + '.tmp', path)
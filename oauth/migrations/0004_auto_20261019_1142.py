@@ -0,0 +1,59 @@
+# Generated by Django 2.2.5 on 2026-10-19 11:42
+
+from django.db import migrations, models
+
+
+def add_discord_user_id(apps, schema_editor):
+    # discord_user_id was added to the production table by hand, outside of the migrations
+    Record = apps.get_model('oauth', 'Record')
+    with schema_editor.connection.cursor() as cursor:
+        columns = schema_editor.connection.introspection.get_table_description(cursor, Record._meta.db_table)
+    if 'discord_user_id' not in {column.name for column in columns}:
+        schema_editor.add_field(Record, Record._meta.get_field('discord_user_id'))
+
+
+def populate_normalized_email(apps, schema_editor):
+    # Older signups were never deduplicated, so several records may share an address. The index is not unique for
+    # them; the join view refuses new duplicates.
+    Record = apps.get_model('oauth', 'Record')
+    for record in Record.objects.only('id', 'school_email'):
+        Record.objects.filter(pk=record.pk).update(school_email_normalized=record.school_email.strip().lower())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oauth', '0003_auto_20180926_0303'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='record',
+                    name='discord_user_id',
+                    field=models.IntegerField(blank=True, null=True, unique=True, verbose_name='Discord User ID'),
+                ),
+            ],
+        ),
+        migrations.RunPython(add_discord_user_id, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='record',
+            name='school_email',
+            field=models.EmailField(db_index=True, max_length=254, verbose_name='School Email'),
+        ),
+        migrations.AddField(
+            model_name='record',
+            name='school_email_normalized',
+            field=models.EmailField(blank=True, db_index=True, editable=False, max_length=254, null=True, verbose_name='Normalized School Email'),
+        ),
+        migrations.RunPython(populate_normalized_email, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='record',
+            index=models.Index(fields=['join_success', 'discord_user_id'], name='oauth_record_joined_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='record',
+            index=models.Index(fields=['opt_out_email', 'school_email'], name='oauth_record_mailing_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 2.2.5 on 2026-10-19 11:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_identities(apps, schema_editor):
+    # Group the existing records into persons by shared email or Discord id.
+    Record = apps.get_model('oauth', 'Record')
+    Person = apps.get_model('oauth', 'Person')
+    Identity = apps.get_model('oauth', 'Identity')
+
+    owner = {}  # (kind, value) -> group
+    groups = {}  # group -> [record ids]
+    for record_id, school_email, discord_user_id in Record.objects.order_by('id').values_list(
+            'id', 'school_email', 'discord_user_id'):
+        keys = [('email', school_email.strip().lower())]
+        if discord_user_id is not None:
+            keys.append(('discord', str(discord_user_id)))
+        found = {owner[key] for key in keys if key in owner}
+        group = min(found) if found else record_id
+        for other in found - {group}:
+            groups[group].extend(groups.pop(other))
+            for key, value in owner.items():
+                if value == other:
+                    owner[key] = group
+        groups.setdefault(group, []).append(record_id)
+        for key in keys:
+            owner[key] = group
+
+    persons = {}
+    for group, record_ids in groups.items():
+        canonical = Record.objects.filter(pk__in=record_ids).order_by('-join_success', '-id').values_list('pk', flat=True)[0]
+        persons[group] = Person.objects.create(record_id=canonical)
+        Record.objects.filter(pk__in=record_ids).update(person=persons[group])
+    Identity.objects.bulk_create(
+            Identity(kind=kind, value=value, person=persons[group]) for (kind, value), group in owner.items())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oauth', '0004_auto_20261019_1142'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Person',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('record', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='oauth.Record', verbose_name='Canonical Record')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='record',
+            name='person',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='records', to='oauth.Person', verbose_name='Person'),
+        ),
+        migrations.CreateModel(
+            name='Identity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('email', 'Email'), ('discord', 'Discord User ID')], max_length=10, verbose_name='Kind')),
+                ('value', models.CharField(max_length=254, verbose_name='Value')),
+                ('person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='identities', to='oauth.Person', verbose_name='Person')),
+            ],
+            options={
+                'unique_together': {('kind', 'value')},
+            },
+        ),
+        migrations.RunPython(build_identities, migrations.RunPython.noop),
+    ]
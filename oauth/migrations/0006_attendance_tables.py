@@ -0,0 +1,22 @@
+# The attendance tables are written by bot.py with plain sqlite3, so they are
+# not models. They are created here so the check-in view can rely on them.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oauth', '0005_auto_20261019_1145'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE TABLE IF NOT EXISTS attendance (discord_user_id INTEGER, time TIMESTAMP, effective REAL)',
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS attendance_user_time_idx ON attendance (discord_user_id, time)',
+            'DROP INDEX IF EXISTS attendance_user_time_idx',
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Meetings replace the attendance key kept in memory by bot.py. Like attendance,
+# the table is written with plain sqlite3.
+
+import secrets
+
+from django.db import migrations
+
+# Check-ins repeated within a meeting, which the unique index below forbids
+DUPLICATES = ('FROM attendance WHERE meeting_id IS NOT NULL AND rowid NOT IN '
+              '(SELECT min(rowid) FROM attendance GROUP BY meeting_id, discord_user_id)')
+
+
+def add_meeting_id(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        columns = schema_editor.connection.introspection.get_table_description(cursor, 'attendance')
+        if 'meeting_id' not in {column.name for column in columns}:
+            cursor.execute('ALTER TABLE attendance ADD COLUMN meeting_id INTEGER REFERENCES meeting (id)')
+
+        # Before meetings existed, the check-ins of one day made up a meeting.
+        cursor.execute('SELECT date(time), min(time), max(time), max(effective) FROM attendance '
+                       'WHERE meeting_id IS NULL GROUP BY date(time) ORDER BY date(time)')
+        for day, start, end, weight in cursor.fetchall():
+            cursor.execute('INSERT INTO meeting (key, weight, start, "end") VALUES (%s, %s, %s, %s)',
+                           (secrets.token_hex(32), weight, start, end))
+            cursor.execute('UPDATE attendance SET meeting_id=%s WHERE meeting_id IS NULL AND date(time)=%s',
+                           (cursor.lastrowid, day))
+
+
+def remove_meeting_id(apps, schema_editor):
+    # the column stays, but must not refer to the meetings about to be dropped
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('UPDATE attendance SET meeting_id=NULL')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oauth', '0006_attendance_tables'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE TABLE IF NOT EXISTS meeting (id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, '
+            'weight REAL NOT NULL DEFAULT 1, start TIMESTAMP NOT NULL, "end" TIMESTAMP)',
+            'DROP TABLE IF EXISTS meeting',
+        ),
+        migrations.RunSQL(
+            # the meeting in progress
+            'CREATE INDEX IF NOT EXISTS meeting_open_idx ON meeting ("end", id)',
+            'DROP INDEX IF EXISTS meeting_open_idx',
+        ),
+        migrations.RunPython(add_meeting_id, remove_meeting_id),
+        migrations.RunSQL(
+            # kept in attendance_duplicate rather than lost, and put back on reversal
+            [
+                'CREATE TABLE IF NOT EXISTS attendance_duplicate AS SELECT * FROM attendance WHERE 0',
+                'INSERT INTO attendance_duplicate SELECT * ' + DUPLICATES,
+                'DELETE ' + DUPLICATES,
+            ],
+            [
+                'INSERT INTO attendance SELECT * FROM attendance_duplicate',
+                'DROP TABLE attendance_duplicate',
+            ],
+        ),
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX IF NOT EXISTS attendance_meeting_user_idx ON attendance (meeting_id, discord_user_id)',
+            'DROP INDEX IF EXISTS attendance_meeting_user_idx',
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Every guild served by bot.py holds its own meetings. Meetings held before belong to the CPU guild.
+
+from django.db import migrations
+
+CPU_GUILD_ID = 426702004606337034
+
+
+def add_guild_id(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        columns = schema_editor.connection.introspection.get_table_description(cursor, 'meeting')
+        if 'guild_id' not in {column.name for column in columns}:
+            cursor.execute('ALTER TABLE meeting ADD COLUMN guild_id INTEGER')
+        cursor.execute('UPDATE meeting SET guild_id=%s WHERE guild_id IS NULL', (CPU_GUILD_ID,))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oauth', '0007_meeting'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_guild_id, migrations.RunPython.noop),
+        migrations.RunSQL(
+            # the meeting in progress of each guild
+            'CREATE INDEX IF NOT EXISTS meeting_guild_open_idx ON meeting (guild_id, "end", id)',
+            'DROP INDEX IF EXISTS meeting_guild_open_idx',
+        ),
+        migrations.RunSQL(
+            'DROP INDEX IF EXISTS meeting_open_idx',
+            'CREATE INDEX IF NOT EXISTS meeting_open_idx ON meeting ("end", id)',
+        ),
+    ]
@@ -0,0 +1,36 @@
+# The job queue of bot.py and worker.py (see jobs.py). Like attendance, the tables are written with plain sqlite3.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oauth', '0008_meeting_guild'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            # times are unix timestamps; payload, checkpoint and result are JSON
+            'CREATE TABLE IF NOT EXISTS job (id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, '
+            'payload TEXT NOT NULL, state TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, '
+            'max_attempts INTEGER NOT NULL DEFAULT 3, run_after REAL NOT NULL, lease_owner TEXT, lease_expires REAL, '
+            'requested_by INTEGER, channel_id INTEGER, created REAL NOT NULL, started REAL, finished REAL, '
+            'checkpoint TEXT, result TEXT, error TEXT)',
+            'DROP TABLE IF EXISTS job',
+        ),
+        migrations.RunSQL(
+            # the jobs a worker can claim
+            'CREATE INDEX IF NOT EXISTS job_state_idx ON job (state, run_after, id)',
+            'DROP INDEX IF EXISTS job_state_idx',
+        ),
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX IF NOT EXISTS job_lease_owner_idx ON job (lease_owner)',
+            'DROP INDEX IF EXISTS job_lease_owner_idx',
+        ),
+        migrations.RunSQL(
+            'CREATE TABLE IF NOT EXISTS job_progress (job_id INTEGER PRIMARY KEY REFERENCES job (id), '
+            'done INTEGER NOT NULL, total INTEGER, note TEXT, updated REAL NOT NULL)',
+            'DROP TABLE IF EXISTS job_progress',
+        ),
+    ]
@@ -0,0 +1,19 @@
+# The recipients a campaign job has handled (see jobs.py), recorded one by one so that a retry skips them.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oauth', '0009_job'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            # recipient is an email address or a Discord user id; error is NULL if the delivery succeeded
+            'CREATE TABLE IF NOT EXISTS job_delivery (job_id INTEGER NOT NULL REFERENCES job (id), '
+            'recipient TEXT NOT NULL, error TEXT, PRIMARY KEY (job_id, recipient))',
+            'DROP TABLE IF EXISTS job_delivery',
+        ),
+    ]
@@ -1,13 +1,21 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
 import secrets
 
+STATE_ATTEMPTS = 5
+
+
+def normalize_email(email):
+    return email.strip().lower() if email else email
+
+
 class Record(models.Model):
     time_requested=models.DateTimeField("Time Requested",auto_now_add=True)
     first_name=models.CharField("First Name",max_length=100)
     last_name=models.CharField("Last Name",max_length=100)
     discord_username=models.CharField("Discord Username",max_length=100,blank=True,null=True)
     discord_user_id=models.IntegerField("Discord User ID",blank=True,null=True,unique=True)
-    school_email=models.EmailField("School Email")
+    school_email=models.EmailField("School Email",db_index=True)
+    school_email_normalized=models.EmailField("Normalized School Email",blank=True,null=True,db_index=True,editable=False)
     state=models.CharField("Token", blank=True, max_length=32, unique=True)
     access_token=models.CharField("Access Token",blank=True,null=True,max_length=255)
     refresh_token=models.CharField("Refresh Token",blank=True,null=True,max_length=255)
@@ -16,15 +24,91 @@ class Record(models.Model):
     join_success=models.BooleanField("Successfully joined the server",default=False)
     opt_out_email=models.BooleanField("Opted out email",default=False)
     opt_out_pm=models.BooleanField("Opted out discord private message",default=False)
-    
+    person=models.ForeignKey('Person',verbose_name="Person",related_name='records',blank=True,null=True,editable=False,on_delete=models.SET_NULL)
+
+    class Meta:
+        indexes = [
+            # bot.py: update_cache() and the sweeper scan join_success=1
+            models.Index(fields=['join_success', 'discord_user_id'], name='oauth_record_joined_idx'),
+            # bot.py: email list / send_email scan opt_out_email=0
+            models.Index(fields=['opt_out_email', 'school_email'], name='oauth_record_mailing_idx'),
+        ]
+
     def save(self,*args,**kwargs):
-        if not self.pk:  # on creation
-            while True:
-                token = secrets.token_hex(16)
-                try:
-                    Record.objects.get(state=token)
-                except Record.DoesNotExist:
-                    break
-            self.state = token
-    
-        super().save(*args, **kwargs)
+        self.school_email_normalized = normalize_email(self.school_email)
+        if self.pk or self.state:
+            return super().save(*args, **kwargs)
+
+        # on creation: let the unique constraint on state catch the (astronomically rare) collision
+        for _ in range(STATE_ATTEMPTS):
+            self.state = secrets.token_hex(16)
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                    link_identities(self)
+                    return
+            except IntegrityError:
+                if not Record.objects.filter(state=self.state).exists():
+                    raise  # some other constraint
+        raise IntegrityError('Unable to generate a unique state after %d attempts' % STATE_ATTEMPTS)
+
+
+class Person(models.Model):
+    """
+    One human being, however many records they have.
+    record is the canonical record: the latest one that joined the server, or else the latest one.
+    """
+    record=models.OneToOneField(Record,verbose_name="Canonical Record",related_name='+',blank=True,null=True,on_delete=models.SET_NULL)
+
+
+class Identity(models.Model):
+    """Maps a normalized email or a Discord user id to the person it belongs to."""
+    EMAIL='email'
+    DISCORD='discord'
+
+    kind=models.CharField("Kind",max_length=10,choices=((EMAIL,'Email'),(DISCORD,'Discord User ID')))
+    value=models.CharField("Value",max_length=254)
+    person=models.ForeignKey(Person,verbose_name="Person",related_name='identities',on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = (('kind', 'value'),)
+
+    @classmethod
+    def keys_for(cls, record):
+        keys = [(cls.EMAIL, normalize_email(record.school_email))]
+        if record.discord_user_id is not None:
+            keys.append((cls.DISCORD, str(record.discord_user_id)))
+        return keys
+
+
+def link_identities(record):
+    """
+    Attach record to the person owning its email or Discord id, creating the person if there is none
+    and merging persons the record proves to be the same.
+    """
+    keys = Identity.keys_for(record)
+    lookup = models.Q()
+    for kind, value in keys:
+        lookup |= models.Q(kind=kind, value=value)
+
+    with transaction.atomic():
+        person_ids = set(Identity.objects.filter(lookup).values_list('person_id', flat=True))
+        if record.person_id is not None:
+            person_ids.add(record.person_id)
+        if person_ids:
+            person_id = min(person_ids)
+            merged = person_ids - {person_id}
+            if merged:
+                Identity.objects.filter(person_id__in=merged).update(person_id=person_id)
+                Record.objects.filter(person_id__in=merged).update(person_id=person_id)
+                Person.objects.filter(pk__in=merged).delete()
+        else:
+            person_id = Person.objects.create().pk
+
+        for kind, value in keys:
+            Identity.objects.get_or_create(kind=kind, value=value, defaults={'person_id': person_id})
+        Record.objects.filter(pk=record.pk).update(person_id=person_id)
+        record.person_id = person_id
+
+        canonical = Record.objects.filter(person_id=person_id).order_by('-join_success', '-id').values_list('pk', flat=True)[0]
+        Person.objects.filter(pk=person_id).update(record_id=canonical)
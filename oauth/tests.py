@@ -1,3 +1,182 @@
-from django.test import TestCase
+import io
+import json
+import os
+import secrets
+import shutil
+import tempfile
+import urllib.parse
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+import fake_discord
+from . import checkin
+from .models import Record
+
+
+class RotatingDiscord(fake_discord.FakeDiscord):
+    """Like Discord, rotates the refresh token on every refresh and refuses the old one afterwards."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.owners = {}  # refresh token -> user, for tokens handed out here
+        self.spent = set()
+        self.unreachable = set()  # ids of users whose /users/@me fails
+
+    def post_oauth2_token(self, headers, body):
+        grant = dict(urllib.parse.parse_qsl(body.decode())).get('refresh_token')
+        if grant in self.spent:
+            return 400, {}, {'error': 'invalid_grant'}
+        status, res_headers, token = super().post_oauth2_token(headers, body)
+        user = self.owners.pop(grant, None) or self.user_for(grant)
+        self.spent.add(grant)
+        token['refresh_token'] = secrets.token_hex(8)
+        self.owners[token['refresh_token']] = user
+        self.access_tokens[token['access_token']] = user
+        return status, res_headers, token
+
+    def get_users_me(self, headers, body):
+        status, res_headers, user = super().get_users_me(headers, body)
+        if status == 200 and user['id'] in self.unreachable:
+            return 500, {}, {'message': 'Injected failure'}
+        return status, res_headers, user
+
+
+class SweepTests(TransactionTestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.checkpoint = os.path.join(self.dir, 'sweep.checkpoint.json')
+        patcher = mock.patch('ratelimit.path_for', return_value=os.path.join(self.dir, 'ratelimit.sqlite3'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.fake = RotatingDiscord()
+        self.server, self.endpoint = fake_discord.serve(self.fake)
+        self.addCleanup(self.server.shutdown)
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE oauth_record_copy AS SELECT * FROM oauth_record WHERE 0')
+        self.addCleanup(self.drop_copy)
+
+    @staticmethod
+    def drop_copy():
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE oauth_record_copy')
+
+    @staticmethod
+    def record(first_name, last_name, school_email, refresh_token):
+        return Record.objects.create(first_name=first_name, last_name=last_name, school_email=school_email,
+                                     refresh_token=refresh_token, access_token='old', join_success=True)
+
+    def sweep(self, **options):
+        out, err = io.StringIO(), io.StringIO()
+        call_command('sweep', api_endpoint=self.endpoint, checkpoint=self.checkpoint, stdout=out, stderr=err,
+                     **options)
+        return out.getvalue()
+
+    @staticmethod
+    def swept():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT id FROM oauth_record_copy')
+            return {row[0] for row in cursor.fetchall()}
+
+    def test_duplicates_are_removed(self):
+        older = self.record('Ada', 'Lovelace', 'ada@choate.edu', 'ada-1')
+        newer = self.record('Ada', 'Lovelace', ' ADA@choate.edu', 'ada-2')
+        alan = self.record('Alan', 'Turing', 'aturing@choate.edu', 'alan-1')
+        same_account = self.record('Al', 'Turing', 'alan.turing@choate.edu', 'alan-2')
+        self.fake.owners['alan-2'] = self.fake.user_for('alan-1')
+
+        out = self.sweep()
+
+        self.assertIn('Added 2, removed 2 duplicates, 0 failed', out)
+        # the most recent record of each person is kept
+        self.assertEqual(self.swept(), {newer.pk, same_account.pk})
+        self.assertNotIn(older.pk, self.swept())
+        self.assertNotIn(alan.pk, self.swept())
+
+    def test_failures_are_counted_and_retried(self):
+        ok = self.record('Ada', 'Lovelace', 'ada@choate.edu', 'ada-1')
+        failing = self.record('Alan', 'Turing', 'aturing@choate.edu', 'alan-1')
+        self.fake.unreachable.add(self.fake.user_for('alan-1')['id'])
+
+        out = self.sweep()
+
+        self.assertIn('Added 1, removed 0 duplicates, 1 failed', out)
+        self.assertEqual(self.swept(), {ok.pk})
+        # the refresh token was rotated before /users/@me failed, and must not be lost
+        failing.refresh_from_db()
+        self.assertIn(failing.refresh_token, self.fake.owners)
+        self.assertNotEqual(failing.access_token, 'old')
+
+        self.fake.unreachable.clear()
+        out = self.sweep()
+
+        self.assertIn('1 records to sweep, 1 already done', out)
+        self.assertIn('Added 1, removed 0 duplicates, 0 failed', out)
+        self.assertEqual(self.swept(), {ok.pk, failing.pk})
+
+    def test_resumes_from_checkpoint(self):
+        done = self.record('Ada', 'Lovelace', 'ada@choate.edu', 'ada-1')
+        pending = self.record('Alan', 'Turing', 'aturing@choate.edu', 'alan-1')
+        with open(self.checkpoint, 'w') as f:
+            json.dump({'into': 'oauth_record_copy', 'done': [done.pk], 'seen': []}, f)
+
+        out = self.sweep()
+
+        self.assertIn('1 records to sweep, 1 already done', out)
+        self.assertEqual(self.swept(), {pending.pk})
+        with open(self.checkpoint) as f:
+            self.assertEqual(set(json.load(f)['done']), {done.pk, pending.pk})
+
+        out = self.sweep(restart=True)
+        self.assertIn('1 records to sweep, 1 already done', out)  # the copied row still counts as done
+
+    def test_checkpoint_of_another_table(self):
+        with open(self.checkpoint, 'w') as f:
+            json.dump({'into': 'elsewhere', 'done': [], 'seen': []}, f)
+        with self.assertRaises(CommandError):
+            self.sweep()
+
+
+class CheckinTests(TestCase):
+    def setUp(self):
+        self.member = Record.objects.create(first_name='Ada', last_name='Lovelace', school_email='ada@choate.edu',
+                                            discord_user_id=42, join_success=True)
+        with connection.cursor() as cursor:
+            cursor.execute('INSERT INTO meeting (guild_id, key, weight, start) VALUES (1, %s, 1, %s)',
+                           ('meeting-key', '2026-10-19 12:00:00'))
+        checkin._meetings = (0, ())
+
+    @staticmethod
+    def attended():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT discord_user_id FROM attendance')
+            return [row[0] for row in cursor.fetchall()]
+
+    def test_strangers_cannot_check_in(self):
+        response = self.client.get('/api/checkin/', {'key': 'meeting-key'})
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get('/api/checkin/', {'key': 'meeting-key', 'school_email': 'ada@choate.edu'})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.attended(), [])
+
+    def test_private_link_remembers_the_member(self):
+        response = self.client.get('/api/checkin/', {'member': self.member.state})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.attended(), [])
+
+        response = self.client.get('/api/checkin/', {'key': 'meeting-key'})
+        self.assertContains(response, 'Your attendance has been recorded')
+        response = self.client.get('/api/checkin/', {'key': 'meeting-key'})
+        self.assertContains(response, 'already been recorded')
+        self.assertEqual(self.attended(), [42])
+
+    def test_invalid_link_or_key(self):
+        self.assertEqual(self.client.get('/api/checkin/', {'member': 'guess'}).status_code, 404)
+        self.client.get('/api/checkin/', {'member': self.member.state})
+        self.assertEqual(self.client.get('/api/checkin/', {'key': 'guess'}).status_code, 400)
+        self.assertEqual(self.attended(), [])
@@ -1,7 +1,8 @@
-from .views import join,callback
+from .views import join,callback,checkin
 from django.urls import path
 
 urlpatterns=[
     path('join/',join),
-    path('callback/',callback)
+    path('callback/',callback),
+    path('checkin/',checkin)
 ]
@@ -1,17 +1,27 @@
 from django.shortcuts import render
 from django.http import HttpResponseRedirect, HttpResponse
-from .models import Record
-from django.db import IntegrityError
+from .models import Record, link_identities, normalize_email
+from django.db import IntegrityError, transaction
 from django.core.exceptions import ValidationError
 from django.conf import settings
 from django.http import HttpRequest
 from django.utils.timezone import now, timedelta
+import functools
 import requests
 from django.views.decorators.csrf import csrf_exempt
 from django.core.mail import send_mail
 
+from . import checkin as attendance
+
 
 from CPUBot.settings import BOT_TOKEN, CLIENT_ID, CLIENT_SECRET, API_ENDPOINT, GUILD_ID, REDIRECT_URI
+import ratelimit
+
+
+@functools.lru_cache()
+def governor():
+    """The Discord rate limits shared with the bot and sweeps, see ratelimit.py"""
+    return ratelimit.Governor(ratelimit.path_for(settings.DATABASES['default']['NAME']))
 
 @csrf_exempt
 def join(request: HttpRequest):
@@ -28,13 +38,16 @@ def join(request: HttpRequest):
         return HttpResponse("Missing field %s" %e, status=400)
     if not school_email.strip().endswith('@choate.edu'):
         return HttpResponse("Error: Please provide your Choate email", status=400)
-    if Record.objects.filter(school_email=school_email).exists():
-        return render(request,'confirmation_template.html',{"text":"You have already signed up for the club.",'Title':'Error'},status=400)
     try:
         record = Record(first_name=first_name,
                         last_name=last_name,
                         school_email=school_email)
-        record.full_clean()
+        record.full_clean(validate_unique=False)  # state is unique, and made up by save()
+        with transaction.atomic():
+            # old signups may share an address, so the index on the normalized email is not unique
+            if Record.objects.filter(school_email_normalized=normalize_email(school_email)).exists():
+                return render(request,'confirmation_template.html',{"text":"You have already signed up for the club.",'Title':'Error'},status=400)
+            record.save(force_insert=True)
     except IntegrityError:
         return HttpResponse("DB Error", status=400)
     except ValidationError as e:
@@ -42,8 +55,6 @@ def join(request: HttpRequest):
         for k,v in e.error_dict.items():
             res+='<br>{}: {}'.format(k,v)
         return HttpResponse(res, status=400)
-    else:
-        record.save(force_insert=True)
     
     
     auth_addr='{api}/oauth2/authorize?response_type=code&client_id={cid}&scope={scope}&state={state}&redirect_uri={redirect}'.format(
@@ -154,7 +165,7 @@ def callback(request: HttpRequest):
             'scope': 'guilds.join%20identify'
         }
         
-        r = requests.post('{api}/oauth2/token'.format(api=API_ENDPOINT), data, {
+        r = governor().request(requests.request, 'POST', API_ENDPOINT, '/oauth2/token', data=data, headers={
             'Content-Type': 'application/x-www-form-urlencoded'
         })
         if r.status_code != 200:
@@ -165,26 +176,20 @@ def callback(request: HttpRequest):
         record.refresh_token = token_data['refresh_token']
         record.token_type = token_data['token_type']
         record.expires_at = now() + timedelta(seconds=int(token_data['expires_in']))
-        record.save()
+        # the code is spent: keep the tokens even if the rest fails
+        record.save(update_fields=['access_token', 'refresh_token', 'token_type', 'expires_at'])
     
     headers = {'Authorization': '{type} {token}'.format(type=record.token_type, token=record.access_token)}
-    r = requests.get('{api}/users/@me'.format(api=API_ENDPOINT), headers=headers)
+    r = governor().request(requests.request, 'GET', API_ENDPOINT, '/users/@me', headers=headers)
     user_data = r.json()
     user_id = user_data['id']
     
-    try:
-        old=Record.objects.get(discord_user_id=user_id)
-    except Record.DoesNotExist:
-        pass
-    else:
-        old.delete()
+    # discord_user_id is unique: drop any earlier record of this Discord account
+    Record.objects.filter(discord_user_id=user_id).exclude(pk=record.pk).delete()
     
     username = user_data['username']
     discriminator = user_data['discriminator']
     
-    record.discord_username = '{}#{}'.format(username, discriminator)
-    record.discord_user_id = user_id
-    record.save()
     data = {
         'access_token': record.access_token,
         'nick': '{} {}'.format(record.first_name, record.last_name)
@@ -194,18 +199,74 @@ def callback(request: HttpRequest):
         'Authorization': 'Bot {token}'.format(token=BOT_TOKEN),
     }
     
-    r = requests.put("{api}/guilds/{guild_id}/members/{user_id}".format(
-            api=API_ENDPOINT,
-            guild_id=GUILD_ID,
-            user_id=user_id
-    ), json=data, headers=headers)
+    r = governor().request(requests.request, 'PUT', API_ENDPOINT, '/guilds/{guild_id}/members/{user_id}', {
+        'guild_id': GUILD_ID,
+        'user_id': user_id
+    }, json=data, headers=headers)
+    
+    join_success = r.status_code in (201, 204)
+    Record.objects.filter(pk=record.pk).update(
+            discord_username='{}#{}'.format(username, discriminator),
+            discord_user_id=user_id,
+            join_success=join_success or record.join_success,
+    )
+    record.discord_user_id = int(user_id)
+    record.join_success = join_success or record.join_success
+    link_identities(record)
     
-    if r.status_code != 201 and r.status_code != 204:
+    if not join_success:
         print(r.status_code)
         print(r.content)
         return HttpResponse("Error joining server. Please try again.", status=400)
     
-    record.join_success = True
-    record.save()
     return HttpResponseRedirect('https://cpu.party/join/success')
     #return HttpResponse("Success. You may close this window/tab now.", status=200)
+
+
+CHECKIN_COOKIE = 'cpu_checkin'
+CHECKIN_HELP = """
+<h1>Check in</h1>
+<p>
+This device does not know who you are yet. Send <code>attendance link</code> to CPU Bot on Discord and open the private
+link it sends you on this device, then scan the check-in code again.
+</p>
+"""
+
+
+def checkin(request: HttpRequest):
+    """
+    Web check-in for the meeting in progress, reached through a link or QR code carrying the attendance key.
+    Members are recognized by a signed cookie, set by the private link the bot sends them (`attendance link`),
+    which carries the state token of their record.
+    """
+    token = request.GET.get('member')
+    if token:
+        user_id = Record.objects.filter(state=token, discord_user_id__isnull=False).values_list(
+                'discord_user_id', flat=True).first()
+        if user_id is None:
+            return render(request, 'confirmation_template.html', {
+                'title': 'Error',
+                'text': '<h1>Error</h1><p>This check-in link is not valid. Send <code>attendance link</code> to CPU Bot '
+                        'on Discord for a new one.</p>'
+            }, status=404)
+    else:
+        user_id = request.get_signed_cookie(CHECKIN_COOKIE, default=None, salt='checkin')
+    
+    key = request.GET.get('key', '')
+    if token and not key:
+        text = ('<h1>Success</h1><p>This device will now check you in when you scan the code of a meeting. '
+                'You may close this window/tab now.</p>')
+    else:
+        meeting = attendance.meeting_for_key(key)
+        if meeting is None:
+            return render(request, 'confirmation_template.html', {
+                'title': 'Error', 'text': '<h1>Error</h1><p>There is no meeting in progress with this key.</p>'}, status=400)
+        if user_id is None:
+            return render(request, 'confirmation_template.html', {'title': 'Check in', 'text': CHECKIN_HELP}, status=403)
+        if attendance.record(int(user_id), meeting[0], meeting[2]):
+            text = '<h1>Success</h1><p>Thank you. Your attendance has been recorded.</p>'
+        else:
+            text = '<h1>Success</h1><p>Your attendance for this meeting has already been recorded.</p>'
+    response = render(request, 'confirmation_template.html', {'title': 'Success', 'text': text})
+    response.set_signed_cookie(CHECKIN_COOKIE, str(user_id), salt='checkin', max_age=365 * 24 * 3600, httponly=True)
+    return response
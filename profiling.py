@@ -0,0 +1,147 @@
+import collections.abc
+import cProfile
+import io
+import marshal
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+import types
+
+TRACEMALLOC_FRAMES = 10
+
+active = None  # the Profiler running, there can only be one per thread
+
+
+# never followed by deep_sizeof: they reach everything
+OPAQUE_TYPES = (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType)
+ATOMIC_TYPES = (str, bytes, int, float, bool, type(None))
+
+
+def deep_sizeof(obj, seen, opaque=()) -> int:
+    """
+    Bytes held by obj and everything it references, skipping objects in `seen` and adding the ones counted to it,
+    so that several calls sharing `seen` count shared objects once.
+    """
+    opaque = OPAQUE_TYPES + tuple(opaque)
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, opaque):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, ATOMIC_TYPES):
+            continue
+        if isinstance(obj, collections.abc.Mapping):  # including weak dictionaries
+            for key, value in list(obj.items()):
+                stack += (key, value)
+        elif isinstance(obj, (list, tuple, set, frozenset, collections.deque)):
+            stack += list(obj)
+        else:
+            if hasattr(obj, '__dict__'):
+                stack.append(vars(obj))
+            for cls in type(obj).__mro__:
+                slots = cls.__dict__.get('__slots__', ())
+                for slot in (slots,) if isinstance(slots, str) else slots:
+                    if slot not in ('__dict__', '__weakref__') and hasattr(obj, slot):
+                        stack.append(getattr(obj, slot))
+    return size
+
+
+def resident_size():
+    """:return: (current, peak) resident set size in bytes, current being None where /proc is missing"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize(), peak
+    except OSError:
+        return None, peak
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+class Profiler:
+    """
+    cProfile and tracemalloc around a stretch of the event loop's work.
+    start() and stop() must be called on the loop's thread: work done in executor threads is not profiled.
+    """
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.stats = None  # raw cProfile stats once stopped
+        self.before = self.after = None
+        self.started = self.stopped = None
+        self._own_tracemalloc = False
+
+    def start(self):
+        global active
+        if active is not None:
+            raise ProfilerBusy('A profile is already being taken.')
+        active = self
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._own_tracemalloc = True
+        self.before = tracemalloc.take_snapshot()
+        self.started = time.monotonic()
+        self.profile.enable()
+
+    def stop(self):
+        global active
+        self.profile.disable()
+        self.stopped = time.monotonic()
+        self.profile.create_stats()
+        self.stats = self.profile.stats
+        self.after = tracemalloc.take_snapshot()
+        if self._own_tracemalloc:
+            tracemalloc.stop()
+        active = None
+
+    @property
+    def seconds(self):
+        return self.stopped - self.started
+
+    def _pstats(self, stream=None) -> pstats.Stats:
+        stats = pstats.Stats(stream=stream)  # pstats.Stats(profile) would take the stats away from the profile
+        stats.stats = dict(self.stats)
+        stats.get_top_level_stats()
+        return stats
+
+    def cpu_report(self, sort='cumulative', limit=60) -> str:
+        out = io.StringIO()
+        self._pstats(out).strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def memory_report(self, limit=40) -> str:
+        snapshot_filters = (tracemalloc.Filter(False, tracemalloc.__file__),)
+        after = self.after.filter_traces(snapshot_filters)
+        before = self.before.filter_traces(snapshot_filters)
+        lines = ['Top allocation sites by growth during the profile:']
+        lines += [str(stat) for stat in after.compare_to(before, 'lineno')[:limit]]
+        lines += ['', 'Top allocation sites by size at the end of the profile:']
+        lines += [str(stat) for stat in after.statistics('lineno')[:limit]]
+        lines += ['', 'Largest allocation tracebacks at the end of the profile:']
+        for stat in after.statistics('traceback')[:5]:
+            lines.append('%d blocks, %.1f KiB' % (stat.count, stat.size / 1024))
+            lines += stat.traceback.format()
+        return '\n'.join(lines)
+
+    def summary(self, limit=8) -> str:
+        top = sorted(self.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        lines = ['%.1f s profiled, %d function calls. Top functions by cumulative time:' % (
+            self.seconds, self._pstats().total_calls)]
+        for (filename, line, name), stat in top:
+            lines.append('%8.3f s  %s:%d(%s)' % (stat[3], filename.rsplit('/', 1)[-1], line, name))
+        return '\n'.join(lines)
+
+    def reports(self) -> dict:
+        """:return: file name -> contents of every report, e.g. for attachments"""
+        return {
+            'profile-cpu.txt'   : self.cpu_report().encode(),
+            'profile-memory.txt': self.memory_report().encode(),
+            'profile.pstats'    : marshal.dumps(self.stats),  # for pstats or snakeviz
+        }
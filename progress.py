@@ -0,0 +1,98 @@
+"""
+Progress of long admin operations in bot.py: a ProgressReporter owns one message and edits it in place, at most every
+`interval` seconds, instead of sending a new message for every step. The edits show the rate and the time left.
+"""
+import asyncio
+import logging
+import time
+
+import discord
+
+logger = logging.getLogger('discord')
+
+
+def format_duration(seconds) -> str:
+    if seconds < 60:
+        return f'{seconds:.0f} s'
+    if seconds < 3600:
+        return f'{seconds / 60:.0f} min'
+    return f'{seconds // 3600:.0f} h {seconds % 3600 / 60:.0f} min'
+
+
+class ProgressReporter:
+    def __init__(self, to, title, total=None, done=0, interval=5):
+        """
+        :param to: where the message is sent, a user or channel
+        :param done: progress made before, e.g. by an interrupted attempt, which does not count towards the rate
+        """
+        self.to = to
+        self.title = title
+        self.total = total
+        self.done = done
+        self.note = None
+        self.interval = interval
+        self.message = None
+        self._since = (time.monotonic(), done)  # what the rate is measured from
+        self._shown = None  # content of the message
+        self._edited = 0.0
+        self._edit_task = None
+        self._waiting = False  # whether the edit task is still waiting for its turn
+
+    def update(self, done, total=None, note=None):
+        """Record progress, which the message shows within `interval` seconds. Does not wait for Discord."""
+        self.done = done
+        if total is not None:
+            self.total = total
+        self.note = note
+        if self._edit_task is None or self._edit_task.done():
+            self._edit_task = asyncio.ensure_future(self._edit_later())
+
+    async def finish(self, content, **kwargs):
+        """Replace the progress with `content`, e.g. a summary, right away. :param kwargs: passed to Message.edit"""
+        task = self._edit_task
+        if task is not None and not task.done():
+            if self._waiting:
+                task.cancel()
+            else:
+                await task  # sending the first message, which is then edited
+        await self._show(content, **kwargs)
+
+    def render(self) -> str:
+        line = f'{self.title}: '
+        if self.total:
+            line += f'{self.done}/{self.total} ({self.done / self.total:.0%})'
+        else:
+            line += f'{self.done}'
+        since, done_since = self._since
+        elapsed = time.monotonic() - since
+        if self.done > done_since and elapsed >= 1:
+            rate = (self.done - done_since) / elapsed
+            line += f', {rate:.1f}/s'
+            if self.total:
+                line += f', about {format_duration(max(0, self.total - self.done) / rate)} left'
+        if self.note:
+            line += f'\n{self.note}'
+        return line
+
+    async def _edit_later(self):
+        self._waiting = True
+        try:
+            await asyncio.sleep(max(0.0, self._edited + self.interval - time.monotonic()))
+        finally:
+            self._waiting = False
+        await self._show(self.render())
+
+    async def _show(self, content, **kwargs):
+        if content == self._shown and not kwargs:
+            return
+        self._edited = time.monotonic()
+        self._shown = content
+        try:
+            if self.message is None:
+                self.message = await self.to.send(content, **kwargs)
+            else:
+                await self.message.edit(content=content, **kwargs)
+        except discord.NotFound:
+            self.message = None  # deleted, the next update sends a new one
+        except discord.HTTPException:
+            logger.warning('Could not show progress of %s', self.title, exc_info=True)
@@ -0,0 +1,231 @@
+"""
+A rate limit governor shared by every process that calls Discord for the club: bot.py and worker.py through
+discord.py, the signup callback in oauth/views.py and manage.py sweep. Before a request each takes a token from the
+buckets of its route in ratelimit.sqlite3, next to db.sqlite3, so that together they stay within Discord's limits
+instead of each finding them out from 429s. Every request also takes a token from the global bucket; background work
+such as a sweep leaves a reserve of it to the bot.
+
+    python ratelimit.py [db.sqlite3]
+
+prints the current budgets, as does the bot's `ratelimits` command.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import database
+
+# 'METHOD route' -> (requests, per seconds), like fake_discord.DEFAULT_RATE_LIMITS. Routes with a major parameter
+# (channel_id or guild_id) have a bucket per value of it. Other routes only take from the global bucket.
+LIMITS = {
+    'POST /channels/{channel_id}/messages'              : (5, 5.0),
+    'PATCH /channels/{channel_id}/messages/{message_id}': (5, 5.0),
+    'POST /users/@me/channels'                          : (10, 10.0),
+    'PUT /guilds/{guild_id}/members/{user_id}'          : (10, 10.0),
+    'PATCH /guilds/{guild_id}/members/{user_id}'        : (10, 10.0),
+    'DELETE /guilds/{guild_id}/members/{user_id}'       : (5, 1.0),
+    'POST /oauth2/token'                                : (10, 1.0),  # not published, kept well below the global
+}
+GLOBAL = 'global'
+GLOBAL_LIMIT = (50, 1.0)
+BACKGROUND_RESERVE = 0.5  # share of every bucket a background request leaves to the others
+MAX_WAIT = 30  # seconds a blocking caller waits for a token before going ahead anyway
+IDLE = 3600  # seconds after which an untouched bucket is full again and forgotten
+
+logger = logging.getLogger('ratelimit')
+
+
+def path_for(database) -> str:
+    """The governor's database for the processes sharing `database`"""
+    return os.path.join(os.path.dirname(os.path.abspath(database)), 'ratelimit.sqlite3')
+
+
+class Governor:
+    def __init__(self, path, timeout=1.0):
+        # autocommit, so that take() can BEGIN IMMEDIATE; shared by the threads of a sweep or a web server
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        database.configure(self.conn)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS bucket (key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+                          'updated REAL NOT NULL)')
+        self.lock = threading.Lock()
+        self.taken = 0
+
+    @staticmethod
+    def buckets_for(method, route, major=None) -> list:
+        """:return: (key, (requests, per seconds)) of the buckets a request takes from"""
+        buckets = [(GLOBAL, GLOBAL_LIMIT)]
+        name = f'{method} {route}'
+        if name in LIMITS:
+            buckets.append((name if major is None else f'{name} {major}', LIMITS[name]))
+        return buckets
+
+    def take(self, buckets, reserve=0.0, now=None) -> float:
+        """
+        Take a token from every one of buckets, or from none of them.
+        :param reserve: share of each bucket to leave to others
+        :return: 0 if taken, or else the seconds until they all have one
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                tokens = {}
+                wait = 0.0
+                for key, (count, per) in buckets:
+                    row = self.conn.execute('SELECT tokens, updated FROM bucket WHERE key=?', (key,)).fetchone()
+                    tokens[key] = count if row is None else min(count, row[0] + (now - row[1]) * count / per)
+                    needed = 1 + reserve * count
+                    if tokens[key] < needed:
+                        wait = max(wait, (needed - tokens[key]) * per / count)
+                if not wait:
+                    self.conn.executemany('INSERT OR REPLACE INTO bucket (key, tokens, updated) VALUES (?,?,?)',
+                                          [(key, available - 1, now) for key, available in tokens.items()])
+                    self.taken += 1
+                    if self.taken % 1000 == 0:
+                        self.conn.execute('DELETE FROM bucket WHERE updated<?', (now - IDLE,))
+                self.conn.execute('COMMIT')
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+        return wait
+
+    def _take(self, buckets, reserve) -> float:
+        try:
+            return self.take(buckets, reserve)
+        except sqlite3.Error:
+            # the governor must not stop anyone from calling Discord, which enforces its limits anyway
+            logger.warning('Rate limit governor unavailable', exc_info=True)
+            return 0.0
+
+    def acquire(self, method, route, major=None, reserve=0.0, max_wait=MAX_WAIT) -> bool:
+        """Block until the request may be made. :return: False if it was not allowed within max_wait seconds"""
+        buckets = self.buckets_for(method, route, major)
+        deadline = time.monotonic() + max_wait
+        while True:
+            wait = self._take(buckets, reserve)
+            if not wait:
+                return True
+            if time.monotonic() + wait > deadline:
+                logger.warning('Going ahead with %s %s after waiting %d seconds for the governor', method, route,
+                               max_wait)
+                return False
+            time.sleep(wait)
+
+    async def wait(self, method, route, major=None, reserve=0.0):
+        buckets = self.buckets_for(method, route, major)
+        loop = asyncio.get_event_loop()
+        while True:
+            # take() may wait for another process's transaction, which must not block the event loop
+            wait = await loop.run_in_executor(None, self._take, buckets, reserve)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def penalize(self, method, route, major, retry_after, is_global=False):
+        """Empty a bucket for retry_after seconds after a 429 from Discord: the global one, or else the route's."""
+        if is_global:
+            key, (count, per) = GLOBAL, GLOBAL_LIMIT
+        else:
+            buckets = self.buckets_for(method, route, major)[1:]
+            if not buckets:
+                return  # Discord limits a route not in LIMITS on its own, and the global bucket was not the cause
+            key, (count, per) = buckets[0]
+        try:
+            with self.lock:
+                self.conn.execute('INSERT OR REPLACE INTO bucket (key, tokens, updated) VALUES (?,?,?)',
+                                  (key, 1 - retry_after * count / per, time.time()))
+        except sqlite3.Error:
+            logger.warning('Rate limit governor unavailable', exc_info=True)
+
+    def request(self, send, method, api_endpoint, route, params=None, reserve=0.0, max_wait=MAX_WAIT, **kwargs):
+        """
+        A blocking request to Discord once the governor allows it.
+        :param send: e.g. requests.request, called with method, url and kwargs
+        :param route: e.g. '/guilds/{guild_id}/members/{user_id}', formatted with params
+        """
+        params = params or {}
+        major = params.get('channel_id') or params.get('guild_id')
+        self.acquire(method, route, major, reserve, max_wait)
+        response = send(method, api_endpoint + route.format(**params), **kwargs)
+        if response.status_code == 429:
+            self.penalize(method, route, major, float(response.headers.get('Retry-After', 1)),
+                          bool(response.headers.get('X-RateLimit-Global')))
+        return response
+
+    def budgets(self, now=None) -> list:
+        """:return: (bucket, tokens available, requests, per seconds) of the buckets in use, the emptiest first"""
+        now = time.time() if now is None else now
+        budgets = []
+        for key, tokens, updated in self.conn.execute('SELECT key, tokens, updated FROM bucket'):
+            limit = GLOBAL_LIMIT if key == GLOBAL else LIMITS.get(' '.join(key.split(' ')[:2]))
+            if limit is not None:
+                count, per = limit
+                budgets.append((key, min(count, tokens + (now - updated) * count / per), count, per))
+        return sorted(budgets, key=lambda budget: budget[1] / budget[2])
+
+
+_request = contextvars.ContextVar('request')  # (governor, discord.py Route) of the request a task is making
+
+
+class RateLimitReporter(logging.Handler):
+    """
+    Penalizes the governor for the 429s that discord.py retries by itself, which it only logs to discord.http: "We are
+    being rate limited..." and right after it, if the limit was the global one, "Global rate limit has been hit...".
+    """
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.pending = None  # [governor, route, retry after, is global] until the loop gets to report it
+
+    def emit(self, record):
+        if record.msg.startswith('We are being rate limited'):
+            request = _request.get(None)
+            if request is not None:
+                self.pending = [*request, record.args[0], False]
+                asyncio.get_event_loop().call_soon(self.report, self.pending)
+        elif record.msg.startswith('Global rate limit has been hit') and self.pending is not None:
+            self.pending[3] = True
+
+    def report(self, pending):
+        if self.pending is pending:
+            self.pending = None
+        governor, route, retry_after, is_global = pending
+        asyncio.get_event_loop().run_in_executor(None, governor.penalize, route.method, route.path,
+                                                 route.channel_id or route.guild_id, retry_after, is_global)
+
+
+def govern(http, governor):
+    """
+    Make a discord.py HTTPClient wait for the governor before every request, and penalize it for the 429s discord.py
+    handles itself, so that the other processes slow down too.
+    """
+    request = http.request
+    http_logger = logging.getLogger('discord.http')
+    if not any(isinstance(handler, RateLimitReporter) for handler in http_logger.handlers):
+        http_logger.addHandler(RateLimitReporter())
+
+    async def governed_request(route, **kwargs):
+        await governor.wait(route.method, route.path, route.channel_id or route.guild_id)
+        token = _request.set((governor, route))
+        try:
+            return await request(route, **kwargs)
+        finally:
+            _request.reset(token)
+
+    http.request = governed_request
+
+
+def format_budgets(budgets, limit=20) -> str:
+    lines = [f"{'Bucket':<60}{'Available':>10}{'Limit':>12}"]
+    lines += [f'{key[:60]:<60}{tokens:>10.1f}{f"{count}/{per:g}s":>12}' for key, tokens, count, per in budgets[:limit]]
+    if len(budgets) > limit:
+        lines.append(f'and {len(budgets) - limit} fuller buckets')
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    print(format_budgets(Governor(path_for(sys.argv[1] if len(sys.argv) > 1 else 'db.sqlite3')).budgets()))
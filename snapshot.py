@@ -0,0 +1,32 @@
+"""
+Warm restarts of bot.py: state that is slow to rebuild is written when the bot shuts down and read back when it
+starts again, then reconciled in the background. A snapshot is read once: it is removed when loaded.
+"""
+import gzip
+import json
+import os
+import time
+
+VERSION = 1
+
+
+def save(path, state):
+    """Write state, anything JSON can encode, atomically."""
+    with gzip.open(path + '.tmp', 'wt', encoding='utf-8') as f:
+        json.dump({'version': VERSION, 'written': time.time(), 'state': state}, f, separators=(',', ':'))
+    os.replace(path + '.tmp', path)
+
+
+def load(path, max_age):
+    """:return: the state saved at path, or None if there is none or it is unreadable or older than max_age seconds"""
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError):
+        snapshot = None
+    os.remove(path)
+    if snapshot is None or snapshot.get('version') != VERSION or time.time() - snapshot['written'] > max_age:
+        return None
+    return snapshot['state']
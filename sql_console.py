@@ -0,0 +1,110 @@
+import itertools
+import sqlite3
+import time
+
+from export import write_gzip_csv
+
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_TIMEOUT = 5  # seconds per page
+CSV_TIMEOUT = 30
+PROGRESS_STEPS = 1000  # sqlite VM instructions between two timeout checks
+
+# Everything a SELECT needs; anything else (PRAGMA, ATTACH, writes...) is denied by the authorizer.
+ALLOWED_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION,
+                   getattr(sqlite3, 'SQLITE_RECURSIVE', 33)}
+
+
+class QueryError(Exception):
+    pass
+
+
+def connect_readonly(path):
+    conn = sqlite3.connect('file:%s?mode=ro' % path, uri=True, check_same_thread=False)
+    conn.set_authorizer(lambda action, *args: sqlite3.SQLITE_OK if action in ALLOWED_ACTIONS else sqlite3.SQLITE_DENY)
+    return conn
+
+
+class QuerySession:
+    """
+    A SELECT running on its own read-only connection, consumed one page at a time.
+    Each page (or CSV export) must finish within its timeout or the query is interrupted.
+    The methods block, so run them in an executor.
+    """
+
+    def __init__(self, query, path, page_size=DEFAULT_PAGE_SIZE, timeout=DEFAULT_TIMEOUT):
+        self.query = query
+        self.page_size = page_size
+        self.timeout = timeout
+        self.exhausted = False
+        self.rows_read = 0
+        self._deadline = None
+        self._conn = connect_readonly(path)
+        self._conn.set_progress_handler(self._check_deadline, PROGRESS_STEPS)
+        self._cursor = None
+        self._lookahead = []  # the row fetched to find out whether there is another page
+        self.columns = ()
+
+    def _check_deadline(self):
+        return self._deadline is not None and time.monotonic() > self._deadline
+
+    def _run(self, func, timeout):
+        self._deadline = time.monotonic() + timeout
+        try:
+            if self._cursor is None:
+                self._cursor = self._conn.execute(self.query)
+                self.columns = tuple(col[0] for col in self._cursor.description or ())
+            return func()
+        except sqlite3.OperationalError as e:
+            if str(e) == 'interrupted':
+                self.close()
+                raise QueryError('Query interrupted after exceeding the %d seconds timeout.' % timeout)
+            raise QueryError(str(e))
+        except (sqlite3.DatabaseError, sqlite3.Warning) as e:
+            raise QueryError(str(e))
+        finally:
+            self._deadline = None
+
+    def next_page(self):
+        """:return: list of at most page_size rows"""
+        if self.exhausted:
+            return []
+        rows = self._lookahead + self._run(
+                lambda: self._cursor.fetchmany(self.page_size + 1 - len(self._lookahead)), self.timeout)
+        self.exhausted = len(rows) <= self.page_size
+        rows, self._lookahead = rows[:self.page_size], rows[self.page_size:]
+        self.rows_read += len(rows)
+        if self.exhausted:
+            self.close()
+        return rows
+
+    def to_csv(self, rows=(), timeout=CSV_TIMEOUT):
+        """Write rows followed by the rest of the result as a gzip CSV. :return: file-like object"""
+        def export():
+            rest = () if self.exhausted else self._cursor
+            return write_gzip_csv(self.columns, itertools.chain(rows, self._lookahead, rest))[0]
+
+        try:
+            return self._run(export, timeout)
+        finally:
+            self.exhausted = True
+            self.close()
+
+    def close(self):
+        self.exhausted = True
+        self._conn.close()
+
+
+def format_rows(columns, rows, limit=1900):
+    """Render rows into code block messages of at most limit characters, without building one big string."""
+    header = ' '.join(columns) + '\n'
+    chunk = [header]
+    size = len(header)
+    for row in rows:
+        line = str(row)[:limit - len(header) - 1] + '\n'
+        if size + len(line) > limit and size > len(header):
+            yield '```' + ''.join(chunk) + '```'
+            chunk = [header]
+            size = len(header)
+        chunk.append(line)
+        size += len(line)
+    yield '```' + ''.join(chunk) + '```'
@@ -0,0 +1,46 @@
+"""
+Where bot.py's startup time goes: imports, the steps of init(), connecting, and optional modules imported on first
+use. The report is logged once the bot is ready, shown by the `startup` command and printed by
+`python bot.py --startup-report`, which starts up without connecting.
+"""
+import contextlib
+import importlib
+import sys
+import time
+
+
+class StartupTimer:
+    def __init__(self, started=None):
+        self.started = time.perf_counter() if started is None else started
+        self.steps = []  # (name, seconds) in the order they finished
+        self.ready = None  # seconds from the start to the first READY
+
+    def add(self, name, seconds):
+        self.steps.append((name, seconds))
+
+    @contextlib.contextmanager
+    def step(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def mark_ready(self):
+        if self.ready is None:
+            self.ready = time.perf_counter() - self.started
+
+    def lazy_import(self, name):
+        """Import an optional module on first use, timing the import."""
+        module = sys.modules.get(name)
+        if module is None:
+            with self.step(f'import {name} (on first use)'):
+                module = importlib.import_module(name)
+        return module
+
+    def report(self) -> str:
+        lines = [f"{'Step':<44}{'ms':>10}"]
+        lines += [f'{name:<44}{seconds * 1000:>10.1f}' for name, seconds in self.steps]
+        if self.ready is not None:
+            lines.append(f"{'ready after':<44}{self.ready * 1000:>10.1f}")
+        return '\n'.join(lines)
@@ -0,0 +1,39 @@
+"""
+Tests of bot.py that need no Discord connection. Run with the Django tests (python manage.py test) or on their own:
+
+    python -m unittest test_bot
+"""
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# run in a fresh interpreter, so that nothing imported by other tests hides what importing bot.py does
+IMPORT_BOT = '''
+import sys, threading
+threads = threading.active_count()
+import bot
+assert bot.bot is None and bot.loop_watchdog is None, 'the client was created on import'
+assert bot.conn is None and bot.governor is None, 'init() ran on import'
+assert 'credentials' not in sys.modules, 'credentials were imported'
+assert threading.active_count() == threads, 'a thread was started on import'
+'''
+
+
+@unittest.skipUnless(importlib.util.find_spec('discord'), 'discord.py is not installed')
+class ImportTests(unittest.TestCase):
+    def test_import_has_no_side_effects(self):
+        with tempfile.TemporaryDirectory() as cwd:
+            result = subprocess.run([sys.executable, '-c', IMPORT_BOT], cwd=cwd, capture_output=True, text=True,
+                                    env=dict(os.environ, PYTHONPATH=os.pathsep.join(
+                                        filter(None, (REPO_DIR, os.environ.get('PYTHONPATH'))))))
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertEqual(os.listdir(cwd), [], 'files were written on import')
+
+
+if __name__ == '__main__':
+    unittest.main()
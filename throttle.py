@@ -0,0 +1,90 @@
+"""
+Rate limiting for bot.py's command dispatcher: token buckets that give each member a budget of command cost, and a
+cap on the handlers in flight that turns work away rather than queueing it when the bot is overloaded.
+"""
+import contextlib
+import time
+
+
+class TokenBucket:
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate, capacity, now):
+        self.rate = rate  # tokens per second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, cost, now) -> float:
+        """Take cost tokens if there are that many. :return: 0 if taken, or else the seconds until there will be"""
+        self.refill(now)
+        cost = min(cost, self.capacity)  # or it could never be taken
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class Throttle:
+    """
+    A token bucket per key, e.g. per user, allowing `count` tokens every `seconds` with bursts of up to `count`.
+    Buckets are created on first use and dropped once they have refilled.
+    """
+
+    def __init__(self, count, seconds, max_keys=10000):
+        self.rate = count / seconds
+        self.capacity = count
+        self.max_keys = max_keys
+        self.buckets = {}
+        self.limited = 0  # requests turned down
+
+    def take(self, key, cost=1, now=None) -> float:
+        """:return: 0 if allowed, or else the seconds to wait"""
+        now = time.monotonic() if now is None else now
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= self.max_keys:
+                self.prune(now)
+            bucket = self.buckets[key] = TokenBucket(self.rate, self.capacity, now)
+        wait = bucket.take(cost, now)
+        if wait:
+            self.limited += 1
+        return wait
+
+    def prune(self, now):
+        for key, bucket in list(self.buckets.items()):
+            bucket.refill(now)
+            if bucket.tokens >= bucket.capacity:
+                del self.buckets[key]
+
+
+class ConcurrencyLimit:
+    """Counts handlers in flight. New ones are turned away at the limit rather than queued behind it."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self.shed = 0  # handlers turned away
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= self.limit:
+            self.shed += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+
+    @contextlib.contextmanager
+    def released(self):
+        """Give the slot back for a while, e.g. while waiting for a user to answer."""
+        self.release()
+        try:
+            yield
+        finally:
+            self.in_flight += 1
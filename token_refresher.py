@@ -0,0 +1,152 @@
+import asyncio
+import datetime
+import heapq
+import logging
+
+import aiohttp
+
+import ratelimit
+
+API_ENDPOINT = 'https://discordapp.com/api/v6'
+
+logger = logging.getLogger('discord')
+
+
+def parse_timestamp(value):
+    """Parse a DateTimeField as stored by Django in sqlite (naive UTC, optional fraction and offset)."""
+    if value is None:
+        return None
+    value = value[:26].replace('T', ' ')
+    for fmt in ('%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M:%S'):
+        try:
+            return datetime.datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    return None
+
+
+class TokenRefresher:
+    """
+    Keeps the OAuth access tokens in oauth_record fresh.
+    Records sit in a heap ordered by expires_at; every `interval` seconds at most `batch_size`
+    of those expiring within `lead` are refreshed, so refreshes trickle out instead of
+    piling up in front of a sweep or a guild re-join.
+    """
+
+    def __init__(self, conn, client_id, client_secret, redirect_uri, lead=datetime.timedelta(days=1), batch_size=5,
+                 interval=30, rescan_interval=3600, api_endpoint=API_ENDPOINT, governor=None):
+        self.conn = conn
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.redirect_uri = redirect_uri
+        self.lead = lead
+        self.batch_size = batch_size
+        self.interval = interval
+        self.rescan_interval = rescan_interval
+        self.api_endpoint = api_endpoint
+        self.governor = governor  # a ratelimit.Governor shared with signups and sweeps, or None
+        self._heap = []
+        self._failed = {}  # record id -> refresh token that was rejected
+        self._last_scan = None
+        self.refreshed = 0
+
+    def load(self):
+        """Rebuild the heap from the database. Picks up new signups and tokens refreshed elsewhere."""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT id, expires_at, refresh_token FROM oauth_record '
+                       'WHERE join_success=1 AND refresh_token IS NOT NULL')
+        heap = []
+        for record_id, expires_at, refresh_token in cursor.fetchall():
+            if self._failed.get(record_id) == refresh_token:
+                continue
+            heap.append((parse_timestamp(expires_at) or datetime.datetime.min, record_id))
+        heapq.heapify(heap)
+        self._heap = heap
+        self._last_scan = datetime.datetime.utcnow()
+
+    def schedule(self, record_id, expires_at):
+        heapq.heappush(self._heap, (expires_at, record_id))
+
+    def due(self, now=None):
+        """Pop the records that should be refreshed now, at most batch_size of them."""
+        threshold = (now or datetime.datetime.utcnow()) + self.lead
+        batch = []
+        while self._heap and self._heap[0][0] <= threshold and len(batch) < self.batch_size:
+            batch.append(heapq.heappop(self._heap)[1])
+        return batch
+
+    @property
+    def next_expiry(self):
+        return self._heap[0][0] if self._heap else None
+
+    async def run(self):
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=15)) as session:
+            while True:
+                try:
+                    if (self._last_scan is None or datetime.datetime.utcnow() - self._last_scan >
+                            datetime.timedelta(seconds=self.rescan_interval)):
+                        self.load()
+                    for record_id in self.due():
+                        await self.refresh(session, record_id)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception('Token refresher failed')
+                await asyncio.sleep(self.interval)
+
+    async def refresh_now(self, record_ids):
+        """Refresh the given records immediately, e.g. before a bulk operation needs their tokens."""
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=15)) as session:
+            for record_id in record_ids:
+                await self.refresh(session, record_id, force=True)
+
+    async def refresh(self, session, record_id, force=False):
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT refresh_token, expires_at FROM oauth_record WHERE id=?', (record_id,))
+        row = cursor.fetchone()
+        if row is None or row[0] is None:
+            return  # deleted or never joined
+
+        refresh_token, expires_at = row[0], parse_timestamp(row[1])
+        now = datetime.datetime.utcnow()
+        if not force and expires_at is not None and expires_at > now + self.lead:
+            self.schedule(record_id, expires_at)  # refreshed elsewhere (e.g. a new signup) since it was queued
+            return
+
+        if self.governor is not None:
+            # refreshes ahead of expiry are background work; refresh_now() is for something about to need the tokens
+            await self.governor.wait('POST', '/oauth2/token', reserve=0.0 if force else ratelimit.BACKGROUND_RESERVE)
+        async with session.post(self.api_endpoint + '/oauth2/token', data={
+            'client_id'    : self.client_id,
+            'client_secret': self.client_secret,
+            'grant_type'   : 'refresh_token',
+            'refresh_token': refresh_token,
+            'redirect_uri' : self.redirect_uri,
+            'scope'        : 'identify guilds.join'
+        }) as res:
+            if res.status == 429:
+                retry_after = float(res.headers.get('Retry-After', self.interval))
+                self.schedule(record_id, expires_at or now)
+                if self.governor is not None:
+                    await asyncio.get_event_loop().run_in_executor(
+                            None, self.governor.penalize, 'POST', '/oauth2/token', None, retry_after,
+                            bool(res.headers.get('X-RateLimit-Global')))
+                await asyncio.sleep(retry_after)
+                return
+            if res.status != 200:
+                logger.warning('Refreshing the token of record %d failed with %d', record_id, res.status)
+                if res.status in (400, 401):
+                    self._failed[record_id] = refresh_token  # revoked; retry only if the record changes
+                else:
+                    self.schedule(record_id, now + datetime.timedelta(seconds=self.rescan_interval) - self.lead)
+                return
+            token = await res.json()
+
+        expires_at = now + datetime.timedelta(seconds=int(token['expires_in']))
+        cursor.execute(
+                'UPDATE oauth_record SET access_token=?, refresh_token=?, token_type=?, expires_at=? WHERE id=?',
+                (token['access_token'], token.get('refresh_token', refresh_token), token['token_type'],
+                 str(expires_at), record_id))
+        self.conn.commit()  # before the next request: the shared database must not stay locked across it
+        self.refreshed += 1
+        self.schedule(record_id, expires_at)
@@ -0,0 +1,344 @@
+"""
+Runs the jobs bot.py enqueues (see jobs.py): email campaigns, announcements, shell commands and sweeps. They run
+here, in parallel with each other, so that they neither slow down the gateway process nor die when it restarts.
+
+    python worker.py --concurrency 4
+
+Start it in the directory of bot.py's db.sqlite3. Several workers may share the queue.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import smtplib
+import socket
+import sys
+import time
+import traceback
+
+import discord
+import discord.http
+
+import database
+import jobs
+import mail
+import ratelimit
+from credentials import BOT_TOKEN, EMAIL_HOST_PASSWORD
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+PROGRESS_INTERVAL = 1  # seconds between progress rows of a job
+SHELL_OUTPUT_LIMIT = 100000  # characters of output kept in the result of a shell job
+# sending budgets of campaigns, on top of which a campaign's payload may spread its sends over a longer period
+SMTP_PER_MINUTE = 30
+DM_PER_SECOND = 5
+
+logger = logging.getLogger('worker')
+
+HANDLERS = {}  # job kind -> coroutine function taking a JobContext and returning the result
+
+
+def handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+class JobContext:
+    """What a handler gets: the job, the worker's Discord REST client, and progress reporting."""
+
+    def __init__(self, worker, job):
+        self.worker = worker
+        self.job = job
+        self.payload = job.payload
+        self.checkpoint = job.checkpoint  # as saved by an earlier attempt, or None
+        self._progress = None
+        self._reported = 0.0
+
+    async def http(self) -> discord.http.HTTPClient:
+        return await self.worker.http()
+
+    def opted_out(self, column, key) -> set:
+        """The `key`s of records that opted out since the job was enqueued, e.g. of a scheduled campaign"""
+        return {row[0] for row in self.worker.queue.conn.execute(
+                f'SELECT {key} FROM oauth_record WHERE {column}=1 AND {key} IS NOT NULL')}
+
+    def deliveries(self) -> dict:
+        """recipient -> error, or None if delivered, of the recipients earlier attempts got to"""
+        return self.worker.queue.deliveries(self.job)
+
+    def delivered(self, recipient, error=None):
+        """Commit a delivery before going on to the next one, so that a retry does not repeat it."""
+        self.worker.queue.record_delivery(self.job, str(recipient), error)
+
+    def progress(self, done, total=None, note=None, checkpoint=None, force=False):
+        """Record progress, written at most every PROGRESS_INTERVAL seconds unless forced."""
+        if checkpoint is not None:
+            self.checkpoint = checkpoint
+        self._progress = (done, total, note)
+        if force or time.monotonic() - self._reported >= PROGRESS_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        if self._progress is not None:
+            self.worker.queue.progress(self.job, *self._progress, checkpoint=self.checkpoint)
+            self._reported = time.monotonic()
+
+
+class Pacer:
+    """Releases sends evenly, `interval` seconds apart, however many coroutines wait on it."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.next = time.monotonic()
+
+    @classmethod
+    def for_campaign(cls, per_second, spread, sends):
+        """:param per_second: the budget, or None; :param spread: seconds over which to release `sends` sends"""
+        return cls(max(1 / per_second if per_second else 0, spread / sends if spread and sends else 0))
+
+    async def wait(self):
+        now = time.monotonic()
+        at = max(now, self.next)
+        self.next = at + self.interval  # taken before sleeping, so that waiters get consecutive turns
+        if at > now:
+            await asyncio.sleep(at - now)
+
+
+class Worker:
+    def __init__(self, conn, concurrency=4, lease=60, poll_interval=1, kinds=None, name=None,
+                 smtp_per_minute=SMTP_PER_MINUTE, dm_per_second=DM_PER_SECOND, governor=None):
+        self.queue = jobs.JobQueue(conn)
+        self.concurrency = concurrency
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.kinds = tuple(kinds or HANDLERS)
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.smtp_per_minute = smtp_per_minute  # None for no budget
+        self.dm_per_second = dm_per_second
+        self.governor = governor  # a ratelimit.Governor shared with the bot, or None
+        self.running = {}  # job id -> task
+        self._http = None
+
+    async def http(self) -> discord.http.HTTPClient:
+        if self._http is None:
+            self._http = discord.http.HTTPClient(loop=asyncio.get_event_loop())
+            if self.governor is not None:
+                ratelimit.govern(self._http, self.governor)
+            await self._http.static_login(BOT_TOKEN, bot=True)
+        return self._http
+
+    async def run(self):
+        logger.info('Worker %s running %s', self.name, ', '.join(self.kinds))
+        while True:
+            while len(self.running) < self.concurrency:
+                job = self.queue.claim(self.name, self.kinds, self.lease)
+                if job is None:
+                    break
+                self.running[job.id] = asyncio.ensure_future(self.execute(job))
+            await asyncio.sleep(self.poll_interval)
+
+    async def execute(self, job):
+        logger.info('Running job #%d %s, attempt %d', job.id, job.kind, job.attempts)
+        context = JobContext(self, job)
+        task = asyncio.ensure_future(HANDLERS[job.kind](context))
+        heartbeat = asyncio.ensure_future(self.heartbeat(context, task))
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            logger.info('Job #%d was cancelled', job.id)
+        except Exception:
+            context.flush()  # the checkpoint lets a retry resume
+            retried = self.queue.fail(job, traceback.format_exc())
+            logger.exception('Job #%d failed%s', job.id, ', will retry' if retried else '')
+        else:
+            context.flush()
+            self.queue.complete(job, result)
+        finally:
+            heartbeat.cancel()
+            del self.running[job.id]
+
+    async def heartbeat(self, context, task):
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            context.flush()
+            if not self.queue.heartbeat(context.job, self.lease):
+                task.cancel()  # cancelled by an admin, or the lease was lost
+                return
+
+
+@handler('email')
+async def send_email(context):
+    """
+    payload: subject, plain_body, html_body, recipients [[name, address]], sample (prefix the subject),
+             spread (seconds over which to release the emails)
+    """
+    payload = context.payload
+    subject = '(sample) ' + payload['subject'] if payload.get('sample') else payload['subject']
+    deliveries = context.deliveries()
+    opted_out = set() if payload.get('sample') else context.opted_out('opt_out_email', 'school_email')
+    pending = [(name, address) for name, address in payload['recipients']
+               if address not in deliveries and address not in opted_out]
+    total = len(deliveries) + len(pending)
+    smtp_per_minute = context.worker.smtp_per_minute
+    pacer = Pacer.for_campaign(smtp_per_minute and smtp_per_minute / 60, payload.get('spread'), len(pending))
+    loop = asyncio.get_event_loop()
+    email_server = None
+
+    async def send(email):
+        nonlocal email_server
+        if email_server is not None:
+            try:
+                return await loop.run_in_executor(None, email_server.send_message, email)
+            except smtplib.SMTPServerDisconnected:
+                pass  # dropped while idle between paced sends: reconnect and send it once more
+        email_server = await loop.run_in_executor(None, mail.smtp_connection, EMAIL_HOST_PASSWORD)
+        await loop.run_in_executor(None, email_server.send_message, email)
+
+    try:
+        for name, address in pending:
+            await pacer.wait()
+            email = mail.build_email(subject, payload['plain_body'], payload['html_body'], name, address)
+            try:
+                await send(email)
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError) as e:
+                # anything else, e.g. a server that cannot be reached, fails the attempt and a retry resumes after the
+                # last delivery
+                deliveries[address] = str(e)
+            else:
+                deliveries[address] = None
+            context.delivered(address, deliveries[address])
+            context.progress(len(deliveries), total)
+    finally:
+        if email_server is not None:
+            email_server.close()
+    return {'sent': sum(error is None for error in deliveries.values()),
+            'failed': [f'{address}: {error}' for address, error in deliveries.items() if error is not None]}
+
+
+@handler('announcement')
+async def send_announcement(context, concurrency=5):
+    """
+    payload: body, files [[path, display_name]], channel_id, recipients [[user_id, display_name, greeting]],
+             spread (seconds over which to release the messages)
+    checkpoint: whether the channel got it
+    """
+    payload = context.payload
+    http = await context.http()
+    checkpoint = context.checkpoint or {'channel': False}
+    deliveries = context.deliveries()  # by str(user_id)
+    names = {str(user_id): name for user_id, name, _ in payload['recipients']}
+    opted_out = context.opted_out('opt_out_pm', 'discord_user_id')
+    pending = [recipient for recipient in payload['recipients']
+               if str(recipient[0]) not in deliveries and recipient[0] not in opted_out]
+    total = len(deliveries) + len(pending)
+    started = time.monotonic()
+    semaphore = asyncio.Semaphore(concurrency)  # discord.py queues on the route bucket, this bounds the backlog
+    pacer = Pacer.for_campaign(context.worker.dm_per_second, payload.get('spread'), len(pending))
+
+    async def send(channel_id, content):
+        if not payload['files']:
+            return await http.send_message(channel_id, content)
+        # reversed like bot.attach_files, so that images come in the order they were uploaded
+        files = [discord.File(path, filename=name) for path, name in reversed(payload['files'])]
+        try:
+            return await http.send_files(channel_id, files=files, content=content)
+        finally:
+            for f in files:
+                f.close()
+
+    async def deliver(user_id, name, greeting):
+        async with semaphore:
+            await pacer.wait()
+            error = None
+            try:
+                channel = await http.start_private_message(user_id)
+                await send(channel['id'], greeting + '\n' + payload['body'])
+            except discord.HTTPException as e:
+                error = str(e)
+            deliveries[str(user_id)] = error
+            context.delivered(user_id, error)
+            context.progress(len(deliveries), total)
+
+    await asyncio.gather(*(deliver(*recipient) for recipient in pending))
+    if not checkpoint['channel']:
+        await send(payload['channel_id'], 'Hi everyone,\n' + payload['body'])
+        checkpoint['channel'] = True
+        context.progress(len(deliveries), total, checkpoint=checkpoint, force=True)
+    failed = [[names.get(user_id, user_id), error] for user_id, error in deliveries.items() if error is not None]
+    return {'sent': len(deliveries) - len(failed), 'failed': failed,
+            'recipients': total, 'seconds': round(time.monotonic() - started, 2)}
+
+
+async def run_process(context, create, timeout):
+    """Run a subprocess, noting its last line of output as progress. :return: (output, exit code, killed)"""
+    proc = await create(stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.STDOUT)
+    output = []
+    lines = 0
+
+    async def read():
+        nonlocal lines
+        async for line in proc.stdout:
+            line = line.decode(errors='replace')
+            output.append(line)
+            lines += 1
+            context.progress(lines, note=line.strip()[:100])
+
+    killed = False
+    try:
+        await asyncio.wait_for(read(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        killed = True
+    except asyncio.CancelledError:
+        proc.kill()
+        raise
+    await proc.wait()
+    return ''.join(output)[-SHELL_OUTPUT_LIMIT:], proc.returncode, killed
+
+
+@handler('shell')
+async def run_shell(context):
+    """payload: command, timeout"""
+    command = context.payload['command']
+    output, returncode, killed = await run_process(
+            context, lambda **kwargs: asyncio.create_subprocess_shell(command, **kwargs), context.payload['timeout'])
+    return {'output': output, 'returncode': returncode, 'killed': killed}
+
+
+@handler('sweep')
+async def run_sweep(context):
+    """payload: arguments of manage.py sweep. Retries resume from the sweep's own checkpoint file."""
+    args = [sys.executable, os.path.join(REPO_DIR, 'manage.py'), 'sweep', *context.payload['args']]
+    output, returncode, killed = await run_process(
+            context, lambda **kwargs: asyncio.create_subprocess_exec(*args, **kwargs), context.payload['timeout'])
+    if returncode != 0:
+        raise RuntimeError(f'manage.py sweep exited with {returncode}' + (' (timed out)' if killed else '')
+                           + '\n' + output[-1500:])
+    return {'output': output[-1500:], 'returncode': returncode}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database', default='db.sqlite3')
+    parser.add_argument('--concurrency', type=int, default=4, help='jobs run at the same time')
+    parser.add_argument('--lease', type=float, default=60, help='seconds a job stays claimed without a heartbeat')
+    parser.add_argument('--poll-interval', type=float, default=1)
+    parser.add_argument('--kind', action='append', choices=sorted(HANDLERS), help='run only jobs of these kinds')
+    parser.add_argument('--api-endpoint', help='Discord API base url, e.g. a local fake_discord.py')
+    parser.add_argument('--smtp-per-minute', type=float, default=SMTP_PER_MINUTE, help='0 for no budget')
+    parser.add_argument('--dm-per-second', type=float, default=DM_PER_SECOND, help='0 for no budget')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s: %(message)s')
+    if args.api_endpoint:
+        discord.http.Route.BASE = args.api_endpoint
+
+    worker = Worker(database.connect(args.database), args.concurrency, args.lease, args.poll_interval, args.kind,
+                    smtp_per_minute=args.smtp_per_minute or None, dm_per_second=args.dm_per_second or None,
+                    governor=ratelimit.Governor(ratelimit.path_for(args.database)))
+    asyncio.get_event_loop().run_until_complete(worker.run())
+
+
+if __name__ == '__main__':
+    main()